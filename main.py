@@ -1,6 +1,7 @@
 import sys
 import os
 import platform
+import multiprocessing
 from PyQt5.QtWidgets import QApplication, QMessageBox
 from PyQt5.QtCore import Qt
 from utils.file_utils import get_resource_path
@@ -83,4 +84,5 @@ def main():
         return 1
 
 if __name__ == '__main__':
+    multiprocessing.freeze_support()  # Processus de réception syslog dans l'exécutable PyInstaller
     sys.exit(main())
\ No newline at end of file
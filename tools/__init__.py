@@ -0,0 +1 @@
+# Outils de développement (benchmarks, générateurs de charge) pour NetOpsKit
@@ -0,0 +1,153 @@
+"""Micro-benchmarks du pipeline syslog (sans interface graphique).
+
+Usage :
+    python -m tools.bench_syslog parser [--count 200000]
+    python -m tools.bench_syslog filter [--count 100000] [--keywords 200]
+"""
+import argparse
+import random
+import re
+import string
+import sys
+import time
+from typing import Callable, List
+
+from utils.syslog_filter import SyslogFilter
+from utils.syslog_parser import parse, parse_many
+
+SAMPLE_MESSAGES = [
+    "<189>52: *Mar  1 00:12:34.567: %LINK-3-UPDOWN: Interface GigabitEthernet0/{n}, changed state to down",
+    "<189>53: *Mar  1 00:12:35.012: %LINEPROTO-5-UPDOWN: Line protocol on Interface GigabitEthernet0/{n}, changed state to up",
+    "<187>1201: SW-CORE-01: *Mar  1 00:13:01.100 UTC: %SYS-3-CPUHOG: Task is running for ({n})msecs",
+    "<86>Oct 11 22:14:15 bastion sshd[{n}]: Accepted publickey for admin from 10.0.0.{n} port 51122 ssh2",
+    "<165>1 2024-05-11T22:14:15.003Z fw01.example.net evntslog - ID47 [exampleSDID@32473 iut=\"3\"] event {n}",
+    "<13>id=firewall time=\"2024-05-11 10:00:{n:02d}\" fw=\"SN210W\" tz=+0200 startime=\"2024-05-11 10:00:00\" "
+    "pri=5 proto=tcp src=192.168.1.{n} dst=10.0.0.1 action=pass msg=\"Connection allowed\"",
+]
+
+
+def _legacy_parse(message: str):
+    """Implémentation historique de SyslogParser.parse_syslog_message (référence)"""
+    pri_match = re.match(r'<(\d+)>(.*)', message)
+    if pri_match:
+        pri = int(pri_match.group(1))
+        return pri // 8, pri % 8, pri_match.group(2)
+    return 23, 6, message
+
+
+_LEGACY_MNEMONIC = re.compile(r'%([A-Z0-9_]+-\d-[A-Z0-9_]+)')
+_LEGACY_TIMESTAMP = re.compile(r'([A-Z][a-z]{2} +\d+ \d\d:\d\d:\d\d|\d{4}-\d\d-\d\dT\S+)')
+
+
+def _legacy_parse_with_fields(message: str):
+    """Référence historique + extraction a posteriori des champs (une passe par champ)"""
+    facility, severity, text = _legacy_parse(message)
+    mnemonic = _LEGACY_MNEMONIC.search(text)
+    timestamp = _LEGACY_TIMESTAMP.search(text)
+    return (facility, severity, text,
+            mnemonic.group(1) if mnemonic else None,
+            timestamp.group(1) if timestamp else None)
+
+
+def build_corpus(count: int, seed: int = 42) -> List[bytes]:
+    rng = random.Random(seed)
+    return [rng.choice(SAMPLE_MESSAGES).format(n=rng.randint(0, 59)).encode() for _ in range(count)]
+
+
+def _measure(label: str, func: Callable[[], object], count: int, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    rate = count / best
+    print(f"  {label:<54} {rate:>12,.0f} msg/s   ({best * 1e9 / count:,.0f} ns/msg)")
+    return rate
+
+
+def bench_parser(count: int, repeat: int) -> None:
+    corpus = build_corpus(count)
+    decoded = [data.decode('utf-8', errors='replace').strip() for data in corpus]
+    print(f"Analyse syslog - {count} messages, meilleur de {repeat} passes")
+    before = _measure("avant : re.match(r'<(\\d+)>(.*)') par message",
+                      lambda: [_legacy_parse(m) for m in decoded], count, repeat)
+    before_fields = _measure("avant : idem + re.search par champ (mnémonique, date)",
+                             lambda: [_legacy_parse_with_fields(m) for m in decoded], count, repeat)
+    after = _measure("après : parse() -> SyslogRecord",
+                     lambda: [parse(m) for m in decoded], count, repeat)
+    _measure("après : parse_many(list[bytes]) (décodage inclus)",
+             lambda: parse_many(corpus), count, repeat)
+    print(f"  rapport après/avant, PRI seul           : {after / before:.2f}x "
+          f"(l'ancienne version n'extrait ni horodatage, ni hôte, ni tag, ni mnémonique)")
+    print(f"  rapport après/avant, champs structurés  : {after / before_fields:.2f}x")
+
+
+def _legacy_filter(filters: dict, host: str, facility: int, severity: int, message: str) -> bool:
+    """Implémentation historique de SyslogServerWorker._should_process_message (référence)"""
+    if filters["enabled"]:
+        if filters["hosts"] and host not in filters["hosts"]:
+            return False
+        if filters["facilities"] and facility not in filters["facilities"]:
+            return False
+        if filters["severities"] and severity not in filters["severities"]:
+            return False
+        if filters["keywords"]:
+            if not any(keyword.lower() in message.lower() for keyword in filters["keywords"]):
+                return False
+    return True
+
+
+def bench_filter(count: int, keyword_count: int, repeat: int) -> None:
+    rng = random.Random(7)
+    records = [parse(data.decode()) for data in build_corpus(count)]
+    hosts = [f"10.0.{rng.randint(0, 3)}.{rng.randint(1, 254)}" for _ in range(count)]
+    items = [(host, r.facility, r.severity, r.text) for host, r in zip(hosts, records)]
+    keywords = ["".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(4, 10)))
+                for _ in range(keyword_count - 2)] + ["UPDOWN", "Accepted"]
+    listed_hosts = [f"10.0.{a}.{b}" for a in (2, 3) for b in range(1, 200)]
+    filters = {
+        "enabled": True,
+        "hosts": [f"10.0.{a}.{b}" for a in (0, 1) for b in range(256)] + listed_hosts,
+        "facilities": list(range(24)),
+        "severities": list(range(8)),
+        "keywords": keywords,
+    }
+    compiled = SyslogFilter.compile(dict(filters, hosts=["10.0.0.0/24", "10.0.1.0/24"] + listed_hosts))
+    expected = [_legacy_filter(filters, *item) for item in items]
+    if expected != [compiled.matches(*item) for item in items]:
+        raise SystemExit("Résultats différents entre le filtre historique et le filtre compilé")
+
+    print(f"Filtrage syslog - {count} messages x {keyword_count} mots-clés, "
+          f"{sum(expected)} retenus, meilleur de {repeat} passes")
+    before = _measure("avant : listes + lower() par mot-clé",
+                      lambda: [_legacy_filter(filters, *item) for item in items], count, repeat)
+    after = _measure("après : SyslogFilter.matches (frozensets, CIDR, trie)",
+                     lambda: [compiled.matches(*item) for item in items], count, repeat)
+    start = time.perf_counter()
+    SyslogFilter.compile(filters)
+    print(f"  compilation du filtre (une fois par changement de config) : "
+          f"{(time.perf_counter() - start) * 1000:.1f} ms")
+    print(f"  rapport après/avant                    : {after / before:.2f}x")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Micro-benchmarks du pipeline syslog")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_parser = sub.add_parser("parser", help="Débit de l'analyseur syslog")
+    p_parser.add_argument("--count", type=int, default=200000)
+    p_parser.add_argument("--repeat", type=int, default=3)
+    p_filter = sub.add_parser("filter", help="Débit du moteur de filtrage")
+    p_filter.add_argument("--count", type=int, default=100000)
+    p_filter.add_argument("--keywords", type=int, default=200)
+    p_filter.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    if args.command == "parser":
+        bench_parser(args.count, args.repeat)
+    elif args.command == "filter":
+        bench_filter(args.count, args.keywords, args.repeat)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
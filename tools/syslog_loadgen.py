@@ -0,0 +1,513 @@
+"""Générateur de charge syslog et banc de mesure du serveur (sans interface visible).
+
+Rejoue des fichiers de logs ou du trafic synthétique Cisco / Stormshield vers le serveur,
+en UDP ou TCP, à un débit cible, puis compare reçus / envoyés et mesure la latence
+d'analyse, la latence de livraison au GUI, la profondeur des files et le temps de trame.
+
+Usage :
+    python -m tools.syslog_loadgen --target server --rate 20000 --duration 10
+    python -m tools.syslog_loadgen --target worker --processes 2 --profile stormshield --rate 0
+    python -m tools.syslog_loadgen --target server --transport tcp --replay capture.log --gui
+    python -m tools.syslog_loadgen --target external --host 10.0.0.5 --port 514 --rate 5000
+"""
+import argparse
+import gzip
+import json
+import multiprocessing
+import os
+import random
+import re
+import socket
+import sys
+import tempfile
+import time
+from array import array
+from typing import Dict, List, Optional
+
+CISCO_TEMPLATES = [
+    "<187>{n}: {host}: *{date}.{ms:03d}: %LINK-3-UPDOWN: Interface GigabitEthernet1/0/{port}, changed state to down",
+    "<189>{n}: {host}: *{date}.{ms:03d}: %LINEPROTO-5-UPDOWN: Line protocol on Interface GigabitEthernet1/0/{port}, changed state to up",
+    "<189>{n}: {host}: *{date}.{ms:03d}: %SYS-5-CONFIG_I: Configured from console by admin on vty0 (10.0.0.{octet})",
+    "<190>{n}: {host}: *{date}.{ms:03d}: %SEC-6-IPACCESSLOGP: list 110 denied tcp 192.168.{octet}.{port}(51234) -> 10.0.0.1(22), 1 packet",
+    "<188>{n}: {host}: *{date}.{ms:03d}: %DUAL-5-NBRCHANGE: EIGRP-IPv4 100: Neighbor 10.1.{octet}.2 (Vlan{port}) is up: new adjacency",
+    "<186>{n}: {host}: *{date}.{ms:03d}: %SYS-2-MALLOCFAIL: Memory allocation of {n} bytes failed from 0x6001F2C4",
+]
+
+STORMSHIELD_TEMPLATES = [
+    "<134>id=firewall time=\"{iso}\" fw=\"{host}\" tz=+0200 startime=\"{iso}\" pri=5 confid=01 slotlevel=2 "
+    "ruleid={port} srcif=\"Ethernet0\" srcifname=\"out\" ipproto=tcp proto=https src=192.168.{octet}.{port} "
+    "srcport=51{ms:03d} dst=10.0.0.{octet} dstport=443 action=pass logtype=\"connection\"",
+    "<132>id=firewall time=\"{iso}\" fw=\"{host}\" tz=+0200 startime=\"{iso}\" pri=4 confid=01 alarmid=85 "
+    "srcif=\"Ethernet1\" proto=dns src=10.0.{octet}.{port} dst=8.8.8.8 action=block msg=\"Invalid DNS protocol\" "
+    "class=protocol classification=0 logtype=\"alarm\"",
+    "<133>id=firewall time=\"{iso}\" fw=\"{host}\" tz=+0200 startime=\"{iso}\" pri=5 user=\"jdoe\" "
+    "src=10.0.{octet}.{port} method=\"Portal\" msg=\"User authentication succeeded\" logtype=\"auth\"",
+]
+
+PROFILES = {
+    "cisco": CISCO_TEMPLATES,
+    "stormshield": STORMSHIELD_TEMPLATES,
+    "mixed": CISCO_TEMPLATES + STORMSHIELD_TEMPLATES,
+}
+
+# Marqueur ajouté à chaque message : numéro de séquence et heure d'émission (epoch)
+_TAG = " lg="
+# Lignes des fichiers écrits par le serveur : "[YYYY-mm-dd HH:MM:SS] <facility.severity> message"
+_SERVER_LOG_LINE = re.compile(r'^\[[^\]]+\] <(\d+)\.(\d+)> (.*)$')
+
+
+def synthetic_messages(profile: str, count: int, seed: int = 42) -> List[str]:
+    """Messages synthétiques variés (hôtes, interfaces, adresses) du profil demandé"""
+    rng = random.Random(seed)
+    templates = PROFILES[profile]
+    messages = []
+    for n in range(count):
+        second = rng.randint(0, 59)
+        messages.append(rng.choice(templates).format(
+            n=n, host=f"SW-{rng.randint(1, 40):02d}" if rng.random() < 0.5 else f"FW-{rng.randint(1, 8)}",
+            date=f"Mar  1 00:12:{second:02d}", iso=f"2024-05-11 10:00:{second:02d}",
+            ms=rng.randint(0, 999), port=rng.randint(1, 48), octet=rng.randint(1, 254)
+        ))
+    return messages
+
+
+def load_replay(paths: List[str], limit: int = 0) -> List[str]:
+    """Lit des fichiers capturés (un message par ligne, .gz accepté) ; les lignes du serveur retrouvent leur <PRI>"""
+    messages = []
+    for path in paths:
+        opener = gzip.open if path.endswith(".gz") else open
+        with opener(path, "rt", encoding="utf-8", errors="replace") as f:
+            for line in f:
+                line = line.rstrip("\r\n")
+                if not line:
+                    continue
+                match = _SERVER_LOG_LINE.match(line)
+                if match:
+                    line = f"<{int(match.group(1)) * 8 + int(match.group(2))}>{match.group(3)}"
+                messages.append(line)
+                if limit and len(messages) >= limit:
+                    return messages
+    return messages
+
+
+def _frame(payload: bytes, framing: str) -> bytes:
+    if framing == "octet":
+        return f"{len(payload)} ".encode() + payload
+    return payload + b"\n"
+
+
+def sender_main(index: int, options: dict, messages: List[str], result_queue, start_at: float) -> None:
+    """Processus émetteur : débit régulé (rate = 0 pour le maximum), messages marqués"""
+    rate, count, duration = options["rate"], options["count"], options["duration"]
+    address = (options["host"], options["port"])
+    transport, framing = options["transport"], options["framing"]
+    sent = errors = 0
+    try:
+        if transport == "tcp":
+            sock = socket.create_connection(address, timeout=5)
+        else:
+            sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            sock.connect(address)
+        while time.time() < start_at:  # Départ synchronisé des émetteurs
+            time.sleep(0.001)
+        begin = time.perf_counter()
+        total = len(messages)
+        send = sock.send
+        while True:
+            elapsed = time.perf_counter() - begin
+            if (count and sent >= count) or (not count and elapsed >= duration):
+                break
+            due = int(elapsed * rate) + 1 if rate > 0 else sent + 256
+            if count:
+                due = min(due, count)
+            if due <= sent:
+                time.sleep(0.0002)
+                continue
+            now = time.time()
+            if transport == "tcp":
+                chunk = b"".join(
+                    _frame(f"{messages[seq % total]}{_TAG}{index}.{seq}:{now:.6f}".encode(), framing)
+                    for seq in range(sent, due)
+                )
+                sock.sendall(chunk)
+                sent = due
+            else:
+                for seq in range(sent, due):
+                    try:
+                        send(f"{messages[seq % total]}{_TAG}{index}.{seq}:{now:.6f}".encode())
+                    except OSError:
+                        errors += 1  # ECONNREFUSED (ICMP) ou tampon d'émission plein
+                    sent += 1
+        elapsed = time.perf_counter() - begin
+        sock.close()
+        result_queue.put({"index": index, "sent": sent, "errors": errors, "elapsed": elapsed})
+    except Exception as e:
+        result_queue.put({"index": index, "sent": sent, "errors": errors, "elapsed": 0.0, "error": str(e)})
+
+
+def _percentiles(values, points=(50, 90, 99, 99.9)) -> Dict[str, float]:
+    if not values:
+        return {}
+    ordered = sorted(values)
+    result = {f"p{p:g}": ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))] for p in points}
+    result["max"] = ordered[-1]
+    return result
+
+
+def _free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class ParseProbe:
+    """Chronomètre l'analyse syslog du moteur dans le processus courant (le temps du banc)"""
+
+    def __init__(self) -> None:
+        self.durations = array("d")
+
+    def install(self) -> None:
+        from worker import syslog_engine
+        self._module, self._original = syslog_engine, syslog_engine.parse
+        original, durations, clock = self._original, self.durations, time.perf_counter
+
+        def timed_parse(message):
+            start = clock()
+            record = original(message)
+            durations.append(clock() - start)
+            return record
+
+        syslog_engine.parse = timed_parse
+
+    def uninstall(self) -> None:
+        self._module.parse = self._original
+
+
+class ServerBench:
+    """Serveur (SyslogServer ou SyslogServerWorker) instrumenté dans la boucle Qt du banc"""
+
+    def __init__(self, args, app) -> None:
+        from PyQt5.QtCore import QTimer
+        from views.sys_log import ServerConfig
+
+        self.args = args
+        self.app = app
+        self.config = ServerConfig()
+        self.config.host = "127.0.0.1"
+        self.config.port = args.port
+        self.config.tcp_enabled = args.transport == "tcp"
+        self.config.tcp_port = args.port
+        self.config.tls_enabled = False
+        self.config.worker_processes = args.processes
+        self.config.filters = dict(self.config.filters, enabled=False)
+        self.config.save_logs = args.save_logs
+        self.config.archive_enabled = args.archive
+        self._temp_dir = None
+        if args.save_logs or args.archive:
+            self._temp_dir = tempfile.TemporaryDirectory(prefix="syslog_bench_")
+            self.config.log_directory = self._temp_dir.name
+
+        self.delivered = 0
+        self.latencies = array("d")  # Émission -> livraison au GUI (s)
+        self.frame_intervals = array("d")  # Intervalles réels du timer de trame (s)
+        self.render_times = array("d")  # Durée d'insertion d'un lot dans la table (s)
+        self.queue_depth: List[tuple] = []  # (t, messages en attente)
+        self.table = None
+        self.server = self.worker = None
+        self.parse_probe: Optional[ParseProbe] = None
+
+        if args.gui:
+            from views.sys_log import EnhancedLogTable
+            self.table = EnhancedLogTable()
+            self.table.resize(1000, 600)
+            self.table.show()
+
+        self.frame_timer = QTimer()
+        self.frame_timer.setInterval(16)
+        self.frame_timer.timeout.connect(self._onFrame)
+        self.depth_timer = QTimer()
+        self.depth_timer.setInterval(100)
+        self.depth_timer.timeout.connect(self._sampleDepth)
+        self._last_frame = 0.0
+        self._begin = time.perf_counter()
+
+    def start(self) -> None:
+        if self.args.target == "worker":
+            from worker.sys_log_worker import SyslogServerSignals, SyslogServerWorker
+            from utils.syslog_stats import SyslogStats
+            self.signals = SyslogServerSignals()
+            self.stats = SyslogStats()
+            self.worker = SyslogServerWorker(self.config, self.signals, self.stats)
+            self.signals.messages_batch.connect(self._onBatch)
+            self.worker.start()
+        else:
+            from views.sys_log import SyslogServer
+            self.server = SyslogServer(self.config)
+            self.stats = self.server.stats
+            self.server.signals.messages_batch.connect(self._onBatch)
+            self.server.start()
+            if not self.server.running:
+                raise SystemExit("Impossible de démarrer le serveur syslog")
+        self._waitReady()
+        self._begin = self._last_frame = time.perf_counter()
+        self.frame_timer.start()
+        self.depth_timer.start()
+
+    def _waitReady(self, timeout: float = 10.0) -> None:
+        """Attend l'ouverture des sockets (processus fils compris)"""
+        deadline = time.monotonic() + timeout
+        if self.worker is not None and self.config.worker_processes > 0:
+            ready_seen = []
+            self.worker.signals.server_started.connect(lambda *_: ready_seen.append(True))
+            while not ready_seen and time.monotonic() < deadline:
+                self.app.processEvents()
+                time.sleep(0.01)
+        elif self.worker is not None:
+            while not self.worker.running and time.monotonic() < deadline:
+                time.sleep(0.01)
+        time.sleep(0.2)
+
+    def stop(self) -> None:
+        self.frame_timer.stop()
+        self.depth_timer.stop()
+        if self.worker is not None:
+            self.worker.stop()
+            self.worker.join(timeout=5)
+        if self.server is not None:
+            self.server.stop()
+        self.app.processEvents()
+        if self._temp_dir is not None:
+            self._temp_dir.cleanup()
+
+    def received(self) -> int:
+        return self.stats.message_count
+
+    def pending(self) -> int:
+        return (self.worker or self.server).batcher.pendingCount()
+
+    def kernel_drops(self) -> Optional[int]:
+        from worker.syslog_processes import read_udp_socket_drops
+        sock = self.worker.sock if self.worker is not None else self.server.sock
+        if self.args.transport == "udp" and sock is not None and self.config.worker_processes == 0:
+            return read_udp_socket_drops(sock)
+        return self.stats.kernel_drops
+
+    def _onBatch(self, rows: list) -> None:
+        now = time.time()
+        self.delivered += len(rows)
+        latencies = self.latencies
+        for row in rows:
+            message = row[4]
+            position = message.rfind(_TAG)
+            if position != -1:
+                try:
+                    latencies.append(now - float(message[message.index(":", position) + 1:]))
+                except ValueError:
+                    pass
+        if self.table is not None:
+            start = time.perf_counter()
+            self.table.addMessages(rows)
+            self.render_times.append(time.perf_counter() - start)
+
+    def _onFrame(self) -> None:
+        now = time.perf_counter()
+        self.frame_intervals.append(now - self._last_frame)
+        self._last_frame = now
+
+    def _sampleDepth(self) -> None:
+        self.queue_depth.append((time.perf_counter() - self._begin, self.pending()))
+
+
+def run_senders(args, messages: List[str], port: int) -> tuple:
+    """Lance les processus émetteurs (contexte spawn) et retourne leurs comptes rendus"""
+    context = multiprocessing.get_context("spawn")
+    result_queue = context.Queue()
+    options = {
+        "host": args.host, "port": port, "transport": args.transport, "framing": args.framing,
+        "rate": args.rate / args.senders if args.rate > 0 else 0,
+        "count": -(-args.count // args.senders) if args.count else 0,
+        "duration": args.duration,
+    }
+    start_at = time.time() + 1.0 + 0.2 * args.senders
+    processes = [context.Process(target=sender_main, args=(index, options, messages, result_queue, start_at),
+                                 daemon=True) for index in range(args.senders)]
+    for process in processes:
+        process.start()
+    return processes, result_queue
+
+
+def _collect(processes, result_queue, bench: Optional[ServerBench], timeout: float) -> List[dict]:
+    """Attend la fin des émetteurs en laissant tourner la boucle Qt du serveur"""
+    import queue as queue_module
+    results = []
+    deadline = time.monotonic() + timeout
+    while len(results) < len(processes) and time.monotonic() < deadline:
+        if bench is not None:
+            bench.app.processEvents()
+        try:
+            results.append(result_queue.get(timeout=0.005))
+        except queue_module.Empty:
+            pass
+    for process in processes:
+        process.join(timeout=1)
+    return results
+
+
+def _drain(bench: ServerBench, sent: int, idle: float = 1.0, timeout: float = 30.0) -> None:
+    """Laisse le serveur terminer le traitement (jusqu'à stabilisation des compteurs)"""
+    deadline = time.monotonic() + timeout
+    last, last_change = -1, time.monotonic()
+    while time.monotonic() < deadline:
+        bench.app.processEvents()
+        current = (bench.received(), bench.delivered, bench.pending())
+        if current != last:
+            last, last_change = current, time.monotonic()
+        elif bench.received() >= sent and bench.pending() == 0 or time.monotonic() - last_change >= idle:
+            break
+        time.sleep(0.005)
+    bench.app.processEvents()
+
+
+def build_report(args, source: str, results: List[dict], bench: Optional[ServerBench], wall: float) -> dict:
+    sent = sum(r["sent"] for r in results)
+    send_time = max((r["elapsed"] for r in results), default=0.0)
+    report = {
+        "target": args.target, "transport": args.transport, "source": source,
+        "senders": args.senders, "target_rate": args.rate,
+        "sent": sent, "send_errors": sum(r["errors"] for r in results),
+        "send_rate": sent / send_time if send_time else 0.0,
+        "sender_errors": [r["error"] for r in results if "error" in r],
+        "wall_seconds": wall,
+    }
+    if bench is None:
+        return report
+    received = bench.received()
+    report.update({
+        "processes": args.processes,
+        "received": received,
+        "lost": max(0, sent - received),
+        "loss_percent": (sent - received) * 100 / sent if sent else 0.0,
+        "delivered_to_gui": bench.delivered,
+        "kernel_drops": bench.kernel_drops(),
+        "parse_latency_us": {k: v * 1e6 for k, v in _percentiles(bench.parse_probe.durations).items()}
+        if bench.parse_probe else None,
+        "delivery_latency_ms": {k: v * 1e3 for k, v in _percentiles(bench.latencies).items()},
+        "frame_interval_ms": {k: v * 1e3 for k, v in _percentiles(bench.frame_intervals).items()},
+        "gui_insert_ms": {k: v * 1e3 for k, v in _percentiles(bench.render_times).items()} if bench.table else None,
+        "queue_depth_max": max((depth for _, depth in bench.queue_depth), default=0),
+        # Maximum par seconde écoulée
+        "queue_depth_timeline": _per_second_max(bench.queue_depth),
+    })
+    return report
+
+
+def _per_second_max(samples: List[tuple]) -> List[int]:
+    timeline: List[int] = []
+    for t, depth in samples:
+        second = int(t)
+        while len(timeline) <= second:
+            timeline.append(0)
+        timeline[second] = max(timeline[second], depth)
+    return timeline
+
+
+def print_report(report: dict) -> None:
+    def fmt(values: Optional[dict], unit: str) -> str:
+        if not values:
+            return "n/a"
+        return "  ".join(f"{k}={v:,.2f}{unit}" for k, v in values.items())
+
+    print(f"Banc syslog - cible {report['target']} ({report['transport']}), {report['source']}, "
+          f"{report['senders']} émetteur(s), débit cible {report['target_rate'] or 'max'} msg/s")
+    print(f"  envoyés               : {report['sent']:,} ({report['send_rate']:,.0f} msg/s, "
+          f"{report['send_errors']} erreurs d'émission)")
+    for error in report["sender_errors"]:
+        print(f"  erreur émetteur       : {error}")
+    if "received" not in report:
+        return
+    print(f"  reçus (analysés)      : {report['received']:,}  perdus : {report['lost']:,} "
+          f"({report['loss_percent']:.2f} %)  pertes noyau : {report['kernel_drops']}")
+    print(f"  livrés au GUI         : {report['delivered_to_gui']:,}")
+    print(f"  analyse / message     : {fmt(report['parse_latency_us'], ' µs')}")
+    print(f"  émission -> GUI       : {fmt(report['delivery_latency_ms'], ' ms')}")
+    print(f"  intervalle de trame   : {fmt(report['frame_interval_ms'], ' ms')} (cible 16 ms)")
+    if report["gui_insert_ms"] is not None:
+        print(f"  insertion table / lot : {fmt(report['gui_insert_ms'], ' ms')}")
+    print(f"  file d'attente        : max {report['queue_depth_max']:,} ; par seconde "
+          f"{report['queue_depth_timeline']}")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Générateur de charge et banc de mesure du serveur syslog")
+    parser.add_argument("--target", choices=("server", "worker", "external"), default="server",
+                        help="server : SyslogServer ; worker : SyslogServerWorker ; external : envoi seul")
+    parser.add_argument("--host", default="127.0.0.1", help="Destination (cible external)")
+    parser.add_argument("--port", type=int, default=0, help="Port (0 = port libre choisi automatiquement)")
+    parser.add_argument("--transport", choices=("udp", "tcp"), default="udp")
+    parser.add_argument("--framing", choices=("octet", "lf"), default="octet", help="Tramage TCP (RFC 6587)")
+    parser.add_argument("--rate", type=float, default=10000, help="Débit cible total en msg/s (0 = maximum)")
+    parser.add_argument("--duration", type=float, default=10.0, help="Durée d'émission (s)")
+    parser.add_argument("--count", type=int, default=0, help="Nombre de messages (prioritaire sur --duration)")
+    parser.add_argument("--senders", type=int, default=1, help="Processus émetteurs (ports source distincts)")
+    parser.add_argument("--replay", nargs="+", metavar="FICHIER", help="Fichiers de logs à rejouer (.gz accepté)")
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="mixed", help="Trafic synthétique")
+    parser.add_argument("--processes", type=int, default=0, help="worker_processes du serveur (cible worker)")
+    parser.add_argument("--gui", action="store_true", help="Alimente une table de logs (rendu hors écran)")
+    parser.add_argument("--save-logs", action="store_true", help="Active l'écriture des fichiers (répertoire temporaire)")
+    parser.add_argument("--archive", action="store_true", help="Active l'archive SQLite (répertoire temporaire)")
+    parser.add_argument("--no-parse-probe", action="store_true", help="Ne chronomètre pas l'analyse")
+    parser.add_argument("--json", metavar="FICHIER", help="Écrit le rapport JSON")
+    args = parser.parse_args(argv)
+    args.senders = max(1, args.senders)
+
+    if args.replay:
+        messages = load_replay(args.replay)
+        if not messages:
+            raise SystemExit("Aucun message dans les fichiers à rejouer")
+        source = f"rejeu de {len(messages):,} lignes"
+    else:
+        messages = synthetic_messages(args.profile, 20000)
+        source = f"profil {args.profile}"
+
+    bench = None
+    if args.target == "external":
+        if not args.port:
+            raise SystemExit("--port est requis pour la cible external")
+        port = args.port
+    else:
+        if args.target == "server" and args.processes:
+            raise SystemExit("--processes ne s'applique qu'à la cible worker")
+        os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+        args.host = "127.0.0.1"
+        from PyQt5.QtWidgets import QApplication
+        app = QApplication.instance() or QApplication(sys.argv[:1])
+        port = args.port = args.port or _free_port()
+        bench = ServerBench(args, app)
+        if not args.no_parse_probe and args.processes == 0:
+            bench.parse_probe = ParseProbe()
+            bench.parse_probe.install()
+        bench.start()
+
+    begin = time.perf_counter()
+    processes, result_queue = run_senders(args, messages, port)
+    expected = (args.count / max(1.0, args.rate)) if args.count else args.duration
+    results = _collect(processes, result_queue, bench, timeout=expected * 3 + 60)
+    if bench is not None:
+        _drain(bench, sum(r["sent"] for r in results))
+    wall = time.perf_counter() - begin
+
+    report = build_report(args, source, results, bench, wall)
+    if bench is not None:
+        bench.stop()
+        if bench.parse_probe is not None:
+            bench.parse_probe.uninstall()
+    print_report(report)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    return 0 if not report["sender_errors"] else 1
+
+
+if __name__ == '__main__':
+    multiprocessing.freeze_support()
+    sys.exit(main())
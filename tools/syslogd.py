@@ -0,0 +1,122 @@
+"""Démon syslog sans interface graphique (ni PyQt) : collecte, archive et fichiers par hôte.
+
+Usage :
+    python -m tools.syslogd --port 514 --archive /var/lib/netopskit/syslog
+    python -m tools.syslogd --port 5514 --tcp --archive ./syslog --logs --dedup-window 10 --print
+    python -m tools.syslogd --port 514 --tls-port 6514 --cert server.pem --key server.key --processes 4
+
+Le répertoire d'archive reçoit la base SQLite (syslog_archive.db) interrogeable depuis le GUI
+et, avec --logs, les fichiers texte par hôte.
+"""
+import argparse
+import logging
+import multiprocessing
+import signal
+import sys
+import threading
+
+from worker.syslog_engine import DEFAULT_PORT, SyslogEngine, SyslogEngineConfig
+
+logger = logging.getLogger("syslogd")
+
+
+def build_config(args) -> SyslogEngineConfig:
+    config = SyslogEngineConfig()
+    config.host = args.host
+    config.port = args.port
+    config.worker_processes = args.processes
+    config.recv_socket_buffer = args.recv_buffer
+    config.tcp_enabled = args.tcp
+    config.tcp_port = args.tcp_port or args.port
+    config.tls_enabled = args.tls_port is not None
+    config.tls_port = args.tls_port or 6514
+    config.tls_certfile = args.cert or ""
+    config.tls_keyfile = args.key or ""
+    config.archive_enabled = args.archive is not None
+    config.archive_retention_days = args.retention_days
+    config.save_logs = args.logs
+    if args.archive is not None:
+        config.log_directory = args.archive
+    config.dedup_enabled = args.dedup_window > 0
+    config.dedup_window = args.dedup_window
+    if args.filter_hosts or args.filter_severities or args.filter_keywords:
+        config.filters = dict(config.filters, enabled=True,
+                              hosts=args.filter_hosts or [],
+                              severities=args.filter_severities or [],
+                              keywords=args.filter_keywords or [])
+    return config
+
+
+def _print_messages(rows: list) -> None:
+    write = sys.stdout.write
+    for timestamp, source, facility, severity, message in rows:
+        write(f"{timestamp} {source} <{facility}.{severity}> {message}\n")
+    sys.stdout.flush()
+
+
+def _log_stats(engine: SyslogEngine) -> None:
+    stats = engine.get_stats()
+    details = (f"{stats['message_count']} messages, {stats['rate_1m']:.1f} msg/s (1 min), "
+               f"{len(engine.active_hosts)} hôtes, pertes noyau: {stats['kernel_drops']}")
+    if "dedup" in stats:
+        details += f", répétitions regroupées: {stats['dedup']['suppressed']}"
+    if "archive" in stats:
+        details += f", archivés: {stats['archive']['written']} (perdus: {stats['archive']['dropped']})"
+    logger.info(details)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Collecteur syslog sans interface graphique")
+    parser.add_argument("--host", default="0.0.0.0", help="Adresse d'écoute")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="Port UDP")
+    parser.add_argument("--tcp", action="store_true", help="Écoute TCP (RFC 6587) en plus de l'UDP")
+    parser.add_argument("--tcp-port", type=int, help="Port TCP (par défaut : celui de l'UDP)")
+    parser.add_argument("--tls-port", type=int, help="Active l'écoute TLS sur ce port (RFC 5425)")
+    parser.add_argument("--cert", help="Certificat PEM du serveur (TLS)")
+    parser.add_argument("--key", help="Clé privée PEM (TLS, si absente du certificat)")
+    parser.add_argument("--archive", metavar="REPERTOIRE", help="Répertoire de l'archive SQLite (et des fichiers)")
+    parser.add_argument("--retention-days", type=int, default=30, help="Conservation de l'archive (0 = illimitée)")
+    parser.add_argument("--logs", action="store_true", help="Écrit aussi les fichiers texte par hôte")
+    parser.add_argument("--processes", type=int, default=0, help="Processus de réception (0 = threads)")
+    parser.add_argument("--recv-buffer", type=int, default=4 * 1024 * 1024, help="SO_RCVBUF demandé (octets)")
+    parser.add_argument("--dedup-window", type=float, default=0.0, help="Regroupement des répétitions (s, 0 = non)")
+    parser.add_argument("--filter-hosts", nargs="+", metavar="IP", help="Équipements acceptés (adresses ou CIDR)")
+    parser.add_argument("--filter-severities", nargs="+", type=int, metavar="N", help="Sévérités acceptées")
+    parser.add_argument("--filter-keywords", nargs="+", metavar="MOT", help="Mots-clés (un seul suffit)")
+    parser.add_argument("--print", action="store_true", help="Affiche les messages retenus sur la sortie standard")
+    parser.add_argument("--stats-interval", type=float, default=60.0, help="Période du journal de statistiques (s)")
+    parser.add_argument("--log-level", default="INFO", help="Niveau de journalisation")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=args.log_level.upper(), stream=sys.stderr,
+                        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    if args.tls_port is not None and not args.cert:
+        parser.error("--tls-port nécessite --cert")
+    if args.logs and args.archive is None:
+        parser.error("--logs nécessite --archive (répertoire de destination)")
+
+    config = build_config(args)
+    engine = SyslogEngine(config, on_messages=_print_messages if args.print else None)
+    try:
+        engine.start()
+    except OSError as e:
+        logger.error(f"Impossible d'écouter sur {args.host}:{args.port} : {e}")
+        return 1
+
+    stop_event = threading.Event()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(sig, lambda *_: stop_event.set())
+    try:
+        while not stop_event.wait(args.stats_interval):
+            if not engine.running:
+                break
+            _log_stats(engine)
+    finally:
+        engine.stop()
+        _log_stats(engine)
+    return 0
+
+
+if __name__ == '__main__':
+    multiprocessing.freeze_support()
+    sys.exit(main())
@@ -0,0 +1,580 @@
+"""Banc de débit du serveur TFTP : client local, latence et pertes simulées (sans interface visible).
+
+Lance un TFTPServer dans le processus et y lit (RRQ) ou écrit (WRQ) des fichiers depuis N clients
+simultanés, directement ou à travers un relais UDP qui ajoute latence et pertes, pour chaque
+combinaison sens x taille x blksize x windowsize (RFC 7440) x clients x RTT. Le rapport JSON
+(--json) peut servir de référence à une version suivante (--compare).
+
+Usage :
+    python -m tools.tftp_bench --size 2M --rtt 0 2 10 --windowsize 1 8 32
+    python -m tools.tftp_bench --size 16M --blksize 8192 --rtt 20 --windowsize 1 16 64 --json tftp.json
+    python -m tools.tftp_bench --direction write --size 4M --rtt 0 10 --windowsize 1 16
+    python -m tools.tftp_bench --sweep --json release.json
+    python -m tools.tftp_bench --sweep --compare release.json --tolerance 10
+    python -m tools.tftp_bench --size 32M --clients 1 16 64 --rtt 5 --loss 1 --repeat 3
+"""
+import argparse
+import heapq
+import itertools
+import json
+import logging
+import os
+import platform
+import random
+import selectors
+import shutil
+import socket
+import statistics
+import subprocess
+import tempfile
+import threading
+import time
+import zlib
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+OPCODE_RRQ = 1
+OPCODE_WRQ = 2
+OPCODE_DATA = 3
+OPCODE_ACK = 4
+OPCODE_ERROR = 5
+OPCODE_OACK = 6
+
+
+class TFTPClient:
+    """Client TFTP minimal : lecture et écriture, options blksize / windowsize / tsize (RFC 7440)"""
+
+    def __init__(self, host: str, port: int, blksize: int = 512, windowsize: int = 1,
+                 timeout: float = 2.0, retries: int = 5):
+        self.server = (host, port)
+        self.blksize = blksize
+        self.windowsize = windowsize
+        self.timeout = timeout
+        self.retries = retries
+        self.negotiated: Dict[str, str] = {}
+        self.retransmits = 0
+
+    def _request(self, opcode: int, filename: str, tsize: int) -> bytes:
+        options = {"tsize": str(tsize)}
+        if self.blksize != 512:
+            options["blksize"] = str(self.blksize)
+        if self.windowsize != 1:
+            options["windowsize"] = str(self.windowsize)
+        request = opcode.to_bytes(2, 'big') + filename.encode() + b'\x00octet\x00'
+        for key, value in options.items():
+            request += key.encode() + b'\x00' + value.encode() + b'\x00'
+        return request
+
+    def _socket(self) -> socket.socket:
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 1 << 20)
+        sock.settimeout(self.timeout)
+        return sock
+
+    def download(self, filename: str) -> Tuple[int, int]:
+        """Télécharge `filename` ; retourne (octets reçus, CRC32 du contenu)"""
+        sock = self._socket()
+        try:
+            return self._receive(sock, self._request(OPCODE_RRQ, filename, 0))
+        finally:
+            sock.close()
+
+    def upload(self, filename: str, data: bytes) -> int:
+        """Envoie `data` sous le nom `filename` ; retourne le nombre d'octets envoyés"""
+        sock = self._socket()
+        try:
+            return self._send(sock, self._request(OPCODE_WRQ, filename, len(data)), memoryview(data))
+        finally:
+            sock.close()
+
+    def _send(self, sock: socket.socket, request: bytes, data: memoryview) -> int:
+        blksize, windowsize = 512, 1
+        peer = None
+        sock.sendto(request, self.server)
+        acked = -1       # Dernier bloc acquitté (numérotation absolue) ; -1 : requête sans réponse
+        sent_max = 0
+        total_blocks = 0
+        resent_for = -1  # Position pour laquelle un ACK répété a déjà provoqué un renvoi
+        retries = self.retries
+        # Échéance repoussée seulement par un progrès : les ACK répétés ignorés ne la retardent pas
+        deadline = time.monotonic() + self.timeout
+        while True:
+            try:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise socket.timeout
+                sock.settimeout(remaining)
+                packet, addr = sock.recvfrom(65536)
+            except socket.timeout:
+                retries -= 1
+                if retries < 0:
+                    raise TimeoutError(f"Pas de réponse du serveur (bloc {acked + 1})")
+                self.retransmits += 1
+                deadline = time.monotonic() + self.timeout
+                if acked < 0:
+                    sock.sendto(request, self.server)
+                else:
+                    sent_max = self._send_window(sock, peer, data, acked, blksize, windowsize, total_blocks)
+                continue
+            if peer is None:
+                peer = addr
+            elif addr != peer:
+                continue
+            opcode = int.from_bytes(packet[:2], 'big')
+            if opcode == OPCODE_ERROR:
+                raise RuntimeError(packet[4:].split(b'\x00')[0].decode('utf-8', errors='replace'))
+            if opcode == OPCODE_OACK and acked < 0:
+                parts = packet[2:].split(b'\x00')
+                self.negotiated = {parts[i].decode().lower(): parts[i + 1].decode()
+                                   for i in range(0, len(parts) - 1, 2) if parts[i]}
+                blksize = int(self.negotiated.get("blksize", 512))
+                windowsize = int(self.negotiated.get("windowsize", 1))
+                acked = 0
+            elif opcode == OPCODE_ACK:
+                advance = (int.from_bytes(packet[2:4], 'big') - max(acked, 0)) % 65536
+                if acked < 0 and advance == 0:
+                    acked = 0  # ACK 0 : serveur sans options
+                elif 0 < advance <= sent_max - acked:
+                    acked += advance
+                else:
+                    if advance == 0 and resent_for != acked and sent_max > acked:
+                        # ACK répété par le serveur (bloc perdu) : un seul renvoi de la fenêtre par position
+                        resent_for = acked
+                        self.retransmits += 1
+                        sent_max = self._send_window(sock, peer, data, acked, blksize, windowsize, total_blocks)
+                    continue
+            else:
+                continue
+            retries = self.retries
+            deadline = time.monotonic() + self.timeout
+            total_blocks = len(data) // blksize + 1
+            if acked >= total_blocks:
+                return len(data)
+            sent_max = self._send_window(sock, peer, data, acked, blksize, windowsize, total_blocks)
+
+    @staticmethod
+    def _send_window(sock: socket.socket, peer, data: memoryview, acked: int, blksize: int,
+                     windowsize: int, total_blocks: int) -> int:
+        """Émet les blocs acked+1 .. acked+windowsize ; retourne le dernier bloc émis"""
+        last = min(acked + windowsize, total_blocks)
+        for block in range(acked + 1, last + 1):
+            offset = (block - 1) * blksize
+            sock.sendto(OPCODE_DATA.to_bytes(2, 'big') + (block % 65536).to_bytes(2, 'big')
+                        + data[offset:offset + blksize], peer)
+        return last
+
+    def _receive(self, sock: socket.socket, request: bytes) -> Tuple[int, int]:
+        blksize, windowsize = 512, 1
+        peer = None
+        last_packet = request  # Dernier paquet émis, renvoyé sur timeout
+        sock.sendto(request, self.server)
+        expected = 1  # Prochain bloc attendu (numérotation absolue)
+        in_window = 0
+        gap_acked = -1
+        received = 0
+        crc = 0
+        retries = self.retries
+        # Échéance repoussée seulement par un progrès : doublons et blocs hors séquence ne la retardent pas
+        deadline = time.monotonic() + self.timeout
+        while True:
+            try:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise socket.timeout
+                sock.settimeout(remaining)
+                data, addr = sock.recvfrom(65536)
+            except socket.timeout:
+                retries -= 1
+                if retries < 0:
+                    raise TimeoutError(f"Pas de réponse du serveur (bloc {expected})")
+                self.retransmits += 1
+                deadline = time.monotonic() + self.timeout
+                sock.sendto(last_packet, peer or self.server)
+                continue
+            if peer is None:
+                peer = addr  # TID du transfert
+            elif addr != peer:
+                continue
+            opcode = int.from_bytes(data[:2], 'big')
+            if opcode == OPCODE_ERROR:
+                raise RuntimeError(data[4:].split(b'\x00')[0].decode('utf-8', errors='replace'))
+            if opcode == OPCODE_OACK:
+                if expected != 1:
+                    continue
+                parts = data[2:].split(b'\x00')
+                self.negotiated = {parts[i].decode().lower(): parts[i + 1].decode()
+                                   for i in range(0, len(parts) - 1, 2) if parts[i]}
+                blksize = int(self.negotiated.get("blksize", 512))
+                windowsize = int(self.negotiated.get("windowsize", 1))
+                last_packet = OPCODE_ACK.to_bytes(2, 'big') + b'\x00\x00'
+                sock.sendto(last_packet, peer)
+                retries = self.retries
+                deadline = time.monotonic() + self.timeout
+                continue
+            if opcode != OPCODE_DATA:
+                continue
+
+            offset = (int.from_bytes(data[2:4], 'big') - expected) % 65536
+            if offset:
+                # ACK du dernier bloc reçu dans l'ordre : à chaque doublon (notre ACK a pu se perdre),
+                # une seule fois par trou pour un bloc en avance
+                if offset < 32768:
+                    if gap_acked == expected:
+                        continue
+                    gap_acked = expected
+                last_packet = OPCODE_ACK.to_bytes(2, 'big') + ((expected - 1) % 65536).to_bytes(2, 'big')
+                sock.sendto(last_packet, peer)
+                in_window = 0
+                continue
+            retries = self.retries
+            deadline = time.monotonic() + self.timeout
+            payload = data[4:]
+            received += len(payload)
+            crc = zlib.crc32(payload, crc)
+            in_window += 1
+            last = len(payload) < blksize
+            if last or in_window >= windowsize:
+                last_packet = OPCODE_ACK.to_bytes(2, 'big') + (expected % 65536).to_bytes(2, 'big')
+                sock.sendto(last_packet, peer)
+                in_window = 0
+            expected += 1
+            if last:
+                return received, crc
+
+
+class DelayShim:
+    """Relais UDP ajoutant RTT/2 dans chaque sens (et des pertes aléatoires) entre clients et serveur.
+
+    Les clients s'adressent au relais ; chaque client a son propre socket amont, et les réponses
+    du serveur (port de transfert compris) lui reviennent depuis l'adresse du relais.
+    """
+
+    def __init__(self, server_addr: Tuple[str, int], rtt_ms: float, loss_percent: float = 0.0,
+                 seed: Optional[int] = None):
+        self.server_addr = server_addr
+        self.delay = rtt_ms / 2000.0
+        self.loss = loss_percent / 100.0
+        self._random = random.Random(seed)
+        self.dropped = 0
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4 << 20)
+        self.sock.bind(("127.0.0.1", 0))
+        self.address = self.sock.getsockname()
+        self._upstream: Dict[tuple, socket.socket] = {}  # client -> socket amont
+        self._peers: Dict[socket.socket, list] = {}      # socket amont -> [client, adresse serveur]
+        self._queue: List[tuple] = []                    # (échéance, n°, socket, données, destination)
+        self._seq = itertools.count()
+        self._selector = selectors.DefaultSelector()
+        self._selector.register(self.sock, selectors.EVENT_READ)
+        self._running = False
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self._running = True
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._running = False
+        if self._thread:
+            self._thread.join(timeout=2)
+        for sock in [self.sock, *self._upstream.values()]:
+            sock.close()
+        self._selector.close()
+
+    def _run(self) -> None:
+        # À l'arrêt, les paquets encore en file (dernier ACK du client...) sont tout de même livrés
+        while self._running or self._queue:
+            now = time.perf_counter()
+            while self._queue and self._queue[0][0] <= now:
+                _, _, sock, data, dest = heapq.heappop(self._queue)
+                try:
+                    sock.sendto(data, dest)
+                except OSError:
+                    pass
+            timeout = max(0.0, self._queue[0][0] - now) if self._queue else 0.1
+            for key, _ in self._selector.select(timeout):
+                try:
+                    data, addr = key.fileobj.recvfrom(65536)
+                except OSError:
+                    continue
+                if self.loss and self._random.random() < self.loss:
+                    self.dropped += 1
+                    continue
+                due = time.perf_counter() + self.delay
+                if key.fileobj is self.sock:
+                    upstream = self._upstream.get(addr)
+                    if upstream is None:
+                        upstream = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+                        upstream.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4 << 20)
+                        upstream.bind(("127.0.0.1", 0))
+                        self._upstream[addr] = upstream
+                        self._peers[upstream] = [addr, self.server_addr]
+                        self._selector.register(upstream, selectors.EVENT_READ)
+                    heapq.heappush(self._queue, (due, next(self._seq), upstream, data, self._peers[upstream][1]))
+                else:
+                    peer = self._peers[key.fileobj]
+                    peer[1] = addr  # Le serveur répond depuis son port de transfert
+                    heapq.heappush(self._queue, (due, next(self._seq), self.sock, data, peer[0]))
+
+
+def _parse_size(text: str) -> int:
+    units = {"K": 1024, "M": 1024 ** 2, "G": 1024 ** 3}
+    text = text.strip().upper()
+    if text and text[-1] in units:
+        return int(float(text[:-1]) * units[text[-1]])
+    return int(text)
+
+
+def _free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(root_dir: str, timeout: float, max_sessions: int = 256):
+    """Lance un TFTPServer local dans un thread ; retourne (serveur, thread)"""
+    from views.tftp_server import TFTPServer
+    server = TFTPServer(interface="127.0.0.1", port=_free_port(), block_size=512, root_dir=root_dir, timeout=timeout,
+                        max_sessions=max_sessions)
+    logging.getLogger("TFTPServer").setLevel(logging.WARNING)
+    thread = threading.Thread(target=server.start, daemon=True)
+    thread.start()
+    deadline = time.time() + 5
+    while server.sock is None and time.time() < deadline:
+        time.sleep(0.01)
+    return server, thread
+
+
+def _git_revision() -> str:
+    try:
+        result = subprocess.run(["git", "describe", "--always", "--dirty"], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__)), timeout=5)
+        return result.stdout.strip() or "inconnue"
+    except (OSError, subprocess.SubprocessError):
+        return "inconnue"
+
+
+def case_key(case: dict) -> tuple:
+    """Identifie un cas d'un rapport à l'autre (paramètres demandés, pas les valeurs négociées)"""
+    return (case["direction"], case["size"], case["requested_blksize"], case["requested_windowsize"],
+            case["clients"], case["rtt_ms"], case["loss_percent"])
+
+
+def _transfer(client: "TFTPClient", direction: str, filename: str, payload: bytes, root_dir: str) -> dict:
+    """Un transfert d'un client ; la vérification (taille, CRC32) se fait hors chronométrage"""
+    begin = time.perf_counter()
+    try:
+        if direction == "write":
+            client.upload(filename, payload)
+            elapsed = time.perf_counter() - begin
+            with open(os.path.join(root_dir, filename), "rb") as f:
+                stored = f.read()
+            os.remove(os.path.join(root_dir, filename))
+            received, crc = len(stored), zlib.crc32(stored)
+        else:
+            received, crc = client.download(filename)
+            elapsed = time.perf_counter() - begin
+    except Exception as e:
+        return {"seconds": time.perf_counter() - begin, "bytes": 0, "error": str(e)}
+    if received != len(payload) or crc != zlib.crc32(payload):
+        return {"seconds": elapsed, "bytes": 0,
+                "error": f"contenu incorrect ({received} octets transférés sur {len(payload)})"}
+    return {"seconds": elapsed, "bytes": received, "error": None}
+
+
+def run_case(server_port: int, root_dir: str, direction: str, payload: bytes, rtt_ms: float, loss_percent: float,
+             blksize: int, windowsize: int, clients: int, timeout: float, repeat: int = 1) -> dict:
+    """Exécute un cas `repeat` fois : `clients` transferts simultanés du même fichier (lecture) ou
+    de fichiers distincts (écriture) ; le débit agrégé retenu est la médiane des répétitions"""
+    size = len(payload)
+    walls, retransmits, errors, negotiated, dropped = [], 0, [], {}, 0
+    for _ in range(repeat):
+        shim = None
+        target = ("127.0.0.1", server_port)
+        if rtt_ms > 0 or loss_percent > 0:
+            shim = DelayShim(target, rtt_ms, loss_percent, seed=len(walls))
+            shim.start()
+            target = shim.address
+        tftp_clients = [TFTPClient(target[0], target[1], blksize=blksize, windowsize=windowsize, timeout=timeout)
+                        for _ in range(clients)]
+        results: List[Optional[dict]] = [None] * clients
+        filenames = [f"upload-{i}.bin" if direction == "write" else f"image-{size}.bin" for i in range(clients)]
+
+        def worker(index: int) -> None:
+            results[index] = _transfer(tftp_clients[index], direction, filenames[index], payload, root_dir)
+
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(clients)]
+        begin = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        walls.append(time.perf_counter() - begin)
+        if shim is not None:
+            shim.stop()
+            dropped += shim.dropped
+        retransmits += sum(client.retransmits for client in tftp_clients)
+        errors.extend(result["error"] for result in results if result["error"])
+        negotiated = tftp_clients[0].negotiated or negotiated
+    wall = statistics.median(walls)
+    return {
+        "direction": direction,
+        "size": size,
+        "requested_blksize": blksize,
+        "requested_windowsize": windowsize,
+        "clients": clients,
+        "rtt_ms": rtt_ms,
+        "loss_percent": loss_percent,
+        "blksize": int(negotiated.get("blksize", 512)),
+        "windowsize": int(negotiated.get("windowsize", 1)),
+        "runs": walls,
+        "seconds": wall,
+        "throughput_mb_s": size * clients / wall / (1024 * 1024) if not errors and wall > 0 else 0.0,
+        "client_retransmits": retransmits,
+        "dropped_packets": dropped,
+        "error": errors[0] if errors else None,
+        "errors": len(errors),
+    }
+
+
+def build_report(args, cases: List[dict], server_stats: dict) -> dict:
+    from worker.tftp_engine import MAX_ALLOWED_BLKSIZE
+    return {
+        "date": datetime.now().isoformat(timespec="seconds"),
+        "revision": _git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "max_blksize": MAX_ALLOWED_BLKSIZE,
+        "timeout": args.timeout,
+        "repeat": args.repeat,
+        "server": server_stats,
+        "cases": cases,
+    }
+
+
+def compare_reports(report: dict, baseline: dict, tolerance: float) -> List[dict]:
+    """Écart de débit de chaque cas commun ; `regression` si la baisse dépasse `tolerance` %"""
+    reference = {case_key(case): case for case in baseline.get("cases", [])}
+    deltas = []
+    for case in report["cases"]:
+        before = reference.get(case_key(case))
+        if before is None or not before["throughput_mb_s"]:
+            continue
+        change = (case["throughput_mb_s"] - before["throughput_mb_s"]) * 100 / before["throughput_mb_s"]
+        deltas.append({"key": case_key(case), "before": before["throughput_mb_s"],
+                       "after": case["throughput_mb_s"], "change_percent": change,
+                       "regression": change < -tolerance})
+    return deltas
+
+
+def _requested(requested: int, negotiated: int) -> str:
+    return str(negotiated) if requested == negotiated else f"{requested}>{negotiated}"
+
+
+def print_report(report: dict, deltas: Optional[List[dict]] = None) -> None:
+    print(f"Banc TFTP - révision {report['revision']}, Python {report['python']}, {report['platform']}")
+    print(f"  {'sens':<8} {'taille':>10} {'blksize':>8} {'fenêtre':>8} {'clients':>8} {'RTT (ms)':>9} "
+          f"{'perte %':>8} {'durée (s)':>10} {'débit (Mo/s)':>13} {'renvois':>8}")
+    changes = {delta["key"]: delta for delta in deltas or []}
+    for case in report["cases"]:
+        # « demandée>négociée » quand le serveur a réduit la valeur
+        blksize = _requested(case["requested_blksize"], case["blksize"])
+        windowsize = _requested(case["requested_windowsize"], case["windowsize"])
+        line = (f"  {'lecture' if case['direction'] == 'read' else 'écriture':<8} {case['size']:>10,} "
+                f"{blksize:>8} {windowsize:>8} {case['clients']:>8} {case['rtt_ms']:>9g} "
+                f"{case['loss_percent']:>8g} {case['seconds']:>10.2f} {case['throughput_mb_s']:>13.2f} "
+                f"{case['client_retransmits']:>8}")
+        delta = changes.get(case_key(case))
+        if delta is not None:
+            line += f"  {delta['change_percent']:+.1f}%" + ("  RÉGRESSION" if delta["regression"] else "")
+        if case["error"]:
+            line += f"  ERREUR ({case['errors']}) : {case['error']}"
+        print(line)
+    server = report["server"]
+    print(f"  Serveur : {server['successful_transfers']} transferts réussis, {server['failed_transfers']} échoués, "
+          f"cache d'images {server['image_cache_hit_ratio']:.0%} de succès")
+
+
+# Balayage de référence (--sweep) : 288 cas, une quinzaine de minutes sur une machine de bureau
+SWEEP = {
+    "direction": ["read", "write"],
+    "size": ["256K", "8M"],
+    "blksize": [512, 1428, 8192, 65464],
+    "windowsize": [1, 8, 32],
+    "clients": [1, 8, 32],
+    "rtt": [0, 2],
+}
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Banc de débit du serveur TFTP (RRQ/WRQ, RFC 7440)")
+    parser.add_argument("--direction", choices=("read", "write", "both"), default="read",
+                        help="Lecture (RRQ), écriture (WRQ) ou les deux")
+    parser.add_argument("--upload", action="store_true", help="Équivaut à --direction write")
+    parser.add_argument("--size", nargs="+", default=["2M"], help="Tailles de fichier (suffixes K, M, G)")
+    parser.add_argument("--blksize", type=int, nargs="+", default=[1428], help="blksize demandés (8 à 65464)")
+    parser.add_argument("--windowsize", type=int, nargs="+", default=[1, 8, 32], help="windowsize demandés")
+    parser.add_argument("--clients", type=int, nargs="+", default=[1], help="Clients simultanés")
+    parser.add_argument("--rtt", type=float, nargs="+", default=[0, 2, 10], help="RTT simulés (ms)")
+    parser.add_argument("--loss", type=float, default=0.0, help="Pertes simulées dans chaque sens (%%)")
+    parser.add_argument("--repeat", type=int, default=1, help="Répétitions par cas (médiane retenue)")
+    parser.add_argument("--sweep", action="store_true",
+                        help="Balayage de référence (sens, taille, blksize, fenêtre, clients, RTT prédéfinis)")
+    parser.add_argument("--timeout", type=float, default=2.0, help="Timeout serveur et client (s)")
+    parser.add_argument("--max-sessions", type=int, default=256, help="Transferts simultanés du serveur")
+    parser.add_argument("--json", metavar="FICHIER", help="Écrit le rapport JSON")
+    parser.add_argument("--compare", metavar="FICHIER", help="Rapport JSON de référence à comparer")
+    parser.add_argument("--tolerance", type=float, default=10.0, help="Baisse de débit tolérée avec --compare (%%)")
+    args = parser.parse_args(argv)
+
+    directions = ["read", "write"] if args.direction == "both" else ["write" if args.upload else args.direction]
+    sizes, blksizes, windowsizes, client_counts, rtts = args.size, args.blksize, args.windowsize, args.clients, args.rtt
+    if args.sweep:
+        directions, sizes, blksizes = SWEEP["direction"], SWEEP["size"], SWEEP["blksize"]
+        windowsizes, client_counts, rtts = SWEEP["windowsize"], SWEEP["clients"], SWEEP["rtt"]
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    root_dir = tempfile.mkdtemp(prefix="tftp_bench_")
+    payloads = {}
+    for size in sorted({_parse_size(text) for text in sizes}):
+        payloads[size] = os.urandom(size)
+        with open(os.path.join(root_dir, f"image-{size}.bin"), "wb") as f:
+            f.write(payloads[size])
+
+    server, thread = start_server(root_dir, args.timeout, args.max_sessions)
+    try:
+        cases = []
+        for direction, size, blksize, windowsize, clients, rtt in itertools.product(
+                directions, payloads, blksizes, windowsizes, client_counts, rtts):
+            cases.append(run_case(server.port, root_dir, direction, payloads[size], rtt, args.loss,
+                                  blksize, windowsize, clients, args.timeout, args.repeat))
+        status = server.get_status()
+    finally:
+        server.stop()
+        thread.join(timeout=2)
+        shutil.rmtree(root_dir, ignore_errors=True)
+
+    report = build_report(args, cases, {
+        "successful_transfers": status["statistics"]["successful_transfers"],
+        "failed_transfers": status["statistics"]["failed_transfers"],
+        "image_cache_hit_ratio": status["image_cache"]["hit_ratio"],
+    })
+    deltas = compare_reports(report, baseline, args.tolerance) if baseline is not None else None
+    if deltas is not None:
+        report["comparison"] = {"baseline_revision": baseline.get("revision"), "tolerance_percent": args.tolerance,
+                                "cases": [dict(delta, key=list(delta["key"])) for delta in deltas]}
+    print_report(report, deltas)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    if any(case["error"] for case in cases):
+        return 1
+    return 2 if deltas and any(delta["regression"] for delta in deltas) else 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
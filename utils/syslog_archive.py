@@ -0,0 +1,280 @@
+import os
+import queue
+import sqlite3
+import threading
+import time
+import logging
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger("SyslogArchive")
+
+# (received_at, host, source, facility, severity, app, mnemonic, message)
+ArchiveRow = Tuple[float, str, str, int, int, Optional[str], Optional[str], str]
+# (id, received_at, host, source, facility, severity, app, mnemonic, message)
+ArchivedMessage = Tuple[int, float, str, str, int, int, Optional[str], Optional[str], str]
+# Curseur de pagination : (received_at, id) du dernier message de la page précédente
+PageCursor = Tuple[float, int]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS messages (
+    id          INTEGER PRIMARY KEY,
+    received_at REAL    NOT NULL,
+    host        TEXT    NOT NULL,
+    source      TEXT    NOT NULL,
+    facility    INTEGER NOT NULL,
+    severity    INTEGER NOT NULL,
+    app         TEXT,
+    mnemonic    TEXT,
+    message     TEXT    NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_messages_time     ON messages(received_at);
+CREATE INDEX IF NOT EXISTS idx_messages_host     ON messages(host, received_at);
+CREATE INDEX IF NOT EXISTS idx_messages_facility ON messages(facility, received_at);
+CREATE INDEX IF NOT EXISTS idx_messages_severity ON messages(severity, received_at);
+"""
+
+_INSERT = ("INSERT INTO messages (received_at, host, source, facility, severity, app, mnemonic, message) "
+           "VALUES (?, ?, ?, ?, ?, ?, ?, ?)")
+
+
+class SyslogArchive:
+    """Archive SQLite (mode WAL) des messages syslog.
+
+    Les messages sont mis en file par les threads de réception puis écrits par un thread
+    dédié en transactions groupées ; les requêtes (pagination par curseur) utilisent une
+    connexion de lecture séparée et ne bloquent pas l'écriture.
+    """
+
+    def __init__(self, db_path: str, batch_size: int = 1000, flush_interval: float = 0.5,
+                 max_queue: int = 200000, retention_days: int = 0):
+        """
+        Args:
+            db_path (str): Chemin du fichier SQLite
+            batch_size (int): Nombre maximal de messages par transaction
+            flush_interval (float): Délai maximal (s) avant l'écriture d'un lot incomplet
+            max_queue (int): Taille maximale de la file d'écriture (au-delà, les messages sont comptés perdus)
+            retention_days (int): Durée de conservation en jours (0 = illimitée)
+        """
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.retention_days = retention_days
+        self._queue: "queue.Queue[Optional[ArchiveRow]]" = queue.Queue(maxsize=max_queue)
+        self._writer: Optional[threading.Thread] = None
+        self._read_conn: Optional[sqlite3.Connection] = None
+        self._read_lock = threading.Lock()
+        self.running = False
+        self.written = 0
+        self.dropped = 0
+
+        directory = os.path.dirname(os.path.abspath(db_path))
+        os.makedirs(directory, exist_ok=True)
+        conn = self._connect()
+        try:
+            conn.executescript(_SCHEMA)
+        finally:
+            conn.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=10, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    # --- Écriture ---
+    def start(self) -> None:
+        if self.running:
+            return
+        self.running = True
+        self._writer = threading.Thread(target=self._write_loop, name="SyslogArchiveWriter", daemon=True)
+        self._writer.start()
+
+    def stop(self) -> None:
+        """Arrête le thread d'écriture après avoir vidé la file"""
+        if not self.running:
+            return
+        self.running = False
+        self._queue.put(None)  # Réveille le thread d'écriture
+        if self._writer:
+            self._writer.join(timeout=10)
+        self.close()
+
+    def close(self) -> None:
+        """Ferme la connexion de lecture (rouverte à la prochaine requête)"""
+        with self._read_lock:
+            if self._read_conn is not None:
+                self._read_conn.close()
+                self._read_conn = None
+
+    def append(self, row: ArchiveRow) -> None:
+        """Met un message en file d'écriture (appelable depuis tout thread, non bloquant)"""
+        try:
+            self._queue.put_nowait(row)
+        except queue.Full:
+            self.dropped += 1
+
+    def append_many(self, rows: Iterable[ArchiveRow]) -> None:
+        for row in rows:
+            self.append(row)
+
+    def _drain(self, limit: int) -> Tuple[List[ArchiveRow], bool]:
+        """Récupère sans attendre jusqu'à `limit` messages ; indique si l'arrêt a été demandé"""
+        batch, stopping = [], False
+        while len(batch) < limit:
+            try:
+                row = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if row is None:
+                stopping = True
+            else:
+                batch.append(row)
+        return batch, stopping
+
+    def _write_loop(self) -> None:
+        conn = self._connect()
+        last_purge = 0.0
+        try:
+            while True:
+                try:
+                    first = self._queue.get(timeout=self.flush_interval)
+                except queue.Empty:
+                    first = ()
+                stopping = first is None
+                # Regroupe tout ce qui est déjà en file dans la même transaction
+                batch, stop_requested = self._drain(self.batch_size)
+                if first:
+                    batch.insert(0, first)
+                if batch:
+                    self._write_batch(conn, batch)
+                if stopping or stop_requested:
+                    while True:
+                        batch, _ = self._drain(self.batch_size)
+                        if not batch:
+                            break
+                        self._write_batch(conn, batch)
+                    break
+
+                now = time.time()
+                if self.retention_days > 0 and now - last_purge >= 3600:
+                    self._purge(conn, now - self.retention_days * 86400)
+                    last_purge = now
+        except Exception as e:
+            logger.error(f"Erreur du thread d'écriture de l'archive: {e}")
+        finally:
+            conn.close()
+
+    def _write_batch(self, conn: sqlite3.Connection, batch: List[ArchiveRow]) -> None:
+        try:
+            with conn:
+                conn.executemany(_INSERT, batch)
+            self.written += len(batch)
+        except sqlite3.Error as e:
+            logger.error(f"Erreur d'écriture de {len(batch)} messages dans l'archive: {e}")
+            self.dropped += len(batch)
+
+    def _purge(self, conn: sqlite3.Connection, older_than: float) -> None:
+        try:
+            with conn:
+                deleted = conn.execute("DELETE FROM messages WHERE received_at < ?", (older_than,)).rowcount
+            if deleted:
+                logger.info(f"Archive syslog : {deleted} messages expirés supprimés")
+        except sqlite3.Error as e:
+            logger.error(f"Erreur lors de la purge de l'archive: {e}")
+
+    # --- Lecture ---
+    @staticmethod
+    def _build_where(start: Optional[float], end: Optional[float], hosts: Optional[Iterable[str]],
+                     facilities: Optional[Iterable[int]], severities: Optional[Iterable[int]],
+                     text: Optional[str]) -> Tuple[List[str], list]:
+        clauses, params = [], []
+        if start is not None:
+            clauses.append("received_at >= ?")
+            params.append(start)
+        if end is not None:
+            clauses.append("received_at < ?")
+            params.append(end)
+        for column, values in (("host", hosts), ("facility", facilities), ("severity", severities)):
+            if values:
+                values = list(values)
+                clauses.append(f"{column} IN ({','.join('?' * len(values))})")
+                params.extend(values)
+        if text:
+            clauses.append("message LIKE ? ESCAPE '\\'")
+            escaped = text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+            params.append(f"%{escaped}%")
+        return clauses, params
+
+    def _execute_read(self, sql: str, params: list) -> list:
+        with self._read_lock:
+            if self._read_conn is None:
+                self._read_conn = self._connect()
+            return self._read_conn.execute(sql, params).fetchall()
+
+    def query(self, start: Optional[float] = None, end: Optional[float] = None,
+              hosts: Optional[Iterable[str]] = None, facilities: Optional[Iterable[int]] = None,
+              severities: Optional[Iterable[int]] = None, text: Optional[str] = None,
+              limit: int = 200, before: Optional[PageCursor] = None) -> List[ArchivedMessage]:
+        """
+        Retourne une page de messages, du plus récent au plus ancien.
+
+        Args:
+            start, end (float): Bornes temporelles (epoch) [start, end[
+            hosts, facilities, severities: Valeurs acceptées (None = toutes)
+            text (str): Sous-chaîne recherchée dans le message
+            limit (int): Taille de la page
+            before (PageCursor): Curseur renvoyé par next_cursor() pour obtenir la page suivante
+
+        Returns:
+            Liste de tuples (id, received_at, host, source, facility, severity, app, mnemonic, message)
+        """
+        clauses, params = self._build_where(start, end, hosts, facilities, severities, text)
+        if before is not None:
+            clauses.append("(received_at, id) < (?, ?)")
+            params.extend(before)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        sql = (f"SELECT id, received_at, host, source, facility, severity, app, mnemonic, message "
+               f"FROM messages {where} ORDER BY received_at DESC, id DESC LIMIT ?")
+        return self._execute_read(sql, params + [limit])
+
+    @staticmethod
+    def next_cursor(page: List[ArchivedMessage]) -> Optional[PageCursor]:
+        """Curseur permettant de demander la page suivant `page` (None si la page est vide)"""
+        if not page:
+            return None
+        last = page[-1]
+        return last[1], last[0]
+
+    def iter_chunks(self, start: Optional[float] = None, end: Optional[float] = None,
+                    hosts: Optional[Iterable[str]] = None, facilities: Optional[Iterable[int]] = None,
+                    severities: Optional[Iterable[int]] = None, text: Optional[str] = None,
+                    chunk_size: int = 5000) -> Iterator[List[ArchivedMessage]]:
+        """Parcourt les messages du plus ancien au plus récent, par blocs (pagination par curseur)"""
+        clauses, params = self._build_where(start, end, hosts, facilities, severities, text)
+        after: Optional[PageCursor] = None
+        while True:
+            page_clauses, page_params = list(clauses), list(params)
+            if after is not None:
+                page_clauses.append("(received_at, id) > (?, ?)")
+                page_params.extend(after)
+            where = f"WHERE {' AND '.join(page_clauses)}" if page_clauses else ""
+            sql = (f"SELECT id, received_at, host, source, facility, severity, app, mnemonic, message "
+                   f"FROM messages {where} ORDER BY received_at, id LIMIT ?")
+            chunk = self._execute_read(sql, page_params + [chunk_size])
+            if not chunk:
+                return
+            yield chunk
+            if len(chunk) < chunk_size:
+                return
+            after = self.next_cursor(chunk)
+
+    def count(self, start: Optional[float] = None, end: Optional[float] = None,
+              hosts: Optional[Iterable[str]] = None, facilities: Optional[Iterable[int]] = None,
+              severities: Optional[Iterable[int]] = None, text: Optional[str] = None) -> int:
+        clauses, params = self._build_where(start, end, hosts, facilities, severities, text)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        return self._execute_read(f"SELECT COUNT(*) FROM messages {where}", params)[0][0]
+
+    def hosts(self) -> List[str]:
+        """Liste des hôtes présents dans l'archive"""
+        return [row[0] for row in self._execute_read("SELECT DISTINCT host FROM messages ORDER BY host", [])]
@@ -0,0 +1,111 @@
+import re
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, List, Optional, Tuple
+
+# Parties variables d'une répétition : numéro de séquence Cisco, dates et heures
+_VOLATILE = re.compile(
+    r'^\d+: '
+    r'|\*?(?:[A-Z][a-z]{2} [ \d]?\d(?: \d{4})? )?\d\d:\d\d:\d\d(?:\.\d+)?(?: ?[A-Z]{3,5}\b)?:?'
+    r'|\d{4}-\d\d-\d\d(?:[T ]\d\d:\d\d:\d\d(?:\.\d+)?(?:Z|[+-]\d\d:?\d\d)?)?'
+)
+_SPACES = re.compile(r'\s+')
+
+# (timestamp, source, facility, severity, message) : ligne affichée
+DisplayRow = Tuple[str, str, int, int, str]
+
+
+def dedup_key(host: str, mnemonic: Optional[str], text: str) -> tuple:
+    """Clé de regroupement : hôte, mnémonique et texte sans horodatages ni numéro de séquence"""
+    return host, mnemonic, _SPACES.sub(" ", _VOLATILE.sub("", text)).strip()
+
+
+class _Group:
+    __slots__ = ("extra", "first_seen", "last_seen", "last_row", "repeats")
+
+    def __init__(self, row: DisplayRow, extra: Any, now: float):
+        self.extra = extra
+        self.first_seen = now
+        self.last_seen = now
+        self.last_row = row
+        self.repeats = 0  # Occurrences absorbées (hors première)
+
+
+class SyslogDeduplicator:
+    """Regroupement des messages identiques (rafales, interfaces instables).
+
+    La première occurrence d'une clé est transmise immédiatement ; les suivantes, pendant
+    `window` secondes, sont seulement comptées. À la fermeture de la fenêtre, une ligne de
+    synthèse (nombre de répétitions, première et dernière heure) est produite s'il y en a eu.
+    Thread-safe : partagé par les réceptions UDP et TCP.
+    """
+
+    def __init__(self, window: float = 5.0, max_groups: int = 10000):
+        """
+        Args:
+            window (float): Durée (s) d'une fenêtre de regroupement à partir de la première occurrence
+            max_groups (int): Groupes ouverts au maximum (au-delà, les plus anciens sont fermés)
+        """
+        self.window = window
+        self.max_groups = max_groups
+        self._groups: "OrderedDict[tuple, _Group]" = OrderedDict()  # Ordre d'ouverture
+        self._closed: List[Tuple[DisplayRow, Any]] = []  # Synthèses en attente de expire()
+        self._lock = threading.Lock()
+        self.unique = 0
+        self.suppressed = 0
+
+    def offer(self, key: tuple, row: DisplayRow, now: float, extra: Any = None) -> bool:
+        """Enregistre un message ; retourne True s'il doit être transmis (première occurrence)"""
+        with self._lock:
+            group = self._groups.get(key)
+            if group is not None and now - group.first_seen < self.window:
+                group.repeats += 1
+                group.last_seen = now
+                group.last_row = row
+                self.suppressed += 1
+                return False
+            if group is not None:
+                # Fenêtre échue mais pas encore fermée par expire() : on la ferme ici
+                del self._groups[key]
+                if group.repeats:
+                    self._closed.append((self._summary(group), group.extra))
+            self._groups[key] = _Group(row, extra, now)
+            self.unique += 1
+            return True
+
+    def expire(self, now: float) -> List[Tuple[DisplayRow, Any]]:
+        """Ferme les fenêtres échues ; retourne les lignes de synthèse (ligne, extra)"""
+        with self._lock:
+            summaries, self._closed = self._closed, []
+            groups = self._groups
+            while groups:
+                key, group = next(iter(groups.items()))
+                if now - group.first_seen < self.window and len(groups) <= self.max_groups:
+                    break
+                del groups[key]
+                if group.repeats:
+                    summaries.append((self._summary(group), group.extra))
+        return summaries
+
+    def flush(self) -> List[Tuple[DisplayRow, Any]]:
+        """Ferme toutes les fenêtres (arrêt du serveur)"""
+        return self.expire(float("inf"))
+
+    @staticmethod
+    def _summary(group: _Group) -> DisplayRow:
+        timestamp, source, facility, severity, message = group.last_row
+        first = datetime.fromtimestamp(group.first_seen).strftime("%H:%M:%S")
+        last = datetime.fromtimestamp(group.last_seen).strftime("%H:%M:%S")
+        return (timestamp, source, facility, severity,
+                f"{message} [répété {group.repeats} fois de plus entre {first} et {last}]")
+
+    def get_metrics(self) -> dict:
+        with self._lock:
+            total = self.unique + self.suppressed
+            return {
+                "unique": self.unique,
+                "suppressed": self.suppressed,
+                "open_groups": len(self._groups),
+                "ratio": self.suppressed / total if total else 0.0,
+            }
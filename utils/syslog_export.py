@@ -0,0 +1,161 @@
+import os
+import csv
+import gzip
+import json
+import logging
+from datetime import datetime
+from typing import Callable, Iterable, List, Optional, Tuple
+
+from utils.syslog_parser import FACILITY_NAMES, SEVERITY_NAMES, source_host
+
+logger = logging.getLogger("SyslogExport")
+
+FORMAT_CSV = "csv"
+FORMAT_JSONL = "jsonl"
+FORMAT_TEXT = "txt"
+EXPORT_FORMATS = (FORMAT_CSV, FORMAT_JSONL, FORMAT_TEXT)
+
+HEADERS = ["Timestamp", "Host", "Source", "Facility", "Severity", "Message"]
+
+# (timestamp "YYYY-mm-dd HH:MM:SS", "ip:port", facility, severity, message) : format du tampon d'affichage
+BufferRow = Tuple[str, str, int, int, str]
+
+
+class ExportCanceled(Exception):
+    """Export interrompu à la demande de l'utilisateur"""
+
+
+def archive_to_rows(chunks: Iterable[list]) -> Iterable[List[BufferRow]]:
+    """Convertit les blocs de SyslogArchive.iter_chunks() au format du tampon d'affichage"""
+    last_epoch, last_text = None, ""
+    for chunk in chunks:
+        rows = []
+        for _, received_at, _, source, facility, severity, _, _, message in chunk:
+            epoch = int(received_at)
+            if epoch != last_epoch:  # Messages d'une même seconde : une seule conversion
+                last_epoch, last_text = epoch, datetime.fromtimestamp(epoch).strftime("%Y-%m-%d %H:%M:%S")
+            rows.append((last_text, source, facility, severity, message))
+        yield rows
+
+
+def select_rows(rows: List[BufferRow], start: Optional[float] = None, end: Optional[float] = None,
+                hosts: Optional[Iterable[str]] = None, severities: Optional[Iterable[int]] = None,
+                chunk_size: int = 5000) -> Iterable[List[BufferRow]]:
+    """Sélection (période [start, end[, hôtes, sévérités) dans un instantané du tampon, par blocs"""
+    # Les horodatages "YYYY-mm-dd HH:MM:SS" se comparent directement comme des chaînes
+    start_text = datetime.fromtimestamp(start).strftime("%Y-%m-%d %H:%M:%S") if start is not None else None
+    end_text = datetime.fromtimestamp(end).strftime("%Y-%m-%d %H:%M:%S") if end is not None else None
+    host_set = set(hosts) if hosts else None
+    severity_set = set(severities) if severities is not None else None
+    for offset in range(0, len(rows), chunk_size):
+        selected = []
+        for row in rows[offset:offset + chunk_size]:
+            if start_text is not None and row[0] < start_text:
+                continue
+            if end_text is not None and row[0] >= end_text:
+                continue
+            if host_set is not None and source_host(row[1]) not in host_set:
+                continue
+            if severity_set is not None and row[3] not in severity_set:
+                continue
+            selected.append(row)
+        yield selected
+
+
+class SyslogExporter:
+    """Écriture en flux d'un export syslog (CSV, JSON Lines ou texte, compressé en gzip si demandé).
+
+    Le fichier est écrit sous un nom temporaire puis renommé : un export annulé ou en erreur
+    ne laisse jamais de fichier partiel à la place de la destination.
+    """
+
+    def __init__(self, path: str, export_format: str = FORMAT_CSV, compress: Optional[bool] = None):
+        """
+        Args:
+            path (str): Fichier de destination
+            export_format (str): FORMAT_CSV, FORMAT_JSONL ou FORMAT_TEXT
+            compress (bool): Compression gzip (None = selon l'extension .gz)
+        """
+        if export_format not in EXPORT_FORMATS:
+            raise ValueError(f"Format d'export inconnu: {export_format}")
+        self.path = path
+        self.export_format = export_format
+        self.compress = path.lower().endswith(".gz") if compress is None else compress
+        self.exported = 0
+
+    def _open(self, path: str):
+        if self.compress:
+            return gzip.open(path, "wt", encoding="utf-8", newline="", compresslevel=6)
+        return open(path, "w", encoding="utf-8", newline="")
+
+    def export(self, chunks: Iterable[List[BufferRow]],
+               progress: Optional[Callable[[int], None]] = None,
+               is_canceled: Optional[Callable[[], bool]] = None) -> int:
+        """
+        Écrit les blocs de messages et retourne le nombre de messages exportés.
+
+        Args:
+            chunks: Blocs de lignes au format BufferRow
+            progress: Appelé après chaque bloc avec le nombre de messages déjà exportés
+            is_canceled: Consulté entre les blocs ; lève ExportCanceled s'il retourne True
+        """
+        temp_path = f"{self.path}.part"
+        self.exported = 0
+        try:
+            with self._open(temp_path) as f:
+                write_rows = self._writer(f)
+                for chunk in chunks:
+                    if is_canceled is not None and is_canceled():
+                        raise ExportCanceled()
+                    if chunk:
+                        write_rows(chunk)
+                        self.exported += len(chunk)
+                    if progress is not None:
+                        progress(self.exported)
+            os.replace(temp_path, self.path)
+        except BaseException:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            raise
+        logger.info(f"Export syslog terminé : {self.exported} messages vers {self.path}")
+        return self.exported
+
+    def _writer(self, f) -> Callable[[List[BufferRow]], None]:
+        facility_name = FACILITY_NAMES.get
+        severity_name = SEVERITY_NAMES.get
+
+        if self.export_format == FORMAT_CSV:
+            writer = csv.writer(f, quoting=csv.QUOTE_ALL, lineterminator="\n")
+            writer.writerow(HEADERS)
+
+            def write_rows(rows):
+                writer.writerows(
+                    (timestamp, source_host(source), source,
+                     facility_name(facility, facility), severity_name(severity, severity), message)
+                    for timestamp, source, facility, severity, message in rows
+                )
+        elif self.export_format == FORMAT_JSONL:
+            dumps = json.dumps
+
+            def write_rows(rows):
+                f.write("".join(
+                    dumps({"timestamp": timestamp, "host": source_host(source), "source": source,
+                           "facility": facility, "severity": severity, "message": message},
+                          ensure_ascii=False) + "\n"
+                    for timestamp, source, facility, severity, message in rows
+                ))
+        else:
+            # Format texte historique de l'export (colonnes séparées par des tabulations)
+            f.write("\t".join(HEADERS) + "\n")
+            f.write("-" * 100 + "\n")
+
+            def write_rows(rows):
+                f.write("".join(
+                    f"{timestamp}\t{source_host(source)}\t{source}\t{facility_name(facility, facility)}\t"
+                    f"{severity_name(severity, severity)}\t{message}\n"
+                    for timestamp, source, facility, severity, message in rows
+                ))
+
+        return write_rows
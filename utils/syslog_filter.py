@@ -0,0 +1,144 @@
+import re
+import ipaddress
+import logging
+from typing import Dict, FrozenSet, Iterable, List, Optional, Pattern, Tuple
+
+logger = logging.getLogger("SyslogFilter")
+
+# Nombre maximal d'adresses dont le résultat CIDR est mémorisé
+_NETWORK_CACHE_SIZE = 4096
+
+
+def _trie_pattern(node: dict) -> str:
+    """Expression d'un nœud du trie : les préfixes communs ne sont testés qu'une fois"""
+    if "" in node:
+        return ""  # Un mot-clé se termine ici : la suite ne change pas le résultat
+    alternatives = [re.escape(char) + _trie_pattern(child) for char, child in sorted(node.items())]
+    if len(alternatives) == 1:
+        return alternatives[0]
+    return "(?:" + "|".join(alternatives) + ")"
+
+
+def compile_keywords(keywords: Iterable[str]) -> Optional[Pattern]:
+    """
+    Compile une liste de mots-clés en une seule expression factorisée en trie.
+
+    L'expression est à appliquer au message converti en minuscules : c'est nettement plus
+    rapide que re.IGNORECASE sur une longue alternative.
+    """
+    root: dict = {}
+    for keyword in keywords:
+        keyword = keyword.strip().lower() if keyword else ""
+        if not keyword:
+            continue
+        node = root
+        for char in keyword:
+            node = node.setdefault(char, {})
+        node.clear()  # Les mots-clés plus longs de même préfixe sont redondants
+        node[""] = {}
+    if not root:
+        return None
+    return re.compile(_trie_pattern(root))
+
+
+class SyslogFilter:
+    """Filtre compilé à partir du dictionnaire ServerConfig.filters.
+
+    Les listes sont converties en frozensets, les hôtes peuvent être des adresses ou des
+    réseaux CIDR, et les mots-clés sont réunis en une seule expression factorisée en trie.
+    Une instance est immuable : pour changer les filtres, on en compile une nouvelle et on
+    remplace la référence (remplacement atomique vis-à-vis des threads de réception).
+    """
+    __slots__ = ("enabled", "hosts", "networks", "facilities", "severities", "keywords",
+                 "patterns", "_network_cache")
+
+    def __init__(self, enabled: bool = False, hosts: FrozenSet[str] = frozenset(),
+                 networks: Tuple = (), facilities: FrozenSet[int] = frozenset(),
+                 severities: FrozenSet[int] = frozenset(), keywords: Optional[Pattern] = None,
+                 patterns: Tuple[Pattern, ...] = ()):
+        self.enabled = enabled
+        self.hosts = hosts
+        self.networks = networks
+        self.facilities = facilities
+        self.severities = severities
+        self.keywords = keywords
+        self.patterns = patterns
+        self._network_cache: Dict[str, bool] = {}
+
+    @classmethod
+    def compile(cls, filters: Optional[dict]) -> "SyslogFilter":
+        """
+        Construit un filtre à partir de la configuration.
+
+        Args:
+            filters (dict): {"enabled", "hosts", "facilities", "severities", "keywords", "patterns"}
+                "hosts" accepte des adresses IP et des réseaux CIDR (ex: 10.0.0.0/8),
+                "patterns" des expressions régulières (insensibles à la casse).
+                Un message est retenu si un mot-clé OU une expression correspond.
+        """
+        filters = filters or {}
+        if not filters.get("enabled"):
+            return cls()
+
+        hosts, networks = set(), []
+        for entry in filters.get("hosts") or []:
+            entry = str(entry).strip()
+            if not entry:
+                continue
+            if "/" in entry:
+                try:
+                    networks.append(ipaddress.ip_network(entry, strict=False))
+                    continue
+                except ValueError:
+                    logger.warning(f"Réseau invalide ignoré dans les filtres: {entry}")
+            hosts.add(entry)
+
+        patterns: List[Pattern] = []
+        for pattern in filters.get("patterns") or []:
+            try:
+                patterns.append(re.compile(pattern, re.IGNORECASE))
+            except re.error as e:
+                logger.warning(f"Expression régulière invalide ignorée ({pattern}): {e}")
+
+        return cls(
+            enabled=True,
+            hosts=frozenset(hosts),
+            networks=tuple(networks),
+            facilities=frozenset(int(f) for f in filters.get("facilities") or []),
+            severities=frozenset(int(s) for s in filters.get("severities") or []),
+            keywords=compile_keywords(filters.get("keywords") or []),
+            patterns=tuple(patterns),
+        )
+
+    def _host_allowed(self, host: str) -> bool:
+        if host in self.hosts:
+            return True
+        if not self.networks:
+            return False
+        allowed = self._network_cache.get(host)
+        if allowed is None:
+            try:
+                address = ipaddress.ip_address(host)
+                allowed = any(address in network for network in self.networks)
+            except ValueError:
+                allowed = False
+            if len(self._network_cache) >= _NETWORK_CACHE_SIZE:
+                self._network_cache.clear()
+            self._network_cache[host] = allowed
+        return allowed
+
+    def matches(self, host: str, facility: int, severity: int, message: str) -> bool:
+        """Indique si le message doit être traité"""
+        if not self.enabled:
+            return True
+        if (self.hosts or self.networks) and not self._host_allowed(host):
+            return False
+        if self.facilities and facility not in self.facilities:
+            return False
+        if self.severities and severity not in self.severities:
+            return False
+        if self.keywords is not None or self.patterns:
+            if self.keywords is not None and self.keywords.search(message.lower()):
+                return True
+            return any(pattern.search(message) for pattern in self.patterns)
+        return True
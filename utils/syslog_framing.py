@@ -0,0 +1,89 @@
+from typing import List
+
+# Nombre maximal de chiffres du préfixe de longueur (RFC 6587 : MSG-LEN sans zéro initial)
+_MAX_LENGTH_DIGITS = 10
+
+
+class SyslogStreamDecoder:
+    """Découpage d'un flux TCP syslog en messages (RFC 6587).
+
+    Chaque trame est détectée indépendamment : un préfixe numérique suivi d'un espace signale
+    le comptage d'octets ("LEN SP MSG"), sinon le message se termine au saut de ligne
+    (trames non transparentes, CR et NUL finaux retirés). Une trame plus longue que
+    max_message_size est tronquée et le reste ignoré jusqu'au saut de ligne suivant.
+    """
+
+    def __init__(self, max_message_size: int = 64 * 1024):
+        self.max_message_size = max_message_size
+        self._buffer = bytearray()
+        self._discarding = False  # Reste d'une trame tronquée à ignorer jusqu'au saut de ligne
+        self.truncated = 0  # Messages tronqués (trop longs ou longueur invalide)
+
+    def feed(self, data: bytes) -> List[bytes]:
+        """Ajoute des octets reçus et retourne les messages complets"""
+        buffer = self._buffer
+        buffer += data
+        messages: List[bytes] = []
+        size = len(buffer)
+        pos = 0
+        limit = self.max_message_size
+        while pos < size:
+            if self._discarding:
+                newline = buffer.find(b"\n", pos)
+                if newline == -1:
+                    pos = size
+                    break
+                self._discarding = False
+                pos = newline + 1
+                continue
+            first = buffer[pos]
+            if first in (0x0A, 0x0D, 0x00, 0x20):  # Délimiteurs résiduels entre trames
+                pos += 1
+                continue
+            if 0x31 <= first <= 0x39:  # Chiffre non nul : comptage d'octets probable
+                space = buffer.find(b" ", pos, pos + _MAX_LENGTH_DIGITS + 1)
+                if space == -1 and size - pos <= _MAX_LENGTH_DIGITS:
+                    break  # Préfixe incomplet
+                if space != -1 and buffer[pos:space].isdigit():
+                    length = int(buffer[pos:space])
+                    start = space + 1
+                    if length > limit:
+                        # Longueur aberrante : on ne peut pas se resynchroniser, on bascule sur LF
+                        self.truncated += 1
+                    else:
+                        end = start + length
+                        if end > size:
+                            break  # Message incomplet
+                        messages.append(bytes(buffer[start:end]))
+                        pos = end
+                        continue
+            # Trame non transparente : jusqu'au saut de ligne
+            newline = buffer.find(b"\n", pos)
+            if newline == -1:
+                if size - pos > limit:
+                    messages.append(bytes(buffer[pos:pos + limit]))
+                    self.truncated += 1
+                    self._discarding = True
+                    pos += limit
+                    continue
+                break
+            if newline - pos > limit:
+                messages.append(bytes(buffer[pos:pos + limit]))
+                self.truncated += 1
+                pos = newline + 1
+                continue
+            messages.append(bytes(buffer[pos:newline]).rstrip(b"\r\x00"))
+            pos = newline + 1
+        if pos:
+            del buffer[:pos]
+        return messages
+
+    def flush(self) -> List[bytes]:
+        """Retourne le dernier message sans délimiteur (fermeture de la connexion)"""
+        remaining = b"" if self._discarding else bytes(self._buffer).strip(b"\r\n\x00 ")
+        self._buffer.clear()
+        self._discarding = False
+        if len(remaining) > self.max_message_size:
+            remaining = remaining[:self.max_message_size]
+            self.truncated += 1
+        return [remaining] if remaining else []
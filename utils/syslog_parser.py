@@ -0,0 +1,94 @@
+import re
+from typing import Iterable, List, Optional
+
+# Valeurs utilisées lorsque le message ne contient pas de <PRI> (comportement historique)
+DEFAULT_FACILITY = 23  # local7
+DEFAULT_SEVERITY = 6   # informational
+
+FACILITY_NAMES = {
+    0: "kern", 1: "user", 2: "mail", 3: "daemon", 4: "auth", 5: "syslog",
+    6: "lpr", 7: "news", 8: "uucp", 9: "cron", 10: "authpriv", 11: "ftp",
+    12: "ntp", 13: "security", 14: "console", 15: "solaris-cron", 16: "local0",
+    17: "local1", 18: "local2", 19: "local3", 20: "local4", 21: "local5",
+    22: "local6", 23: "local7"
+}
+SEVERITY_NAMES = {
+    0: "Emergency", 1: "Alert", 2: "Critical", 3: "Error",
+    4: "Warning", 5: "Notice", 6: "Informational", 7: "Debug"
+}
+
+_SD_ELEMENT = r'\[(?:[^\]\\]|\\.)*\]'
+
+# Une seule expression compilée couvre les deux formats : l'en-tête est reconnu en une passe
+# et le corps du message commence à match.end().
+_SYSLOG_RE = re.compile(
+    r'<(\d{1,3})>'
+    r'(?:'
+    # RFC 5424 : 1 TIMESTAMP HOSTNAME APP-NAME PROCID MSGID STRUCTURED-DATA [BOM]MSG
+    r'1 (\S+) (\S+) (\S+) \S+ \S+ (?:-|' + _SD_ELEMENT + r'(?:' + _SD_ELEMENT + r')*)(?: \ufeff?)?'
+    r'|'
+    # RFC 3164 / Cisco IOS : [SEQ: ][HOST: ][*]TIMESTAMP[:] [HOST ][TAG[PID]: ]
+    r'(?:\d+: )?'
+    r'(?:([\w.-]+): (?=[*.]?[A-Z][a-z]{2} ))?'
+    r'(?:[*.]?('
+    r'(?:[A-Z][a-z]{2} [ \d]?\d(?: \d{4})?|\d{4}-\d\d-\d\d)[ T]\d\d:\d\d:\d\d(?:\.\d+)?'
+    r'(?:Z|[+-]\d\d:?\d\d| [A-Z]{3,5})?'
+    r'):? (?:(?!%)([^\s:\[]+) )?)?'
+    r'(?:([^\s:\[%]+)(?:\[\d+\])?: )?'
+    r')'
+    # Mnémonique Cisco : %FACILITY-SEVERITY-MNEMONIC:
+    r'(?:%([A-Z0-9_]+-\d-[A-Z0-9_]+)(?: ?: ?)?)?',
+    re.S
+)
+
+
+class SyslogRecord:
+    """Message syslog décodé (un objet à slots, sans dictionnaire par instance)"""
+    __slots__ = ("pri", "facility", "severity", "timestamp", "host", "app", "mnemonic", "msg", "text")
+
+    def __init__(self, pri: Optional[int], facility: int, severity: int, timestamp: Optional[str],
+                 host: Optional[str], app: Optional[str], mnemonic: Optional[str], msg: str, text: str):
+        self.pri = pri
+        self.facility = facility
+        self.severity = severity
+        self.timestamp = timestamp      # Horodatage fourni par l'équipement (tel quel)
+        self.host = host                # Nom d'hôte annoncé par l'équipement
+        self.app = app                  # APP-NAME (RFC 5424) ou TAG (RFC 3164)
+        self.mnemonic = mnemonic        # Mnémonique Cisco, ex. LINK-3-UPDOWN
+        self.msg = msg                  # Corps du message, sans en-tête
+        self.text = text                # Tout ce qui suit <PRI> (texte affiché historiquement)
+
+    def __repr__(self) -> str:
+        return (f"SyslogRecord(pri={self.pri}, facility={self.facility}, severity={self.severity}, "
+                f"timestamp={self.timestamp!r}, host={self.host!r}, app={self.app!r}, "
+                f"mnemonic={self.mnemonic!r}, msg={self.msg!r})")
+
+
+def parse(message: str) -> SyslogRecord:
+    """Analyse un message syslog RFC 3164 ou RFC 5424 en une seule passe"""
+    m = _SYSLOG_RE.match(message)
+    if m is None:
+        return SyslogRecord(None, DEFAULT_FACILITY, DEFAULT_SEVERITY, None, None, None, None, message, message)
+    pri_s, ts5424, host5424, app5424, origin, ts3164, host3164, tag, mnemonic = m.groups()
+    pri = int(pri_s)
+    if ts5424 is not None:
+        timestamp = None if ts5424 == '-' else ts5424
+        host = None if host5424 == '-' else host5424
+        app = None if app5424 == '-' else app5424
+    else:
+        timestamp = ts3164
+        host = host3164 or origin
+        app = tag
+    return SyslogRecord(pri, pri >> 3, pri & 7, timestamp, host, app, mnemonic,
+                        message[m.end():], message[m.end(1) + 1:])
+
+
+def source_host(source: str) -> str:
+    """Adresse de l'hôte d'une source "ip:port" (IPv6 compris : seul le dernier ':' sépare le port)"""
+    return source.rsplit(":", 1)[0]
+
+
+def parse_many(datagrams: Iterable[bytes]) -> List[SyslogRecord]:
+    """Décode et analyse un lot de datagrammes bruts"""
+    _parse = parse
+    return [_parse(data.decode('utf-8', errors='replace').strip()) for data in datagrams]
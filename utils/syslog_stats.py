@@ -0,0 +1,222 @@
+import heapq
+import math
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Fenêtres glissantes (secondes) suivies en continu
+RATE_WINDOWS = (60, 900, 3600)
+# Constante de temps (s) du débit lissé par hôte
+HOST_RATE_TAU = 60.0
+
+
+class RateWindow:
+    """Compteurs par seconde sur un anneau d'une heure, avec sommes glissantes maintenues en O(1)"""
+
+    def __init__(self, size: int = max(RATE_WINDOWS), windows: Tuple[int, ...] = RATE_WINDOWS):
+        self.size = size
+        self.windows = windows
+        self.reset()
+
+    def reset(self, second: Optional[int] = None) -> None:
+        self._counts = [0] * self.size
+        self._current = int(time.time()) if second is None else second
+        self._sums = {window: 0 for window in self.windows}
+
+    def _advance(self, second: int) -> None:
+        elapsed = second - self._current
+        if elapsed <= 0:
+            return
+        if elapsed >= self.size:
+            self.reset(second)
+            return
+        counts, size = self._counts, self.size
+        for s in range(self._current + 1, second + 1):
+            # La seconde s - w sort de chaque fenêtre w (avant la remise à zéro de l'alvéole)
+            for window in self.windows:
+                self._sums[window] -= counts[(s - window) % size]
+            counts[s % size] = 0
+        self._current = second
+
+    def add(self, second: int, count: int = 1) -> None:
+        self._advance(second)
+        if second < self._current:  # Horloge en retard : compté dans la seconde courante
+            second = self._current
+        self._counts[second % self.size] += count
+        for window in self.windows:
+            self._sums[window] += count
+
+    def rate(self, window: int, now: Optional[int] = None) -> float:
+        """Débit moyen (msg/s) sur la fenêtre donnée"""
+        self._advance(int(time.time()) if now is None else now)
+        return self._sums[window] / window
+
+    def percentiles(self, window: int, quantiles=(0.5, 0.95, 0.99), now: Optional[int] = None) -> Dict[str, float]:
+        """Percentiles du débit par seconde sur la fenêtre (secondes complètes uniquement)"""
+        self._advance(int(time.time()) if now is None else now)
+        values = sorted(self._counts[(self._current - offset) % self.size] for offset in range(1, window))
+        result = {f"p{int(q * 100)}": float(values[min(len(values) - 1, int(q * len(values)))]) for q in quantiles}
+        result["max"] = float(values[-1]) if values else 0.0
+        return result
+
+
+class _HostEntry:
+    __slots__ = ("host", "count", "error", "rate", "last_seen", "severities")
+
+    def __init__(self, host: str, count: int, error: int, now: float):
+        self.host = host
+        self.count = count
+        self.error = error
+        self.rate = 0.0
+        self.last_seen = now
+        self.severities = [0] * 8
+
+
+class TopHosts:
+    """Top-K des hôtes par l'algorithme Space-Saving (mémoire bornée à K entrées).
+
+    Un hôte évincé est remplacé par le nouveau venu, qui hérite du compteur minimal
+    (`error` borne la surestimation). Le minimum est trouvé via un tas à invalidation paresseuse.
+    """
+
+    def __init__(self, capacity: int = 100):
+        self.capacity = max(1, capacity)
+        self.entries: Dict[str, _HostEntry] = {}
+        self._heap: List[Tuple[int, str]] = []
+
+    def _evict_min(self) -> int:
+        while True:
+            count, host = heapq.heappop(self._heap)
+            entry = self.entries.get(host)
+            if entry is None:
+                continue
+            if entry.count != count:  # Entrée périmée : remise à jour dans le tas
+                heapq.heappush(self._heap, (entry.count, host))
+                continue
+            del self.entries[host]
+            return count
+
+    def add(self, host: str, severity: int, now: float) -> None:
+        entry = self.entries.get(host)
+        if entry is None:
+            error = self._evict_min() if len(self.entries) >= self.capacity else 0
+            entry = self.entries[host] = _HostEntry(host, error, error, now)
+            heapq.heappush(self._heap, (error + 1, host))
+        entry.count += 1
+        # Débit lissé exponentiellement (décroissance continue, constante de temps HOST_RATE_TAU)
+        entry.rate = entry.rate * math.exp((entry.last_seen - now) / HOST_RATE_TAU) + 1.0 / HOST_RATE_TAU
+        entry.last_seen = now
+        if 0 <= severity < 8:
+            entry.severities[severity] += 1
+        if len(self._heap) > 4 * self.capacity:  # Purge des entrées périmées
+            self._heap = [(e.count, h) for h, e in self.entries.items()]
+            heapq.heapify(self._heap)
+
+    def top(self, k: int) -> List[_HostEntry]:
+        return heapq.nlargest(k, self.entries.values(), key=lambda e: e.count)
+
+
+class SyslogStats:
+    """Statistiques syslog en flux : fenêtres glissantes, percentiles de débit et top-K des hôtes.
+
+    update() est appelé par le thread de réception et get_stats_dict() par le GUI ; le coût
+    d'un instantané dépend de K et de la taille des fenêtres, pas du nombre d'hôtes.
+    """
+
+    def __init__(self, top_capacity: int = 512, top_count: int = 10):
+        self.top_capacity = top_capacity
+        self.top_count = top_count
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.message_count: int = 0
+            self.start_time: datetime = datetime.now()
+            self._start = time.time()
+            self.rates = RateWindow()
+            self.top_hosts = TopHosts(self.top_capacity)
+            self.messages_per_facility: Dict[int, int] = defaultdict(int)
+            self.messages_per_severity: Dict[int, int] = defaultdict(int)
+            self.messages_per_hour: Dict[int, int] = defaultdict(int)
+            self.kernel_drops: int = 0  # Datagrammes perdus par le noyau (file du socket pleine)
+            self._hour_second = -1  # Seconde pour laquelle _hour est valide
+            self._hour = 0
+
+    def update(self, host: str, facility: int, severity: int, now: Optional[float] = None) -> None:
+        now = time.time() if now is None else now
+        second = int(now)
+        with self._lock:
+            self.message_count += 1
+            self.rates.add(second)
+            self.top_hosts.add(host, severity, now)
+            self.messages_per_facility[facility] += 1
+            self.messages_per_severity[severity] += 1
+            if second != self._hour_second:  # Heure locale recalculée au plus une fois par seconde
+                self._hour_second = second
+                self._hour = time.localtime(second).tm_hour
+            self.messages_per_hour[self._hour] += 1
+
+    def update_many(self, messages: Iterable[Tuple[str, int, int]], now: Optional[float] = None) -> None:
+        """Comptabilise un lot de messages (host, facility, severity) reçus à l'instant `now`"""
+        now = time.time() if now is None else now
+        second = int(now)
+        with self._lock:
+            if second != self._hour_second:
+                self._hour_second = second
+                self._hour = time.localtime(second).tm_hour
+            add_host = self.top_hosts.add
+            per_facility, per_severity = self.messages_per_facility, self.messages_per_severity
+            count = 0
+            for host, facility, severity in messages:
+                add_host(host, severity, now)
+                per_facility[facility] += 1
+                per_severity[severity] += 1
+                count += 1
+            if count:
+                self.message_count += count
+                self.rates.add(second, count)
+                self.messages_per_hour[self._hour] += count
+
+    def update_kernel_drops(self, drops: int) -> None:
+        """Enregistre le compteur de pertes noyau (cumulatif sur la durée de vie du socket)"""
+        self.kernel_drops = drops
+
+    def current_rate(self, window: int = 60) -> float:
+        """Débit (msg/s) sur une des fenêtres glissantes RATE_WINDOWS"""
+        with self._lock:
+            return self.rates.rate(window)
+
+    def get_stats_dict(self) -> dict:
+        now = time.time()
+        second = int(now)
+        with self._lock:
+            uptime = now - self._start
+            top = self.top_hosts.top(max(self.top_count, 20))
+            host_details = []
+            for entry in top:
+                decay = math.exp((entry.last_seen - now) / HOST_RATE_TAU)
+                host_details.append({
+                    "host": entry.host,
+                    "count": entry.count,
+                    "error": entry.error,  # Surestimation maximale du compteur (Space-Saving)
+                    "rate": entry.rate * decay,
+                    "severities": list(entry.severities),
+                })
+            return {
+                "message_count": self.message_count,
+                "uptime_seconds": uptime,
+                "msgs_per_second": self.message_count / max(1, uptime),
+                "rate_1m": self.rates.rate(60, second),
+                "rate_15m": self.rates.rate(900, second),
+                "rate_1h": self.rates.rate(3600, second),
+                "rate_percentiles_15m": self.rates.percentiles(900, now=second),
+                "top_hosts": {entry.host: entry.count for entry in top[:self.top_count]},
+                "host_details": host_details,
+                "per_facility": dict(self.messages_per_facility),
+                "per_severity": dict(self.messages_per_severity),
+                "per_hour": dict(self.messages_per_hour),
+                "kernel_drops": self.kernel_drops
+            }
@@ -0,0 +1,258 @@
+import os
+import gzip
+import shutil
+import queue
+import threading
+import time
+import logging
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, List, Optional, Set
+
+logger = logging.getLogger("SyslogWriter")
+
+FSYNC_NEVER = "never"    # Le système d'exploitation décide (le plus rapide)
+FSYNC_COMMIT = "commit"  # fsync après chaque commit groupé
+FSYNC_ROTATE = "rotate"  # fsync uniquement à la fermeture d'un segment
+
+
+class _OpenLog:
+    __slots__ = ("date", "path", "handle", "size")
+
+    def __init__(self, date: str, path: str, handle, size: int):
+        self.date = date
+        self.path = path
+        self.handle = handle
+        self.size = size
+
+
+class HostLogWriter:
+    """Écriture des journaux texte par hôte ({ip}_{date}.log).
+
+    Les lignes sont mises en tampon par hôte puis écrites par commit groupé (taille ou délai),
+    les descripteurs ouverts sont limités par un LRU, les fichiers tournent par jour et par
+    taille, et les segments fermés peuvent être compressés en gzip par un thread dédié.
+    Une instance n'est pas thread-safe : elle est pilotée par le thread de réception.
+    """
+
+    def __init__(self, directory: str, max_open_files: int = 128, commit_interval: float = 1.0,
+                 commit_bytes: int = 256 * 1024, fsync_policy: str = FSYNC_NEVER,
+                 max_file_size: int = 50 * 1024 * 1024, compress_rotated: bool = False):
+        """
+        Args:
+            directory (str): Répertoire des journaux
+            max_open_files (int): Nombre maximal de fichiers ouverts simultanément
+            commit_interval (float): Délai maximal (s) avant l'écriture des tampons
+            commit_bytes (int): Volume en tampon déclenchant un commit immédiat
+            fsync_policy (str): "never", "commit" ou "rotate"
+            max_file_size (int): Taille déclenchant la rotation d'un fichier (0 = pas de limite)
+            compress_rotated (bool): Compresser en gzip les segments fermés
+        """
+        self.directory = directory
+        self.max_open_files = max(1, max_open_files)
+        self.commit_interval = commit_interval
+        self.commit_bytes = commit_bytes
+        self.fsync_policy = fsync_policy
+        self.max_file_size = max_file_size
+        self.compress_rotated = compress_rotated
+
+        self._pending: Dict[str, List[str]] = {}
+        self._pending_bytes = 0
+        self._open: "OrderedDict[str, _OpenLog]" = OrderedDict()
+        self._evicted: Dict[str, Set[str]] = {}  # Date -> fichiers fermés par le LRU, à finaliser au changement de jour
+        self._last_commit = time.monotonic()
+        self._current_date = datetime.now().strftime("%Y-%m-%d")
+
+        self._compress_queue: "queue.Queue[Optional[str]]" = queue.Queue()
+        self._compressor: Optional[threading.Thread] = None
+
+        self.metrics = {
+            "lines_written": 0,
+            "bytes_written": 0,
+            "commits": 0,
+            "fsyncs": 0,
+            "rotations": 0,
+            "compressed_segments": 0,
+            "files_opened": 0,
+            "last_commit_ms": 0.0,
+            "start_time": time.time(),
+        }
+        os.makedirs(directory, exist_ok=True)
+
+    # --- API ---
+    def write(self, host: str, line: str) -> None:
+        """Ajoute une ligne (terminée par \\n) au tampon de l'hôte"""
+        pending = self._pending.get(host)
+        if pending is None:
+            pending = self._pending[host] = []
+        pending.append(line)
+        self._pending_bytes += len(line)
+        if self._pending_bytes >= self.commit_bytes:
+            self.commit()
+
+    def tick(self) -> None:
+        """À appeler périodiquement : déclenche la rotation journalière puis le commit par délai"""
+        today = datetime.now().strftime("%Y-%m-%d")
+        if today != self._current_date:
+            # Les lignes en tampon ont été reçues la veille : écrites avant le changement de date.
+            # Seul tick() avance la date courante, sinon les hôtes inactifs ne tourneraient jamais
+            self.commit()
+            self._current_date = today
+            for host in [h for h, log in self._open.items() if log.date != today]:
+                self._close(host, rotated=True)
+            self._finish_evicted(today)
+        if self._pending and time.monotonic() - self._last_commit >= self.commit_interval:
+            self.commit()
+
+    def commit(self) -> None:
+        """Écrit tous les tampons (un write() par hôte)"""
+        self._last_commit = time.monotonic()
+        if not self._pending:
+            return
+        started = time.perf_counter()
+        date = self._current_date  # Jour de réception des lignes en tampon
+        pending, self._pending = self._pending, {}
+        self._pending_bytes = 0
+        lines = 0
+        written = 0
+        for host, host_lines in pending.items():
+            data = "".join(host_lines)
+            try:
+                log = self._get_log(host, date)
+                log.handle.write(data)
+                log.handle.flush()
+                if self.fsync_policy == FSYNC_COMMIT:
+                    os.fsync(log.handle.fileno())
+                    self.metrics["fsyncs"] += 1
+                size = len(data.encode("utf-8")) if not data.isascii() else len(data)
+                log.size += size
+                written += size
+                lines += len(host_lines)
+                if self.max_file_size and log.size >= self.max_file_size:
+                    self._rotate_by_size(host)
+            except Exception as e:
+                logger.error(f"Erreur lors de l'écriture du journal de {host}: {e}")
+        self.metrics["lines_written"] += lines
+        self.metrics["bytes_written"] += written
+        self.metrics["commits"] += 1
+        self.metrics["last_commit_ms"] = (time.perf_counter() - started) * 1000
+
+    def close(self) -> None:
+        """Écrit les tampons, ferme tous les fichiers et termine les compressions en cours"""
+        self.commit()
+        for host in list(self._open):
+            self._close(host, rotated=False)
+        if self._compressor is not None:
+            self._compress_queue.put(None)
+            self._compressor.join(timeout=30)
+            self._compressor = None
+
+    def get_metrics(self) -> dict:
+        metrics = dict(self.metrics)
+        elapsed = max(1e-6, time.time() - metrics.pop("start_time"))
+        metrics["open_files"] = len(self._open)
+        metrics["pending_bytes"] = self._pending_bytes
+        metrics["bytes_per_second"] = self.metrics["bytes_written"] / elapsed
+        metrics["lines_per_second"] = self.metrics["lines_written"] / elapsed
+        return metrics
+
+    # --- Gestion des fichiers ---
+    def _path_for(self, host: str, date: str) -> str:
+        return os.path.join(self.directory, f"{host}_{date}.log")
+
+    def _get_log(self, host: str, date: str) -> _OpenLog:
+        log = self._open.get(host)
+        if log is not None:
+            if log.date == date:
+                self._open.move_to_end(host)
+                return log
+            self._close(host, rotated=True)  # Changement de jour
+        if self._evicted:
+            self._finish_evicted(date)
+        while len(self._open) >= self.max_open_files:
+            lru_host = next(iter(self._open))
+            lru_log = self._open[lru_host]
+            self._close(lru_host, rotated=False)
+            self._evicted.setdefault(lru_log.date, set()).add(lru_log.path)
+        path = self._path_for(host, date)
+        evicted = self._evicted.get(date)
+        if evicted is not None:
+            evicted.discard(path)  # Rouvert : sera finalisé par sa propre rotation
+        handle = open(path, "a", encoding="utf-8", buffering=64 * 1024)
+        log = _OpenLog(date, path, handle, handle.tell())
+        self._open[host] = log
+        self.metrics["files_opened"] += 1
+        return log
+
+    def _close(self, host: str, rotated: bool) -> None:
+        log = self._open.pop(host, None)
+        if log is None:
+            return
+        try:
+            log.handle.flush()
+            if rotated and self.fsync_policy == FSYNC_ROTATE:
+                os.fsync(log.handle.fileno())
+                self.metrics["fsyncs"] += 1
+            log.handle.close()
+        except Exception as e:
+            logger.error(f"Erreur lors de la fermeture du journal {log.path}: {e}")
+            return
+        if rotated:
+            self._segment_closed(log.path)
+
+    def _finish_evicted(self, today: str) -> None:
+        """Finalise les fichiers fermés par le LRU dont le jour est terminé (fsync, compression)"""
+        for date in [d for d in self._evicted if d < today]:
+            for path in self._evicted.pop(date):
+                if self.fsync_policy == FSYNC_ROTATE:
+                    self._fsync_path(path)
+                self._segment_closed(path)
+
+    def _rotate_by_size(self, host: str) -> None:
+        log = self._open.get(host)
+        if log is None:
+            return
+        self._close(host, rotated=False)
+        if self.fsync_policy == FSYNC_ROTATE:
+            self._fsync_path(log.path)
+        base, ext = os.path.splitext(log.path)
+        index = 1
+        while os.path.exists(f"{base}.{index}{ext}") or os.path.exists(f"{base}.{index}{ext}.gz"):
+            index += 1
+        segment = f"{base}.{index}{ext}"
+        try:
+            os.replace(log.path, segment)
+        except OSError as e:
+            logger.error(f"Rotation impossible de {log.path}: {e}")
+            return
+        self.metrics["rotations"] += 1
+        self._segment_closed(segment)
+
+    def _fsync_path(self, path: str) -> None:
+        try:
+            with open(path, "rb") as f:
+                os.fsync(f.fileno())
+            self.metrics["fsyncs"] += 1
+        except OSError:
+            pass
+
+    def _segment_closed(self, path: str) -> None:
+        if not self.compress_rotated:
+            return
+        if self._compressor is None:
+            self._compressor = threading.Thread(target=self._compress_loop, name="SyslogLogCompressor", daemon=True)
+            self._compressor.start()
+        self._compress_queue.put(path)
+
+    def _compress_loop(self) -> None:
+        while True:
+            path = self._compress_queue.get()
+            if path is None:
+                return
+            try:
+                with open(path, "rb") as src, gzip.open(path + ".gz", "wb") as dst:
+                    shutil.copyfileobj(src, dst, 1024 * 1024)
+                os.remove(path)
+                self.metrics["compressed_segments"] += 1
+            except Exception as e:
+                logger.error(f"Erreur lors de la compression de {path}: {e}")
@@ -1,13 +1,15 @@
 import sys
 import os
-import socket
 import threading
 import time
 import logging
 import json
 import re
+import bisect
+import heapq
+from array import array
 from datetime import datetime
-from collections import defaultdict
+from collections import defaultdict, deque
 from dataclasses import dataclass
 from queue import Queue
 from typing import Dict, List, Optional, Tuple, Union, Set
@@ -19,11 +21,20 @@ from PyQt5.QtWidgets import (
     QGroupBox, QTabWidget, QSplitter, QTreeWidget, QTreeWidgetItem, QCheckBox,
     QMenu, QAction, QInputDialog, QColorDialog, QToolBar, QSystemTrayIcon,
     QDateTimeEdit, QListWidget, QListWidgetItem, QPlainTextEdit, QStatusBar,
-    QProgressBar, QFrame, QSlider, QDialog, QTextBrowser, QScrollArea
+    QProgressBar, QFrame, QSlider, QDialog, QTextBrowser, QScrollArea, QTableView,
+    QDialogButtonBox, QProgressDialog
+)
+from PyQt5.QtCore import (
+    Qt, QTimer, pyqtSignal, QObject, QSize, QDateTime, QSettings, QAbstractTableModel, QModelIndex
 )
-from PyQt5.QtCore import Qt, QTimer, pyqtSignal, QObject, QSize, QDateTime, QSettings
 from PyQt5.QtGui import QColor, QBrush, QFont, QTextCursor, QIcon, QPalette, QPixmap, QFontDatabase
 
+from utils import syslog_parser
+from utils.syslog_archive import SyslogArchive
+from utils.syslog_export import FORMAT_CSV, FORMAT_JSONL, FORMAT_TEXT
+from worker.syslog_engine import SyslogEngine, SyslogEngineConfig
+from worker.syslog_export_worker import SyslogExportWorker
+
 # Tente d'importer netifaces pour la détection des interfaces réseau
 try:
     import netifaces
@@ -53,40 +64,67 @@ if not os.path.exists(RESOURCES_DIR):
 # --- Classes pour le serveur SYSLOG ---
 
 class SyslogServerSignals(QObject):
-    new_message = pyqtSignal(str, str, int, int, str)  # (timestamp, source, facility, severity, message)
+    messages_batch = pyqtSignal(list)  # [(timestamp, source, facility, severity, message), ...]
     log_message = pyqtSignal(str, str)  # (niveau, message)
     server_started = pyqtSignal(str, int)  # (host, port)
     server_stopped = pyqtSignal()
     stats_updated = pyqtSignal(dict)  # statistiques
     active_hosts_updated = pyqtSignal(set)  # ensemble d'hôtes actifs
 
+class SyslogMessageBatcher(QObject):
+    """Accumule les messages produits par les threads de réception et les livre au GUI par lots.
+
+    Doit être créé dans le thread GUI : le QTimer qui vide le lot s'exécute dans ce thread,
+    ce qui remplace une émission inter-threads par datagramme par une émission par période.
+    """
+    messages_batch = pyqtSignal(list)
+
+    def __init__(self, interval_ms: int = 100, parent: Optional[QObject] = None) -> None:
+        super().__init__(parent)
+        self._pending: List[tuple] = []
+        self._lock = threading.Lock()
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.flush)
+        self.timer.start(max(10, interval_ms))
+
+    def push(self, message: tuple) -> None:
+        """Ajoute un message (timestamp, source, facility, severity, message) - appelable depuis tout thread"""
+        with self._lock:
+            self._pending.append(message)
+
+    def extend(self, messages: List[tuple]) -> None:
+        """Ajoute plusieurs messages - appelable depuis tout thread"""
+        with self._lock:
+            self._pending.extend(messages)
+
+    def setInterval(self, interval_ms: int) -> None:
+        self.timer.setInterval(max(10, interval_ms))
+
+    def pendingCount(self) -> int:
+        """Nombre de messages en attente de livraison au GUI"""
+        return len(self._pending)
+
+    def flush(self) -> None:
+        """Émet les messages en attente en un seul signal"""
+        with self._lock:
+            if not self._pending:
+                return
+            batch, self._pending = self._pending, []
+        self.messages_batch.emit(batch)
+
 class SyslogParser:
-    FACILITIES = {
-        0: "kern", 1: "user", 2: "mail", 3: "daemon", 4: "auth", 5: "syslog",
-        6: "lpr", 7: "news", 8: "uucp", 9: "cron", 10: "authpriv", 11: "ftp",
-        12: "ntp", 13: "security", 14: "console", 15: "solaris-cron", 16: "local0",
-        17: "local1", 18: "local2", 19: "local3", 20: "local4", 21: "local5",
-        22: "local6", 23: "local7"
-    }
-    SEVERITIES = {
-        0: "Emergency", 1: "Alert", 2: "Critical", 3: "Error",
-        4: "Warning", 5: "Notice", 6: "Informational", 7: "Debug"
-    }
+    FACILITIES = syslog_parser.FACILITY_NAMES
+    SEVERITIES = syslog_parser.SEVERITY_NAMES
+    
+    # Analyse structurée (RFC 3164 / RFC 5424), voir utils.syslog_parser
+    parse = staticmethod(syslog_parser.parse)
+    parse_many = staticmethod(syslog_parser.parse_many)
     
     @staticmethod
     def parse_syslog_message(message: str) -> Tuple[int, int, str]:
         # Format traditionnel: <PRI>Timestamp Host Message
-        pri_match = re.match(r'<(\d+)>(.*)', message)
-        if pri_match:
-            pri = int(pri_match.group(1))
-            facility_num = pri // 8
-            severity_num = pri % 8
-            parsed_message = pri_match.group(2)
-        else:
-            facility_num = 23  # local7 par défaut
-            severity_num = 6   # info par défaut
-            parsed_message = message
-        return facility_num, severity_num, parsed_message
+        record = syslog_parser.parse(message)
+        return record.facility, record.severity, record.text
     
     @staticmethod
     def get_facility_name(facility_num: int) -> str:
@@ -125,28 +163,20 @@ class SyslogParser:
         }
         return bg_colors.get(severity_num)
 
-class ServerConfig:
+class ServerConfig(SyslogEngineConfig):
+    """Paramètres du moteur (voir worker.syslog_engine) + options d'interface, persistés par QSettings"""
+
     def __init__(self):
-        self.host: str = "0.0.0.0"
-        self.port: int = DEFAULT_PORT
-        self.buffer_size: int = 8192
+        super().__init__()
         self.auto_start: bool = False
-        self.save_logs: bool = True
-        self.log_directory: str = os.path.join(os.path.expanduser("~"), "syslog_logs")
-        self.filters: dict = {
-            "enabled": False,
-            "hosts": [],
-            "facilities": [],
-            "severities": [],
-            "keywords": []
-        }
         # Nouvelles options d'interface utilisateur
         self.ui_options: dict = {
             "theme": "modern",      # Options: modern, classic, dark
             "font_size": 10,        # Taille de police par défaut
             "auto_scroll": True,    # Défilement automatique des logs
             "timestamp_format": "standard",  # Options: standard, iso, short
-            "max_log_entries": MAX_LOG_ENTRIES  # Nombre maximum d'entrées dans les tables
+            "max_log_entries": MAX_LOG_ENTRIES,  # Nombre maximum d'entrées dans les tables
+            "refresh_interval_ms": 100  # Période de livraison des messages au GUI
         }
         self.load_config()
         
@@ -155,9 +185,25 @@ class ServerConfig:
         settings.setValue("host", self.host)
         settings.setValue("port", self.port)
         settings.setValue("buffer_size", self.buffer_size)
+        settings.setValue("recv_max_batch", self.recv_max_batch)
+        settings.setValue("recv_socket_buffer", self.recv_socket_buffer)
+        settings.setValue("worker_processes", self.worker_processes)
+        settings.setValue("reuse_port", self.reuse_port)
+        settings.setValue("tcp_enabled", self.tcp_enabled)
+        settings.setValue("tcp_port", self.tcp_port)
+        settings.setValue("tls_enabled", self.tls_enabled)
+        settings.setValue("tls_port", self.tls_port)
+        settings.setValue("tls_certfile", self.tls_certfile)
+        settings.setValue("tls_keyfile", self.tls_keyfile)
+        settings.setValue("tcp_max_connections", self.tcp_max_connections)
         settings.setValue("auto_start", self.auto_start)
         settings.setValue("save_logs", self.save_logs)
         settings.setValue("log_directory", self.log_directory)
+        settings.setValue("archive_enabled", self.archive_enabled)
+        settings.setValue("archive_retention_days", self.archive_retention_days)
+        settings.setValue("dedup_enabled", self.dedup_enabled)
+        settings.setValue("dedup_window", self.dedup_window)
+        settings.setValue("log_writer_options", json.dumps(self.log_writer_options))
         settings.setValue("filters", json.dumps(self.filters))
         settings.setValue("ui_options", json.dumps(self.ui_options))
         
@@ -169,12 +215,47 @@ class ServerConfig:
             self.port = int(settings.value("port"))
         if settings.contains("buffer_size"):
             self.buffer_size = int(settings.value("buffer_size"))
+        if settings.contains("recv_max_batch"):
+            self.recv_max_batch = int(settings.value("recv_max_batch"))
+        if settings.contains("recv_socket_buffer"):
+            self.recv_socket_buffer = int(settings.value("recv_socket_buffer"))
+        if settings.contains("worker_processes"):
+            self.worker_processes = int(settings.value("worker_processes"))
+        if settings.contains("reuse_port"):
+            self.reuse_port = settings.value("reuse_port") == "true"
+        if settings.contains("tcp_enabled"):
+            self.tcp_enabled = settings.value("tcp_enabled") == "true"
+        if settings.contains("tcp_port"):
+            self.tcp_port = int(settings.value("tcp_port"))
+        if settings.contains("tls_enabled"):
+            self.tls_enabled = settings.value("tls_enabled") == "true"
+        if settings.contains("tls_port"):
+            self.tls_port = int(settings.value("tls_port"))
+        if settings.contains("tls_certfile"):
+            self.tls_certfile = settings.value("tls_certfile")
+        if settings.contains("tls_keyfile"):
+            self.tls_keyfile = settings.value("tls_keyfile")
+        if settings.contains("tcp_max_connections"):
+            self.tcp_max_connections = int(settings.value("tcp_max_connections"))
         if settings.contains("auto_start"):
             self.auto_start = settings.value("auto_start") == "true"
         if settings.contains("save_logs"):
             self.save_logs = settings.value("save_logs") == "true"
         if settings.contains("log_directory"):
             self.log_directory = settings.value("log_directory")
+        if settings.contains("archive_enabled"):
+            self.archive_enabled = settings.value("archive_enabled") == "true"
+        if settings.contains("archive_retention_days"):
+            self.archive_retention_days = int(settings.value("archive_retention_days"))
+        if settings.contains("dedup_enabled"):
+            self.dedup_enabled = settings.value("dedup_enabled") == "true"
+        if settings.contains("dedup_window"):
+            self.dedup_window = float(settings.value("dedup_window"))
+        if settings.contains("log_writer_options"):
+            try:
+                self.log_writer_options.update(json.loads(settings.value("log_writer_options")))
+            except Exception:
+                pass
         if settings.contains("filters"):
             try:
                 self.filters = json.loads(settings.value("filters"))
@@ -186,49 +267,18 @@ class ServerConfig:
             except Exception:
                 pass
 
-class SyslogStats:
-    def __init__(self):
-        self.reset()
-        
-    def reset(self) -> None:
-        self.message_count: int = 0
-        self.start_time: datetime = datetime.now()
-        self.messages_per_host: Dict[str, int] = defaultdict(int)
-        self.messages_per_facility: Dict[int, int] = defaultdict(int)
-        self.messages_per_severity: Dict[int, int] = defaultdict(int)
-        self.messages_per_hour: Dict[int, int] = defaultdict(int)
-        
-    def update(self, host: str, facility: int, severity: int) -> None:
-        self.message_count += 1
-        self.messages_per_host[host] += 1
-        self.messages_per_facility[facility] += 1
-        self.messages_per_severity[severity] += 1
-        hour = datetime.now().hour
-        self.messages_per_hour[hour] += 1
-        
-    def get_stats_dict(self) -> dict:
-        uptime = (datetime.now() - self.start_time).total_seconds()
-        msgs_per_sec = self.message_count / max(1, uptime)
-        top_hosts = sorted(self.messages_per_host.items(), key=lambda x: x[1], reverse=True)[:10]
-        return {
-            "message_count": self.message_count,
-            "uptime_seconds": uptime,
-            "msgs_per_second": msgs_per_sec,
-            "top_hosts": dict(top_hosts),
-            "per_facility": dict(self.messages_per_facility),
-            "per_severity": dict(self.messages_per_severity),
-            "per_hour": dict(self.messages_per_hour)
-        }
-
 class SyslogServer:
+    """Client Qt du moteur de collecte : signaux, lots d'affichage et minuteries du GUI"""
+
     def __init__(self, config: Optional[ServerConfig] = None) -> None:
         self.config: ServerConfig = config or ServerConfig()
-        self.running: bool = False
-        self.sock: Optional[socket.socket] = None
-        self.worker: Optional[threading.Thread] = None
         self.signals: SyslogServerSignals = SyslogServerSignals()
-        self.stats: SyslogStats = SyslogStats()
-        self.active_hosts: Set[str] = set()  # Pour suivre les hôtes actifs
+        self.engine = SyslogEngine(self.config, on_log=self.signals.log_message.emit)
+        
+        # Livraison des messages au GUI par lots (une émission par période d'affichage)
+        self.batcher = SyslogMessageBatcher(self.config.ui_options.get("refresh_interval_ms", 100))
+        self.batcher.messages_batch.connect(self.signals.messages_batch)
+        self.engine.on_messages = self.batcher.extend
         
         # Timer pour les stats
         self.stats_timer = QTimer()
@@ -239,242 +289,399 @@ class SyslogServer:
         self.hosts_timer = QTimer()
         self.hosts_timer.timeout.connect(self.emit_active_hosts)
         self.hosts_timer.start(10000)  # Mise à jour toutes les 10 secondes
-        
-        # Création des répertoires nécessaires
-        self._ensure_directories()
+
+    # Accès direct à l'état du moteur (statistiques, socket, archive...)
+    running = property(lambda self: self.engine.running)
+    stats = property(lambda self: self.engine.stats)
+    sock = property(lambda self: self.engine.sock)
+    active_hosts = property(lambda self: self.engine.active_hosts)
+    archive = property(lambda self: self.engine.archive)
+    log_writer = property(lambda self: self.engine.log_writer)
+    tcp_listener = property(lambda self: self.engine.tcp_listener)
+    deduplicator = property(lambda self: self.engine.deduplicator)
+    message_filter = property(lambda self: self.engine.message_filter)
         
     def start(self) -> None:
         try:
-            self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-            self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-            self.sock.bind((self.config.host, self.config.port))
-            self.running = True
-            logger.info(f"Syslog Server démarré sur {self.config.host}:{self.config.port}")
+            self.engine.start()
             self.signals.server_started.emit(self.config.host, self.config.port)
-            self.stats.reset()
-            self.active_hosts.clear()
-            if self.config.save_logs and not os.path.exists(self.config.log_directory):
-                os.makedirs(self.config.log_directory)
-            self.worker = threading.Thread(target=self._receive_loop, daemon=True)
-            self.worker.start()
         except Exception as e:
             logger.error(f"Erreur lors du démarrage du serveur syslog: {e}")
             self.signals.log_message.emit("ERROR", f"Erreur lors du démarrage: {e}")
-            self.running = False
 
     def stop(self) -> None:
-        self.running = False
         try:
-            if self.sock:
-                self.sock.close()
-                self.sock = None
-            logger.info("Syslog Server arrêté")
+            self.engine.stop()
+            self.batcher.flush()
             self.signals.server_stopped.emit()
         except Exception as e:
             logger.error(f"Erreur lors de l'arrêt du serveur syslog: {e}")
             self.signals.log_message.emit("ERROR", f"Erreur lors de l'arrêt: {e}")
 
-    def _receive_loop(self) -> None:
-        log_files = {}  # Dict[str, Dict[str, Any]]
-        while self.running:
-            try:
-                self.sock.settimeout(0.5)
-                try:
-                    data, addr = self.sock.recvfrom(self.config.buffer_size)
-                except socket.timeout:
-                    continue
-                
-                timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                src_ip = addr[0]
-                src_port = addr[1]
-                src = f"{src_ip}:{src_port}"
-                
-                # Ajouter à la liste des hôtes actifs
-                self.active_hosts.add(src_ip)
-                
-                try:
-                    raw_message = data.decode('utf-8', errors='replace').strip()
-                    facility_num, severity_num, parsed_message = SyslogParser.parse_syslog_message(raw_message)
-                    self.stats.update(src_ip, facility_num, severity_num)
-                    
-                    if self.config.filters["enabled"]:
-                        if self.config.filters["hosts"] and src_ip not in self.config.filters["hosts"]:
-                            continue
-                        if self.config.filters["facilities"] and facility_num not in self.config.filters["facilities"]:
-                            continue
-                        if self.config.filters["severities"] and severity_num not in self.config.filters["severities"]:
-                            continue
-                        if self.config.filters["keywords"]:
-                            if not any(keyword.lower() in parsed_message.lower() for keyword in self.config.filters["keywords"]):
-                                continue
-                    
-                    if self.config.save_logs:
-                        log_date = datetime.now().strftime("%Y-%m-%d")
-                        log_filename = os.path.join(self.config.log_directory, f"{src_ip}_{log_date}.log")
-                        if src_ip not in log_files or log_date not in log_files[src_ip]:
-                            try:
-                                if src_ip in log_files:
-                                    log_files[src_ip]["file"].close()
-                                log_files[src_ip] = {"date": log_date, "file": open(log_filename, "a", encoding="utf-8")}
-                            except Exception as e:
-                                logger.error(f"Erreur lors de l'ouverture du fichier de log {log_filename}: {e}")
-                        try:
-                            log_file = log_files[src_ip]["file"]
-                            log_file.write(f"[{timestamp}] <{facility_num}.{severity_num}> {parsed_message}\n")
-                            log_file.flush()
-                        except Exception as e:
-                            logger.error(f"Erreur lors de l'écriture du fichier de log: {e}")
-                    logger.debug(f"Message reçu de {src}: {parsed_message}")
-                    self.signals.new_message.emit(timestamp, src, facility_num, severity_num, parsed_message)
-                except Exception as e:
-                    logger.error(f"Erreur lors du traitement du message: {e}")
-                    self.signals.log_message.emit("ERROR", f"Erreur lors du traitement du message: {e}")
-            except Exception as e:
-                logger.error(f"Erreur dans la réception syslog: {e}")
-                self.signals.log_message.emit("ERROR", f"Erreur dans la réception: {e}")
-        
-        # Fermeture des fichiers de logs à la fin
-        for host in log_files:
-            try:
-                log_files[host]["file"].close()
-            except Exception:
-                pass
+    def update_filters(self, filters: Optional[dict] = None) -> None:
+        """Compile les filtres (config.filters par défaut) et les applique immédiatement"""
+        self.engine.update_filters(filters)
 
     def emit_stats(self) -> None:
         if self.running:
-            stats = self.stats.get_stats_dict()
-            self.signals.stats_updated.emit(stats)
+            self.signals.stats_updated.emit(self.engine.get_stats())
     
     def emit_active_hosts(self) -> None:
         if self.running:
-            self.signals.active_hosts_updated.emit(self.active_hosts)
+            self.signals.active_hosts_updated.emit(set(self.active_hosts))
+
+# --- Modèle de données des logs ---
+class SyslogLogModel(QAbstractTableModel):
+    """Modèle à tampon circulaire : empreinte mémoire fixe, insertions par lots"""
+    HEADERS = ["Timestamp", "Source", "Facility", "Severity", "Message"]
+
+    # Caches des rôles par sévérité, partagés par tous les modèles (créés au premier usage)
+    _foreground_cache: Dict[int, QBrush] = {}
+    _background_cache: Dict[int, Optional[QBrush]] = {}
+    _bold_font: Optional[QFont] = None
+
+    def __init__(self, capacity: int = MAX_LOG_ENTRIES, parent: Optional[QObject] = None) -> None:
+        super().__init__(parent)
+        self.capacity = max(1, capacity)
+        self._ring: List[Optional[tuple]] = [None] * self.capacity
+        self._next_seq = 0  # Numéro de séquence du prochain message
+        self._count = 0     # Nombre de messages présents dans l'anneau
+        # Index secondaires (séquences présentes dans l'anneau, par ordre croissant)
+        self._host_index: Dict[str, deque] = {}
+        self._severity_index: List[deque] = [deque() for _ in range(8)]
+        # Critères de filtrage (None = pas de contrainte)
+        self._filter_host: Optional[str] = None
+        self._filter_severities: Optional[frozenset] = None
+        self._filter_text: Optional[str] = None  # En minuscules
+        self._filtering = False
+        self._visible: List[int] = []  # Séquences visibles lorsqu'un filtre est actif
+        self._visible_start = 0        # Début logique de _visible (évite les suppressions en tête)
+        self._ensure_role_caches()
+
+    @classmethod
+    def _ensure_role_caches(cls) -> None:
+        if cls._bold_font is not None:
+            return
+        for severity_num in range(8):
+            cls._foreground_cache[severity_num] = QBrush(QColor(SyslogParser.get_severity_color(severity_num)))
+            bg = SyslogParser.get_severity_background(severity_num)
+            cls._background_cache[severity_num] = QBrush(QColor(bg)) if bg else None
+        font = QFont()
+        font.setBold(True)
+        cls._bold_font = font
+
+    # --- Interface QAbstractTableModel ---
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        if parent.isValid():
+            return 0
+        if self._filtering:
+            return len(self._visible) - self._visible_start
+        return self._count
+
+    def columnCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def headerData(self, section: int, orientation, role: int = Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.HEADERS[section]
+        return super().headerData(section, orientation, role)
+
+    def data(self, index: QModelIndex, role: int = Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        row = self.rowAt(index.row())
+        if row is None:
+            return None
+        severity_num = row[3]
+        if role == Qt.DisplayRole:
+            column = index.column()
+            if column == 2:
+                return SyslogParser.get_facility_name(row[2])
+            if column == 3:
+                return SyslogParser.get_severity_name(severity_num)
+            return row[column]
+        if role == Qt.ForegroundRole:
+            return self._foreground_cache.get(severity_num)
+        if role == Qt.BackgroundRole:
+            return self._background_cache.get(severity_num)
+        if role == Qt.FontRole and severity_num <= 2:  # Emergency, Alert, Critical
+            return self._bold_font
+        return None
+
+    # --- Accès aux données ---
+    def _oldest_seq(self) -> int:
+        return self._next_seq - self._count
+
+    def rowAt(self, row: int) -> Optional[tuple]:
+        """Retourne le message (timestamp, source, facility, severity, message) affiché à la ligne donnée"""
+        if self._filtering:
+            seq = self._visible[self._visible_start + row]
+        else:
+            seq = self._oldest_seq() + row
+        return self._ring[seq % self.capacity]
+
+    def rowTexts(self, row: int) -> List[str]:
+        """Retourne les textes affichés pour une ligne"""
+        timestamp, source, facility_num, severity_num, message = self.rowAt(row)
+        return [timestamp, source, SyslogParser.get_facility_name(facility_num),
+                SyslogParser.get_severity_name(severity_num), message]
+
+    def iterRows(self):
+        """Parcourt tous les messages de l'anneau, du plus ancien au plus récent"""
+        for seq in range(self._oldest_seq(), self._next_seq):
+            yield self._ring[seq % self.capacity]
+
+    @staticmethod
+    def _host_of(row: tuple) -> str:
+        return syslog_parser.source_host(row[1])
+
+    def _matches(self, row: tuple) -> bool:
+        if self._filter_host is not None and self._host_of(row) != self._filter_host:
+            return False
+        if self._filter_severities is not None and row[3] not in self._filter_severities:
+            return False
+        if self._filter_text is not None and self._filter_text not in row[4].lower():
+            return False
+        return True
+
+    # --- Mise à jour ---
+    def _index(self, seq: int, row: tuple) -> None:
+        host = self._host_of(row)
+        host_seqs = self._host_index.get(host)
+        if host_seqs is None:
+            host_seqs = self._host_index[host] = deque()
+        host_seqs.append(seq)
+        if 0 <= row[3] < 8:
+            self._severity_index[row[3]].append(seq)
+
+    def _unindex(self, row: tuple) -> None:
+        """Retire de ses index le message le plus ancien de l'anneau (toujours en tête de deque)"""
+        host = self._host_of(row)
+        host_seqs = self._host_index[host]
+        host_seqs.popleft()
+        if not host_seqs:
+            del self._host_index[host]
+        if 0 <= row[3] < 8:
+            self._severity_index[row[3]].popleft()
 
-    def _ensure_directories(self) -> None:
-        if self.config.save_logs and not os.path.exists(self.config.log_directory):
-            os.makedirs(self.config.log_directory)
+    def appendRows(self, rows: List[tuple]) -> None:
+        """Ajoute un lot de messages (une seule notification d'insertion par lot)"""
+        if not rows:
+            return
+        if len(rows) > self.capacity:
+            rows = rows[-self.capacity:]
+
+        # Éviction des messages les plus anciens si l'anneau déborde
+        overflow = self._count + len(rows) - self.capacity
+        if overflow > 0:
+            oldest = self._oldest_seq()
+            new_oldest = oldest + overflow
+            for seq in range(oldest, new_oldest):
+                self._unindex(self._ring[seq % self.capacity])
+            if not self._filtering:
+                self.beginRemoveRows(QModelIndex(), 0, overflow - 1)
+                self._count -= overflow
+                self.endRemoveRows()
+            else:
+                evicted = 0
+                visible = self._visible
+                while self._visible_start + evicted < len(visible) and visible[self._visible_start + evicted] < new_oldest:
+                    evicted += 1
+                if evicted:
+                    self.beginRemoveRows(QModelIndex(), 0, evicted - 1)
+                    self._visible_start += evicted
+                    self.endRemoveRows()
+                    self._compactVisible()
+                self._count -= overflow
+
+        if not self._filtering:
+            first = self._count
+            self.beginInsertRows(QModelIndex(), first, first + len(rows) - 1)
+            for row in rows:
+                self._ring[self._next_seq % self.capacity] = row
+                self._index(self._next_seq, row)
+                self._next_seq += 1
+            self._count += len(rows)
+            self.endInsertRows()
+        else:
+            matching = []
+            for row in rows:
+                self._ring[self._next_seq % self.capacity] = row
+                self._index(self._next_seq, row)
+                if self._matches(row):
+                    matching.append(self._next_seq)
+                self._next_seq += 1
+            self._count += len(rows)
+            if matching:
+                first = self.rowCount()
+                self.beginInsertRows(QModelIndex(), first, first + len(matching) - 1)
+                self._visible.extend(matching)
+                self.endInsertRows()
+
+    def _compactVisible(self) -> None:
+        if self._visible_start > 1024 and self._visible_start * 2 > len(self._visible):
+            del self._visible[:self._visible_start]
+            self._visible_start = 0
+
+    def _candidates(self):
+        """Séquences candidates, depuis l'index le plus sélectif disponible"""
+        if self._filter_host is not None:
+            return self._host_index.get(self._filter_host, ())
+        if self._filter_severities is not None:
+            return heapq.merge(*(self._severity_index[num] for num in sorted(self._filter_severities) if 0 <= num < 8))
+        return range(self._oldest_seq(), self._next_seq)
+
+    def setFilter(self, host: Optional[str] = None, severities: Optional[Set[int]] = None,
+                  text: Optional[str] = None) -> None:
+        """
+        Restreint l'affichage (critères combinés, None = pas de contrainte).
+
+        Le coût dépend du nombre de messages de l'hôte (ou des sévérités) retenus,
+        pas de la taille de l'anneau.
+        """
+        self.beginResetModel()
+        self._filter_host = host or None
+        self._filter_severities = frozenset(severities) if severities is not None else None
+        self._filter_text = text.lower() if text else None
+        self._filtering = (self._filter_host is not None or self._filter_severities is not None
+                           or self._filter_text is not None)
+        if not self._filtering:
+            self._visible = []
+        else:
+            # Seuls les critères non couverts par l'index choisi sont vérifiés ligne par ligne
+            check_severity = self._filter_host is not None and self._filter_severities is not None
+            severities_filter = self._filter_severities
+            text_filter = self._filter_text
+            ring, capacity = self._ring, self.capacity
+            visible = []
+            for seq in self._candidates():
+                row = ring[seq % capacity]
+                if check_severity and row[3] not in severities_filter:
+                    continue
+                if text_filter is not None and text_filter not in row[4].lower():
+                    continue
+                visible.append(seq)
+            self._visible = visible
+        self._visible_start = 0
+        self.endResetModel()
+
+    def setFilterHost(self, host: Optional[str]) -> None:
+        """Restreint l'affichage aux messages d'un hôte (None pour tout afficher)"""
+        self.setFilter(host, self._filter_severities, self._filter_text)
+
+    def clear(self) -> None:
+        """Supprime tous les messages"""
+        self.beginResetModel()
+        self._ring = [None] * self.capacity
+        self._count = 0
+        self._host_index = {}
+        self._severity_index = [deque() for _ in range(8)]
+        self._visible = []
+        self._visible_start = 0
+        self.endResetModel()
 
 # --- Widget d'affichage des logs ---
-class EnhancedLogTable(QTableWidget):
-    def __init__(self, parent: Optional[QWidget] = None) -> None:
-        super().__init__(0, 5, parent)
-        self.setHorizontalHeaderLabels(["Timestamp", "Source", "Facility", "Severity", "Message"])
-        self.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeToContents)
-        self.horizontalHeader().setSectionResizeMode(1, QHeaderView.ResizeToContents)
-        self.horizontalHeader().setSectionResizeMode(2, QHeaderView.ResizeToContents)
-        self.horizontalHeader().setSectionResizeMode(3, QHeaderView.ResizeToContents)
-        self.horizontalHeader().setSectionResizeMode(4, QHeaderView.Stretch)
+class EnhancedLogTable(QTableView):
+    def __init__(self, parent: Optional[QWidget] = None, capacity: int = MAX_LOG_ENTRIES) -> None:
+        super().__init__(parent)
+        self.max_entries = capacity
+        self.log_model = SyslogLogModel(self.max_entries, self)
+        self.setModel(self.log_model)
+        header = self.horizontalHeader()
+        header.setResizeContentsPrecision(50)  # Ne mesure que quelques lignes pour le redimensionnement
+        header.setSectionResizeMode(0, QHeaderView.ResizeToContents)
+        header.setSectionResizeMode(1, QHeaderView.ResizeToContents)
+        header.setSectionResizeMode(2, QHeaderView.ResizeToContents)
+        header.setSectionResizeMode(3, QHeaderView.ResizeToContents)
+        header.setSectionResizeMode(4, QHeaderView.Stretch)
+        # Hauteur de ligne uniforme : pas de calcul de taille par ligne
+        self.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.verticalHeader().setDefaultSectionSize(self.fontMetrics().height() + 6)
+        self.setWordWrap(False)
         self.setAlternatingRowColors(True)
-        self.setSelectionBehavior(QTableWidget.SelectRows)
+        self.setSelectionBehavior(QTableView.SelectRows)
+        self.setEditTriggers(QTableView.NoEditTriggers)
         self.setContextMenuPolicy(Qt.CustomContextMenu)
         self.customContextMenuRequested.connect(self.showContextMenu)
-        self.max_entries = MAX_LOG_ENTRIES
         self.filtered_host = None  # Pour filtrer par hôte
-        self.all_rows = []  # Pour stocker toutes les lignes avant filtrage
-        
+        self._scroll_pending = False
+
     def addMessage(self, timestamp: str, source: str, facility_num: int, severity_num: int, message: str) -> None:
-        # Si filtre actif, vérifier si ce message correspond au filtre
-        source_ip = source.split(":")[0]
-        if self.filtered_host and source_ip != self.filtered_host:
-            # Stocker quand même le message pour pouvoir le récupérer si le filtre change
-            self.all_rows.append((timestamp, source, facility_num, severity_num, message))
-            if len(self.all_rows) > self.max_entries * 2:  # Limiter la taille
-                self.all_rows = self.all_rows[len(self.all_rows) - self.max_entries:]
-            return
-            
-        if self.rowCount() >= self.max_entries:
-            self.removeRow(0)
-        
-        row = self.rowCount()
-        self.insertRow(row)
-        
-        facility_name = SyslogParser.get_facility_name(facility_num)
-        severity_name = SyslogParser.get_severity_name(severity_num)
-        severity_color = SyslogParser.get_severity_color(severity_num)
-        severity_bg = SyslogParser.get_severity_background(severity_num)
-        
-        timestamp_item = QTableWidgetItem(timestamp)
-        source_item = QTableWidgetItem(source)
-        facility_item = QTableWidgetItem(facility_name)
-        severity_item = QTableWidgetItem(severity_name)
-        message_item = QTableWidgetItem(message)
-        
-        # Personnalisation avancée des couleurs selon la sévérité
-        for item in [timestamp_item, source_item, facility_item, severity_item, message_item]:
-            # Couleur du texte basée sur la sévérité
-            item.setForeground(QBrush(QColor(severity_color)))
-            
-            # Fond coloré pour les sévérités importantes
-            if severity_bg:
-                item.setBackground(QBrush(QColor(severity_bg)))
-                
-            # Gras pour les messages critiques
-            if severity_num <= 2:  # Emergency, Alert, Critical
-                font = QFont()
-                font.setBold(True)
-                item.setFont(font)
-        
-        self.setItem(row, 0, timestamp_item)
-        self.setItem(row, 1, source_item)
-        self.setItem(row, 2, facility_item)
-        self.setItem(row, 3, severity_item)
-        self.setItem(row, 4, message_item)
-        
-        # Assurer que le nouveau message est visible
+        self.addMessages([(timestamp, source, facility_num, severity_num, message)])
+
+    def addMessages(self, rows: List[tuple]) -> None:
+        """Ajoute un lot de messages (timestamp, source, facility, severity, message)"""
+        self.log_model.appendRows(rows)
+        # Un seul défilement par passage dans la boucle d'événements
+        if not self._scroll_pending:
+            self._scroll_pending = True
+            QTimer.singleShot(0, self._scrollToLatest)
+
+    def _scrollToLatest(self) -> None:
+        self._scroll_pending = False
         self.scrollToBottom()
-    
+
+    def rowCount(self) -> int:
+        return self.log_model.rowCount()
+
+    def columnCount(self) -> int:
+        return self.log_model.columnCount()
+
+    def rowTexts(self, row: int) -> List[str]:
+        return self.log_model.rowTexts(row)
+
     def setFilterHost(self, host: Optional[str]) -> None:
         """Filtre les logs pour n'afficher que ceux de l'hôte spécifié"""
+        if host == "Tous les équipements":
+            host = None
         self.filtered_host = host
-        self.clearTable()
-        
-        if not host or host == "Tous les équipements":
-            # Afficher tous les messages stockés
-            for msg in self.all_rows[-self.max_entries:]:
-                self.addMessage(msg[0], msg[1], msg[2], msg[3], msg[4])
-        else:
-            # Filtrer et afficher seulement les messages de l'hôte spécifié
-            filtered_msgs = [msg for msg in self.all_rows if msg[1].split(":")[0] == host]
-            for msg in filtered_msgs[-self.max_entries:]:
-                self.addMessage(msg[0], msg[1], msg[2], msg[3], msg[4])
-    
+        self.log_model.setFilterHost(host)
+        self.scrollToBottom()
+
+    def setFilter(self, host: Optional[str] = None, max_severity: Optional[int] = None,
+                  text: Optional[str] = None) -> None:
+        """Filtre combiné : hôte, sévérité maximale (0 = Emergency) et texte libre"""
+        if host == "Tous les équipements":
+            host = None
+        self.filtered_host = host
+        severities = set(range(max_severity + 1)) if max_severity is not None else None
+        self.log_model.setFilter(host, severities, text)
+        self.scrollToBottom()
+
     def clearTable(self) -> None:
-        """Vide la table sans perdre les données"""
-        self.clearContents()
-        self.setRowCount(0)
-        
+        """Vide la table et son historique"""
+        self.log_model.clear()
+
     def showContextMenu(self, position) -> None:
         menu = QMenu()
         copy_action = menu.addAction("Copier")
         clear_action = menu.addAction("Effacer la vue")
         export_action = menu.addAction("Exporter la sélection...")
-        
-        selected_indexes = self.selectedIndexes()
-        if not selected_indexes:
+
+        selected_rows = self.selectionModel().selectedRows()
+        if not selected_rows:
             copy_action.setEnabled(False)
             export_action.setEnabled(False)
-        
-        action = menu.exec_(self.mapToGlobal(position))
+
+        action = menu.exec_(self.viewport().mapToGlobal(position))
         if action == copy_action:
             self.copySelectedToClipboard()
         elif action == clear_action:
             self.clearTable()
-            self.all_rows = []  # Effacer aussi l'historique
         elif action == export_action:
             self.exportSelection()
-            
+
+    def _selectedRowNumbers(self) -> List[int]:
+        return sorted(index.row() for index in self.selectionModel().selectedRows())
+
     def copySelectedToClipboard(self) -> None:
-        selected_rows = {index.row() for index in self.selectedIndexes()}
         text = ""
-        for row in sorted(selected_rows):
-            row_data = []
-            for col in range(self.columnCount()):
-                item = self.item(row, col)
-                row_data.append(item.text() if item else "")
-            text += "\t".join(row_data) + "\n"
+        for row in self._selectedRowNumbers():
+            text += "\t".join(self.rowTexts(row)) + "\n"
         QApplication.clipboard().setText(text)
-        
+
     def exportSelection(self) -> None:
-        selected_rows = {index.row() for index in self.selectedIndexes()}
+        selected_rows = self._selectedRowNumbers()
         if not selected_rows:
             return
         file_path, _ = QFileDialog.getSaveFileName(
@@ -486,32 +693,108 @@ class EnhancedLogTable(QTableWidget):
             return
         try:
             with open(file_path, 'w', encoding='utf-8') as f:
-                headers = [self.horizontalHeaderItem(col).text() for col in range(self.columnCount())]
+                headers = SyslogLogModel.HEADERS
                 if file_path.lower().endswith('.csv'):
                     f.write(",".join([f'"{h}"' for h in headers]) + "\n")
-                    for row in sorted(selected_rows):
+                    for row in selected_rows:
                         row_data = []
-                        for col in range(self.columnCount()):
-                            item = self.item(row, col)
-                            cell_text = item.text() if item else ""
+                        for cell_text in self.rowTexts(row):
                             escaped_text = cell_text.replace('"', '""')
                             row_data.append(f'"{escaped_text}"')
                         f.write(",".join(row_data) + "\n")
                 else:
                     f.write("\t".join(headers) + "\n")
                     f.write("-" * 100 + "\n")
-                    for row in sorted(selected_rows):
-                        row_data = [self.item(row, col).text() if self.item(row, col) else "" for col in range(self.columnCount())]
-                        f.write("\t".join(row_data) + "\n")
+                    for row in selected_rows:
+                        f.write("\t".join(self.rowTexts(row)) + "\n")
             QMessageBox.information(self, "Export réussi", f"Les données ont été exportées vers {file_path}")
         except Exception as e:
             QMessageBox.critical(self, "Erreur", f"Erreur lors de l'export: {e}")
 
+# --- Historique compact par hôte ---
+class HostLogBuffer:
+    """Historique d'un hôte en colonnes parallèles (anneau) : pas de tuple ni de widget par message
+
+    Les colonnes grandissent par ajout jusqu'à la capacité, puis l'écriture boucle sur les plus anciens.
+    """
+    __slots__ = ("capacity", "_timestamps", "_sources", "_facilities", "_severities", "_messages",
+                 "_next", "_count", "_strings", "_last_timestamp")
+    MAX_INTERNED = 4096
+
+    def __init__(self, capacity: int = MAX_LOG_ENTRIES) -> None:
+        self.capacity = max(1, capacity)
+        self._timestamps: List[str] = []
+        self._sources: List[str] = []
+        self._facilities = array('B')
+        self._severities = array('B')
+        self._messages: List[str] = []
+        self._next = 0
+        self._count = 0
+        self._strings: Dict[str, str] = {}  # Sources "ip:port" partagées entre messages
+        self._last_timestamp = ""
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _intern(self, value: str) -> str:
+        cached = self._strings.get(value)
+        if cached is None:
+            if len(self._strings) >= self.MAX_INTERNED:
+                self._strings.clear()
+            self._strings[value] = cached = value
+        return cached
+
+    def extend(self, rows: List[tuple]) -> None:
+        """Ajoute des messages (timestamp, source, facility, severity, message)"""
+        capacity = self.capacity
+        for timestamp, source, facility_num, severity_num, message in rows:
+            if timestamp != self._last_timestamp:
+                self._last_timestamp = timestamp
+            if self._next < capacity:
+                self._timestamps.append(self._last_timestamp)
+                self._sources.append(self._intern(source))
+                self._facilities.append(facility_num & 0xFF)
+                self._severities.append(severity_num & 0xFF)
+                self._messages.append(message)
+            else:
+                slot = self._next % capacity
+                self._timestamps[slot] = self._last_timestamp
+                self._sources[slot] = self._intern(source)
+                self._facilities[slot] = facility_num & 0xFF
+                self._severities[slot] = severity_num & 0xFF
+                self._messages[slot] = message
+            self._next += 1
+        self._count = min(capacity, self._count + len(rows))
+
+    def rows(self) -> List[tuple]:
+        """Messages du plus ancien au plus récent"""
+        capacity = self.capacity
+        first = self._next - self._count
+        return [(self._timestamps[i % capacity], self._sources[i % capacity], self._facilities[i % capacity],
+                 self._severities[i % capacity], self._messages[i % capacity])
+                for i in range(first, self._next)]
+
+    def clear(self) -> None:
+        self._timestamps = []
+        self._sources = []
+        self._facilities = array('B')
+        self._severities = array('B')
+        self._messages = []
+        self._next = 0
+        self._count = 0
+        self._strings.clear()
+
 # --- Widget pour afficher les logs par hôte ---
 class HostLogWidget(QWidget):
+    OTHER_HOSTS_LABEL = "Autres"
+
     def __init__(self, parent=None) -> None:
         super().__init__(parent)
-        self.hosts = {}  # Dict[str, Dict[str, Any]]
+        # hôte -> {"buffer": HostLogBuffer, "table": EnhancedLogTable ou None (onglet fermé)}
+        self.hosts: Dict[str, dict] = {}
+        self._network_items: Dict[str, QTreeWidgetItem] = {}  # Libellé réseau -> nœud
+        self._network_keys: Dict[str, list] = {}  # Libellé réseau -> clés de tri de ses hôtes (ordre des enfants)
+        self._host_items: Dict[str, QTreeWidgetItem] = {}
         self.config = ServerConfig()  # Référence à la configuration
         self.initUI()
         
@@ -629,65 +912,83 @@ class HostLogWidget(QWidget):
     def filterHosts(self, text):
         """Filtre la liste des hôtes en fonction du texte de recherche"""
         search_text = text.lower()
-        for i in range(self.host_list.topLevelItemCount()):
-            network_item = self.host_list.topLevelItem(i)
-            
-            # Recherche dans les enfants (hôtes)
-            visible_children = 0
-            for j in range(network_item.childCount()):
-                host_item = network_item.child(j)
-                if search_text in host_item.text(0).lower():
-                    host_item.setHidden(False)
-                    visible_children += 1
-                else:
-                    host_item.setHidden(True)
-            
-            # Afficher/masquer le noeud réseau en fonction de ses enfants
-            network_item.setHidden(visible_children == 0)
+        visible_per_network: Dict[str, int] = defaultdict(int)
+        for host, host_item in self._host_items.items():
+            visible = search_text in host.lower()
+            host_item.setHidden(not visible)
+            if visible:
+                visible_per_network[self._networkLabel(host)] += 1
+        # Afficher/masquer le noeud réseau en fonction de ses enfants
+        for label, network_item in self._network_items.items():
+            network_item.setHidden(visible_per_network[label] == 0)
             
     def refreshHostList(self):
         """Actualise la liste des hôtes"""
         # Sauvegarder l'état d'expansion
-        expanded_networks = set()
-        for i in range(self.host_list.topLevelItemCount()):
-            network_item = self.host_list.topLevelItem(i)
-            if network_item.isExpanded():
-                expanded_networks.add(network_item.text(0))
+        expanded_networks = {label for label, item in self._network_items.items() if item.isExpanded()}
         
         # Reconstruire l'arborescence
         self.rebuildHostTree()
         
         # Restaurer l'état d'expansion
-        for i in range(self.host_list.topLevelItemCount()):
-            network_item = self.host_list.topLevelItem(i)
-            if network_item.text(0) in expanded_networks:
-                network_item.setExpanded(True)
+        for label, network_item in self._network_items.items():
+            network_item.setExpanded(label in expanded_networks)
                 
     def rebuildHostTree(self):
-        """Reconstruit l'arborescence des hôtes par réseau"""
+        """Reconstruit entièrement l'arborescence des hôtes par réseau (l'ajout d'un hôte est incrémental)"""
         self.host_list.clear()
-        
+        self._network_items.clear()
+        self._network_keys.clear()
+        self._host_items.clear()
+        for host in self.hosts:
+            self._addHostItem(host)
+        self.filterHosts(self.search_host.text())
+
+    @staticmethod
+    def _hostSortKey(host: str) -> list:
+        return [(0, int(p), "") if p.isdigit() else (1, 0, p) for p in re.split(r'[.:]', host)]
+
+    def _networkLabel(self, host: str) -> str:
         # Regrouper les hôtes par réseau (simplement par les 3 premiers octets)
-        networks = {}
-        for host in self.hosts.keys():
-            ip_parts = host.split('.')
-            if len(ip_parts) >= 3:  # S'assurer que c'est bien une IPv4
-                network = '.'.join(ip_parts[:3])
-                if network not in networks:
-                    networks[network] = []
-                networks[network].append(host)
-        
-        # Créer l'arborescence
-        for network, hosts in networks.items():
-            network_item = QTreeWidgetItem(self.host_list, [f"Réseau {network}.0/24"])
+        ip_parts = host.split('.')
+        if len(ip_parts) == 4:
+            return f"Réseau {'.'.join(ip_parts[:3])}.0/24"
+        return self.OTHER_HOSTS_LABEL
+
+    def _addHostItem(self, host: str) -> None:
+        """Insère un hôte à sa place dans l'arborescence (sans la reconstruire)"""
+        label = self._networkLabel(host)
+        network_item = self._network_items.get(label)
+        if network_item is None:
+            network_item = QTreeWidgetItem(self.host_list, [label])
             network_item.setExpanded(True)
-            
-            for host in sorted(hosts, key=lambda x: [int(p) if p.isdigit() else p for p in x.split('.')]):
-                host_item = QTreeWidgetItem(network_item, [host])
-                # Ajouter une icône ou un indicateur si des logs sont disponibles
-                if self.hosts[host]["tab_index"] >= 0:
-                    host_item.setForeground(0, QBrush(QColor("#2980b9")))
-                    host_item.setFont(0, QFont("", -1, QFont.Bold))
+            self._network_items[label] = network_item
+            self._network_keys[label] = []
+        keys = self._network_keys[label]
+        key = self._hostSortKey(host)
+        position = bisect.bisect(keys, key)
+        keys.insert(position, key)
+        host_item = QTreeWidgetItem([host])
+        network_item.insertChild(position, host_item)
+        self._host_items[host] = host_item
+        search_text = self.search_host.text().lower()
+        if search_text:
+            host_item.setHidden(search_text not in host.lower())
+            network_item.setHidden(all(network_item.child(j).isHidden() for j in range(network_item.childCount())))
+        if self.hosts[host]["table"] is not None:
+            self._setHostItemOpen(host, True)
+
+    def _setHostItemOpen(self, host: str, is_open: bool) -> None:
+        """Met en évidence dans l'arborescence les hôtes dont l'onglet est ouvert"""
+        host_item = self._host_items.get(host)
+        if host_item is None:
+            return
+        if is_open:
+            host_item.setForeground(0, QBrush(QColor("#2980b9")))
+            host_item.setFont(0, QFont("", -1, QFont.Bold))
+        else:
+            host_item.setForeground(0, self.host_list.palette().text())
+            host_item.setFont(0, self.host_list.font())
         
     def collapseAllTabs(self):
         """Ferme tous les onglets ouverts"""
@@ -696,12 +997,11 @@ class HostLogWidget(QWidget):
         
     def addHost(self, host: str) -> None:
         if host not in self.hosts:
-            # Ajouter l'hôte au dictionnaire
-            log_table = EnhancedLogTable()
-            self.hosts[host] = {"table": log_table, "tab_index": -1}
+            # Ajouter l'hôte au dictionnaire (la table n'est créée qu'à l'ouverture de son onglet)
+            self.hosts[host] = {"buffer": HostLogBuffer(), "table": None}
             
             # Mettre à jour l'arborescence
-            self.refreshHostList()
+            self._addHostItem(host)
             
     def hostSelected(self, item, column) -> None:
         """Gère la sélection d'un hôte dans l'arborescence"""
@@ -711,48 +1011,202 @@ class HostLogWidget(QWidget):
             
         host = item.text(0)
         if host in self.hosts:
-            if self.hosts[host]["tab_index"] >= 0:
-                self.log_tabs.setCurrentIndex(self.hosts[host]["tab_index"])
+            info = self.hosts[host]
+            if info["table"] is not None:
+                self.log_tabs.setCurrentWidget(info["table"])
             else:
-                log_table = self.hosts[host]["table"]
-                tab_index = self.log_tabs.addTab(log_table, host)
-                self.hosts[host]["tab_index"] = tab_index
-                self.log_tabs.setCurrentIndex(tab_index)
-                item.setForeground(0, QBrush(QColor("#2980b9")))
-                item.setFont(0, QFont("", -1, QFont.Bold))
+                # Matérialise la vue à partir de l'historique compact
+                log_table = EnhancedLogTable(capacity=info["buffer"].capacity)
+                log_table.host_name = host
+                log_table.addMessages(info["buffer"].rows())
+                info["table"] = log_table
+                self.log_tabs.setCurrentIndex(self.log_tabs.addTab(log_table, host))
+                self._setHostItemOpen(host, True)
                 
     def closeHostTab(self, index: int) -> None:
-        host_to_close = None
-        for host, info in self.hosts.items():
-            if info["tab_index"] == index:
-                host_to_close = host
-                break
-        if host_to_close:
-            self.hosts[host_to_close]["tab_index"] = -1
-            for host, info in self.hosts.items():
-                if info["tab_index"] > index:
-                    info["tab_index"] -= 1
-            self.log_tabs.removeTab(index)
-            
-            # Mettre à jour le style dans l'arborescence
-            for i in range(self.host_list.topLevelItemCount()):
-                network_item = self.host_list.topLevelItem(i)
-                for j in range(network_item.childCount()):
-                    host_item = network_item.child(j)
-                    if host_item.text(0) == host_to_close:
-                        host_item.setForeground(0, self.host_list.foreground(0))
-                        host_item.setFont(0, self.host_list.font())
-                        break
+        log_table = self.log_tabs.widget(index)
+        host_to_close = getattr(log_table, "host_name", None)
+        self.log_tabs.removeTab(index)
+        if host_to_close in self.hosts:
+            # La vue est détruite : seul l'historique compact est conservé
+            self.hosts[host_to_close]["table"] = None
+            self._setHostItemOpen(host_to_close, False)
+        if log_table is not None:
+            log_table.deleteLater()
             
     def addMessage(self, host: str, timestamp: str, source: str, facility_num: int, severity_num: int, message: str) -> None:
-        host_ip = source.split(":")[0]
-        if host_ip not in self.hosts:
-            self.addHost(host_ip)
-        self.hosts[host_ip]["table"].addMessage(timestamp, source, facility_num, severity_num, message)
+        self.addMessages([(timestamp, source, facility_num, severity_num, message)])
+        
+    def addMessages(self, messages: List[tuple]) -> None:
+        """Répartit un lot de messages par hôte (une insertion par historique et par onglet ouvert)"""
+        per_host = defaultdict(list)
+        for message in messages:
+            per_host[syslog_parser.source_host(message[1])].append(message)
+        for host_ip, host_messages in per_host.items():
+            info = self.hosts.get(host_ip)
+            if info is None:
+                self.addHost(host_ip)
+                info = self.hosts[host_ip]
+            info["buffer"].extend(host_messages)
+            if info["table"] is not None:
+                info["table"].addMessages(host_messages)
         
     def clearLogs(self) -> None:
         for host, info in self.hosts.items():
-            info["table"].clearTable()
+            info["buffer"].clear()
+            if info["table"] is not None:
+                info["table"].clearTable()
+
+# --- Widget de recherche dans l'archive ---
+class ArchiveSearchWidget(QWidget):
+    """Recherche paginée dans l'archive SQLite (les résultats ne sont jamais chargés en entier)"""
+    PAGE_SIZE = 200
+
+    def __init__(self, config: ServerConfig, parent=None) -> None:
+        super().__init__(parent)
+        self.config = config
+        self.archive: Optional[SyslogArchive] = None
+        self._cursors: List[Optional[tuple]] = [None]  # Curseur de chaque page affichée
+        self._next_cursor: Optional[tuple] = None
+        self.initUI()
+
+    def initUI(self) -> None:
+        layout = QVBoxLayout(self)
+        layout.setSpacing(10)
+        layout.setContentsMargins(20, 20, 20, 20)
+
+        criteria_group = QGroupBox("Critères de recherche")
+        criteria_group.setObjectName("sectionGroup")
+        criteria_layout = QFormLayout(criteria_group)
+
+        now = QDateTime.currentDateTime()
+        period_layout = QHBoxLayout()
+        self.start_edit = QDateTimeEdit(now.addDays(-1))
+        self.start_edit.setCalendarPopup(True)
+        self.start_edit.setDisplayFormat("yyyy-MM-dd HH:mm:ss")
+        self.end_edit = QDateTimeEdit(now.addSecs(3600))
+        self.end_edit.setCalendarPopup(True)
+        self.end_edit.setDisplayFormat("yyyy-MM-dd HH:mm:ss")
+        period_layout.addWidget(self.start_edit)
+        period_layout.addWidget(QLabel("à"))
+        period_layout.addWidget(self.end_edit)
+        criteria_layout.addRow("Période:", period_layout)
+
+        self.host_combo = QComboBox()
+        self.host_combo.setEditable(True)
+        self.host_combo.addItem("Tous les équipements")
+        criteria_layout.addRow("Équipement:", self.host_combo)
+
+        self.severity_combo = QComboBox()
+        self.severity_combo.addItem("Toutes", None)
+        for severity_num in range(8):
+            self.severity_combo.addItem(f"≤ {SyslogParser.get_severity_name(severity_num)} ({severity_num})", severity_num)
+        criteria_layout.addRow("Sévérité:", self.severity_combo)
+
+        self.text_edit = QLineEdit()
+        self.text_edit.setPlaceholderText("Texte contenu dans le message...")
+        self.text_edit.returnPressed.connect(self.search)
+        criteria_layout.addRow("Texte:", self.text_edit)
+
+        buttons_layout = QHBoxLayout()
+        search_btn = QPushButton("🔍 Rechercher")
+        search_btn.setObjectName("saveButton")
+        search_btn.clicked.connect(self.search)
+        self.newer_btn = QPushButton("◀ Plus récents")
+        self.newer_btn.setObjectName("settingsButton")
+        self.newer_btn.clicked.connect(self.previousPage)
+        self.older_btn = QPushButton("Plus anciens ▶")
+        self.older_btn.setObjectName("settingsButton")
+        self.older_btn.clicked.connect(self.nextPage)
+        self.page_label = QLabel("")
+        buttons_layout.addWidget(search_btn)
+        buttons_layout.addStretch()
+        buttons_layout.addWidget(self.newer_btn)
+        buttons_layout.addWidget(self.page_label)
+        buttons_layout.addWidget(self.older_btn)
+        criteria_layout.addRow(buttons_layout)
+        layout.addWidget(criteria_group)
+
+        self.result_table = EnhancedLogTable(capacity=self.PAGE_SIZE)
+        layout.addWidget(self.result_table, 1)
+        self._updatePagingButtons()
+
+    def _getArchive(self) -> Optional[SyslogArchive]:
+        path = self.config.get_archive_path()
+        if self.archive is None or self.archive.db_path != path:
+            if not os.path.exists(path):
+                return None
+            self.archive = SyslogArchive(path)
+        return self.archive
+
+    def _criteria(self) -> dict:
+        host = self.host_combo.currentText().strip()
+        max_severity = self.severity_combo.currentData()
+        return {
+            "start": self.start_edit.dateTime().toSecsSinceEpoch(),
+            "end": self.end_edit.dateTime().toSecsSinceEpoch(),
+            "hosts": [host] if host and host != "Tous les équipements" else None,
+            "severities": list(range(max_severity + 1)) if max_severity is not None else None,
+            "text": self.text_edit.text().strip() or None,
+        }
+
+    def refreshHosts(self) -> None:
+        """Recharge la liste des équipements présents dans l'archive"""
+        archive = self._getArchive()
+        if archive is None:
+            return
+        current = self.host_combo.currentText()
+        self.host_combo.blockSignals(True)
+        self.host_combo.clear()
+        self.host_combo.addItem("Tous les équipements")
+        self.host_combo.addItems(archive.hosts())
+        self.host_combo.setEditText(current)
+        self.host_combo.blockSignals(False)
+
+    def search(self) -> None:
+        self._cursors = [None]
+        self._loadPage()
+
+    def nextPage(self) -> None:
+        if self._next_cursor is not None:
+            self._cursors.append(self._next_cursor)
+            self._loadPage()
+
+    def previousPage(self) -> None:
+        if len(self._cursors) > 1:
+            self._cursors.pop()
+            self._loadPage()
+
+    def _loadPage(self) -> None:
+        archive = self._getArchive()
+        self.result_table.clearTable()
+        if archive is None:
+            self.page_label.setText("Aucune archive")
+            self._next_cursor = None
+            self._updatePagingButtons()
+            return
+        try:
+            page = archive.query(limit=self.PAGE_SIZE, before=self._cursors[-1], **self._criteria())
+        except Exception as e:
+            QMessageBox.critical(self, "Erreur", f"Erreur lors de la recherche dans l'archive: {e}")
+            return
+        self._next_cursor = archive.next_cursor(page) if len(page) == self.PAGE_SIZE else None
+        # Les pages arrivent du plus récent au plus ancien ; la table affiche le plus récent en bas
+        self.result_table.addMessages([
+            (datetime.fromtimestamp(received_at).strftime("%Y-%m-%d %H:%M:%S"), source, facility, severity, message)
+            for _, received_at, _, source, facility, severity, _, _, message in reversed(page)
+        ])
+        self.page_label.setText(f"Page {len(self._cursors)} - {len(page)} messages")
+        self._updatePagingButtons()
+
+    def _updatePagingButtons(self) -> None:
+        self.newer_btn.setEnabled(len(self._cursors) > 1)
+        self.older_btn.setEnabled(self._next_cursor is not None)
+
+    def showEvent(self, event) -> None:
+        super().showEvent(event)
+        if self.host_combo.count() <= 1:
+            self.refreshHosts()
 
 # --- Widget de statistiques amélioré ---
 class StatsWidget(QWidget):
@@ -796,6 +1250,10 @@ class StatsWidget(QWidget):
         self.msg_rate_label.setProperty("subtitle", "true")
         self.msg_rate_label.setAlignment(Qt.AlignCenter)
         msg_rate_layout.addWidget(self.msg_rate_label)
+        # Débits sur fenêtres glissantes et percentiles par seconde
+        self.rate_windows_label = QLabel("")
+        self.rate_windows_label.setAlignment(Qt.AlignCenter)
+        msg_rate_layout.addWidget(self.rate_windows_label)
         info_layout.addWidget(msg_rate_card)
         
         layout.addWidget(info_panel)
@@ -812,10 +1270,12 @@ class StatsWidget(QWidget):
         # Onglet "Top Hôtes"
         hosts_tab = QWidget()
         hosts_layout = QVBoxLayout(hosts_tab)
-        self.hosts_list = QTableWidget(0, 2)
-        self.hosts_list.setHorizontalHeaderLabels(["Hôte", "Messages"])
-        self.hosts_list.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
+        self.hosts_list = QTableWidget(0, 4)
+        self.hosts_list.setHorizontalHeaderLabels(["Hôte", "Messages", "Débit (msg/s)", "Répartition des sévérités"])
+        self.hosts_list.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeToContents)
         self.hosts_list.horizontalHeader().setSectionResizeMode(1, QHeaderView.ResizeToContents)
+        self.hosts_list.horizontalHeader().setSectionResizeMode(2, QHeaderView.ResizeToContents)
+        self.hosts_list.horizontalHeader().setSectionResizeMode(3, QHeaderView.Stretch)
         self.hosts_list.setEditTriggers(QTableWidget.NoEditTriggers)
         self.hosts_list.setAlternatingRowColors(True)
         hosts_layout.addWidget(self.hosts_list)
@@ -875,15 +1335,40 @@ class StatsWidget(QWidget):
             uptime_text = f"{uptime_seconds/3600:.1f} heures"
         self.uptime_label.setText(uptime_text)
         self.msg_count_label.setText(f"{stats['message_count']:,}".replace(',', ' '))
-        self.msg_rate_label.setText(f"{stats['msgs_per_second']:.2f} / sec")
-        
-        # Mise à jour de la liste des hôtes
-        self.hosts_list.setRowCount(0)
-        for host, count in stats["top_hosts"].items():
-            row = self.hosts_list.rowCount()
-            self.hosts_list.insertRow(row)
-            self.hosts_list.setItem(row, 0, QTableWidgetItem(host))
-            self.hosts_list.setItem(row, 1, QTableWidgetItem(str(count)))
+        dedup = stats.get("dedup")
+        if dedup:
+            self.msg_count_label.setToolTip(
+                f"Répétitions regroupées : {dedup['suppressed']:,} ({dedup['ratio'] * 100:.1f} %), "
+                f"{dedup['open_groups']} fenêtres ouvertes".replace(',', ' ')
+            )
+        self.msg_rate_label.setText(f"{stats.get('rate_1m', stats['msgs_per_second']):.2f} / sec")
+        if "rate_15m" in stats:
+            percentiles = stats.get("rate_percentiles_15m", {})
+            self.rate_windows_label.setText(
+                f"15 min: {stats['rate_15m']:.2f} - 1 h: {stats['rate_1h']:.2f} - "
+                f"p95: {percentiles.get('p95', 0):.0f} - max: {percentiles.get('max', 0):.0f} /s"
+            )
+        writer = stats.get("log_writer")
+        if writer:
+            self.msg_rate_label.setToolTip(
+                f"Écriture disque : {writer['bytes_per_second'] / 1024:.1f} Ko/s, "
+                f"{writer['commits']} commits, {writer['open_files']} fichiers ouverts, "
+                f"{writer['rotations']} rotations"
+            )
+
+        # Mise à jour de la liste des hôtes (top-K : taille bornée quel que soit le nombre d'hôtes)
+        host_details = stats.get("host_details") or [
+            {"host": host, "count": count} for host, count in stats["top_hosts"].items()
+        ]
+        self.hosts_list.setRowCount(len(host_details))
+        for row, details in enumerate(host_details):
+            count_text = str(details["count"])
+            if details.get("error"):
+                count_text += f" (±{details['error']})"
+            self.hosts_list.setItem(row, 0, QTableWidgetItem(details["host"]))
+            self.hosts_list.setItem(row, 1, QTableWidgetItem(count_text))
+            self.hosts_list.setItem(row, 2, QTableWidgetItem(f"{details.get('rate', 0.0):.2f}"))
+            self.hosts_list.setItem(row, 3, QTableWidgetItem(self._severityMix(details.get("severities"))))
         
         # Mise à jour de la liste des facilities
         self.facility_list.setRowCount(0)
@@ -910,6 +1395,110 @@ class StatsWidget(QWidget):
                     if int(severity_num) <= 2:  # Emergency, Alert, Critical
                         self.severity_list.item(row, col).setFont(QFont("", -1, QFont.Bold))
 
+    @staticmethod
+    def _severityMix(severities: Optional[List[int]]) -> str:
+        """Résumé de la répartition des sévérités d'un hôte (ex: Error 2% · Informational 98%)"""
+        if not severities:
+            return ""
+        total = sum(severities)
+        if not total:
+            return ""
+        return " · ".join(f"{SyslogParser.get_severity_name(num)} {count * 100 / total:.0f}%"
+                          for num, count in enumerate(severities) if count)
+
+# --- Boîte de dialogue d'export ---
+class SyslogExportDialog(QDialog):
+    """Choix de la source, du format et de la sélection (période, équipement, sévérité) d'un export"""
+    SOURCE_ARCHIVE = "archive"
+    SOURCE_BUFFER = "buffer"
+
+    def __init__(self, hosts: List[str], archive_available: bool, parent=None) -> None:
+        super().__init__(parent)
+        self.setWindowTitle("Exporter les logs")
+        self.setMinimumWidth(460)
+        layout = QFormLayout(self)
+
+        self.source_combo = QComboBox()
+        if archive_available:
+            self.source_combo.addItem("Archive (tous les messages enregistrés)", self.SOURCE_ARCHIVE)
+        self.source_combo.addItem("Messages en mémoire (tableau des logs)", self.SOURCE_BUFFER)
+        self.source_combo.currentIndexChanged.connect(self._updateControls)
+        layout.addRow("Source:", self.source_combo)
+
+        self.format_combo = QComboBox()
+        self.format_combo.addItem("CSV", FORMAT_CSV)
+        self.format_combo.addItem("JSON Lines", FORMAT_JSONL)
+        self.format_combo.addItem("Texte (tabulations)", FORMAT_TEXT)
+        layout.addRow("Format:", self.format_combo)
+
+        self.compress_check = QCheckBox("Compresser (gzip)")
+        layout.addRow("", self.compress_check)
+
+        now = QDateTime.currentDateTime()
+        self.period_check = QCheckBox("Limiter à une période")
+        period_layout = QHBoxLayout()
+        self.start_edit = QDateTimeEdit(now.addDays(-1))
+        self.start_edit.setCalendarPopup(True)
+        self.start_edit.setDisplayFormat("yyyy-MM-dd HH:mm:ss")
+        self.end_edit = QDateTimeEdit(now.addSecs(3600))
+        self.end_edit.setCalendarPopup(True)
+        self.end_edit.setDisplayFormat("yyyy-MM-dd HH:mm:ss")
+        period_layout.addWidget(self.start_edit)
+        period_layout.addWidget(QLabel("à"))
+        period_layout.addWidget(self.end_edit)
+        self.period_check.toggled.connect(self._updateControls)
+        layout.addRow("", self.period_check)
+        layout.addRow("Période:", period_layout)
+
+        self.host_combo = QComboBox()
+        self.host_combo.setEditable(True)
+        self.host_combo.addItem("Tous les équipements")
+        self.host_combo.addItems(hosts)
+        layout.addRow("Équipement:", self.host_combo)
+
+        self.severity_combo = QComboBox()
+        self.severity_combo.addItem("Toutes", None)
+        for severity_num in range(8):
+            self.severity_combo.addItem(f"≤ {SyslogParser.get_severity_name(severity_num)} ({severity_num})", severity_num)
+        layout.addRow("Sévérité:", self.severity_combo)
+
+        self.text_edit = QLineEdit()
+        self.text_edit.setPlaceholderText("Texte contenu dans le message (archive uniquement)...")
+        layout.addRow("Texte:", self.text_edit)
+
+        buttons = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel)
+        buttons.accepted.connect(self.accept)
+        buttons.rejected.connect(self.reject)
+        layout.addRow(buttons)
+        self._updateControls()
+
+    def _updateControls(self) -> None:
+        self.start_edit.setEnabled(self.period_check.isChecked())
+        self.end_edit.setEnabled(self.period_check.isChecked())
+        self.text_edit.setEnabled(self.source() == self.SOURCE_ARCHIVE)
+
+    def source(self) -> str:
+        return self.source_combo.currentData()
+
+    def exportFormat(self) -> str:
+        return self.format_combo.currentData()
+
+    def compress(self) -> bool:
+        return self.compress_check.isChecked()
+
+    def criteria(self) -> dict:
+        host = self.host_combo.currentText().strip()
+        max_severity = self.severity_combo.currentData()
+        criteria = {
+            "start": self.start_edit.dateTime().toSecsSinceEpoch() if self.period_check.isChecked() else None,
+            "end": self.end_edit.dateTime().toSecsSinceEpoch() if self.period_check.isChecked() else None,
+            "hosts": [host] if host and host != "Tous les équipements" else None,
+            "severities": list(range(max_severity + 1)) if max_severity is not None else None,
+        }
+        if self.source() == self.SOURCE_ARCHIVE:
+            criteria["text"] = self.text_edit.text().strip() or None
+        return criteria
+
 # Classe de boîte de dialogue d'erreur moderne
 class ModernErrorDialog(QMessageBox):
     def __init__(self, parent=None):
@@ -930,6 +1519,7 @@ class SyslogServerGUI(QMainWindow):
         self.config = ServerConfig()
         self.server = None
         self.active_hosts = set()  # Pour stocker les hôtes actifs
+        self.export_worker: Optional[SyslogExportWorker] = None
 
         # Onglets principaux en haut
         self.tab_widget = QTabWidget()
@@ -963,6 +1553,7 @@ class SyslogServerGUI(QMainWindow):
         self.addLogsTab()
         self.addStatsTab()
         self.addHostsTab()  # Onglet pour les logs par hôte
+        self.addArchiveTab()  # Recherche dans l'archive
 
     def addConfigTab(self):
         config_widget = QWidget()
@@ -1055,8 +1646,49 @@ class SyslogServerGUI(QMainWindow):
                         self.host_combo.addItem(f"{iface} - {addr['addr']}", addr['addr'])
         layout.addRow("Interface:", self.host_combo)
         layout.addRow("Port:", self.port_spin)
+
+        # Réception TCP (RFC 6587) et TLS
+        tcp_layout = QHBoxLayout()
+        self.tcp_check = QCheckBox("Activer")
+        self.tcp_port_spin = QSpinBox()
+        self.tcp_port_spin.setRange(1, 65535)
+        tcp_layout.addWidget(self.tcp_check)
+        tcp_layout.addWidget(self.tcp_port_spin, 1)
+        layout.addRow("TCP:", tcp_layout)
+
+        tls_layout = QHBoxLayout()
+        self.tls_check = QCheckBox("Activer")
+        self.tls_port_spin = QSpinBox()
+        self.tls_port_spin.setRange(1, 65535)
+        tls_layout.addWidget(self.tls_check)
+        tls_layout.addWidget(self.tls_port_spin, 1)
+        layout.addRow("TLS:", tls_layout)
+
+        self.tls_cert_edit = QLineEdit()
+        self.tls_cert_edit.setPlaceholderText("Certificat serveur (PEM)")
+        layout.addRow("Certificat:", self._fileRow(self.tls_cert_edit, "Certificat TLS"))
+        self.tls_key_edit = QLineEdit()
+        self.tls_key_edit.setPlaceholderText("Clé privée (PEM, vide si incluse dans le certificat)")
+        layout.addRow("Clé privée:", self._fileRow(self.tls_key_edit, "Clé privée TLS"))
         return group
 
+    def _fileRow(self, edit: QLineEdit, title: str) -> QHBoxLayout:
+        row = QHBoxLayout()
+        browse_btn = QPushButton("📂")
+        browse_btn.setObjectName("settingsButton")
+        browse_btn.clicked.connect(lambda: self._browseFile(edit, title))
+        row.addWidget(edit, 1)
+        row.addWidget(browse_btn)
+        return row
+
+    def _browseFile(self, edit: QLineEdit, title: str) -> None:
+        file_path, _ = QFileDialog.getOpenFileName(
+            self, title, edit.text() or os.path.expanduser("~"),
+            "Fichiers PEM (*.pem *.crt *.key);;Tous les fichiers (*)"
+        )
+        if file_path:
+            edit.setText(file_path)
+
     def createAdvancedGroup(self):
         group = QGroupBox("Options Avancées")
         group.setObjectName("sectionGroup")
@@ -1065,6 +1697,19 @@ class SyslogServerGUI(QMainWindow):
         self.save_logs_check = QCheckBox("Sauvegarder les logs")
         layout.addWidget(self.auto_start_check)
         layout.addWidget(self.save_logs_check)
+        
+        # Regroupement des répétitions (pris en compte au prochain démarrage du serveur)
+        dedup_layout = QHBoxLayout()
+        self.dedup_check = QCheckBox("Regrouper les messages répétés")
+        self.dedup_check.setToolTip("Même équipement, même mnémonique et même texte : une ligne et un compteur par fenêtre")
+        self.dedup_window_spin = QSpinBox()
+        self.dedup_window_spin.setRange(1, 3600)
+        self.dedup_window_spin.setSuffix(" s")
+        dedup_layout.addWidget(self.dedup_check)
+        dedup_layout.addWidget(QLabel("Fenêtre:"))
+        dedup_layout.addWidget(self.dedup_window_spin)
+        dedup_layout.addStretch()
+        layout.addLayout(dedup_layout)
         return group
 
     def addLogsTab(self):
@@ -1087,6 +1732,27 @@ class SyslogServerGUI(QMainWindow):
         filter_layout.addWidget(filter_label)
         filter_layout.addWidget(self.host_filter_combo)
         
+        # Filtres complémentaires (sévérité maximale et texte libre)
+        self.log_severity_combo = QComboBox()
+        self.log_severity_combo.addItem("Toutes sévérités", None)
+        for severity_num in range(8):
+            self.log_severity_combo.addItem(f"≤ {SyslogParser.get_severity_name(severity_num)} ({severity_num})", severity_num)
+        self.log_severity_combo.currentIndexChanged.connect(self.applyLogFilters)
+        
+        self.log_search_edit = QLineEdit()
+        self.log_search_edit.setPlaceholderText("Rechercher dans les messages...")
+        self.log_search_edit.setClearButtonEnabled(True)
+        self.log_search_edit.setMinimumWidth(220)
+        # Filtrage différé : évite un recalcul à chaque frappe
+        self.log_search_timer = QTimer(self)
+        self.log_search_timer.setSingleShot(True)
+        self.log_search_timer.setInterval(200)
+        self.log_search_timer.timeout.connect(self.applyLogFilters)
+        self.log_search_edit.textChanged.connect(self.log_search_timer.start)
+        
+        filter_layout.addWidget(self.log_severity_combo)
+        filter_layout.addWidget(self.log_search_edit)
+        
         # Boutons d'action
         clear_logs_btn = QPushButton("Effacer les logs")
         clear_logs_btn.setObjectName("clearButton")  # Rouge danger
@@ -1147,6 +1813,11 @@ class SyslogServerGUI(QMainWindow):
         """Ajoute un onglet pour afficher les logs par hôte"""
         self.tab_widget.addTab(self.host_log_widget, "Logs par hôte")
 
+    def addArchiveTab(self):
+        """Ajoute un onglet de recherche dans l'archive des messages"""
+        self.archive_widget = ArchiveSearchWidget(self.config)
+        self.tab_widget.addTab(self.archive_widget, "Archive")
+
     def applyStyles(self):
         self.setStyleSheet("""
             QMainWindow, QWidget {
@@ -1268,7 +1939,7 @@ class SyslogServerGUI(QMainWindow):
             }
             
             /* Styles pour les listes et tableaux */
-            QTableWidget, QTreeWidget, QListWidget {
+            QTableWidget, QTableView, QTreeWidget, QListWidget {
                 background-color: #1e2a36;
                 alternate-background-color: #283747;
                 color: #ecf0f1;
@@ -1327,6 +1998,17 @@ class SyslogServerGUI(QMainWindow):
         # Initialiser les contrôles avec les valeurs de config
         self.auto_start_check.setChecked(self.config.auto_start)
         self.save_logs_check.setChecked(self.config.save_logs)
+        self.dedup_check.setChecked(self.config.dedup_enabled)
+        self.dedup_window_spin.setValue(int(self.config.dedup_window))
+        self.dedup_check.toggled.connect(self.updateConfig)
+        self.tcp_check.setChecked(self.config.tcp_enabled)
+        self.tcp_port_spin.setValue(self.config.tcp_port)
+        self.tls_check.setChecked(self.config.tls_enabled)
+        self.tls_port_spin.setValue(self.config.tls_port)
+        self.tls_cert_edit.setText(self.config.tls_certfile)
+        self.tls_key_edit.setText(self.config.tls_keyfile)
+        self.tcp_check.toggled.connect(self.updateConfig)
+        self.tls_check.toggled.connect(self.updateConfig)
         
         if self.config.auto_start:
             QTimer.singleShot(500, self.startServer)
@@ -1339,15 +2021,27 @@ class SyslogServerGUI(QMainWindow):
         if selected_data:
             self.config.host = selected_data
         self.config.port = self.port_spin.value()
+        self._readReceptionControls()
         self.config.save_config()
         self.addLogMessage("Configuration mise à jour")
+
+    def _readReceptionControls(self) -> None:
+        """Reporte les options de réception (TCP/TLS, regroupement) de l'interface dans la configuration"""
+        self.config.tcp_enabled = self.tcp_check.isChecked()
+        self.config.tcp_port = self.tcp_port_spin.value()
+        self.config.tls_enabled = self.tls_check.isChecked()
+        self.config.tls_port = self.tls_port_spin.value()
+        self.config.tls_certfile = self.tls_cert_edit.text().strip()
+        self.config.tls_keyfile = self.tls_key_edit.text().strip()
+        self.config.dedup_enabled = self.dedup_check.isChecked()
+        self.config.dedup_window = float(self.dedup_window_spin.value())
             
     def startServer(self) -> None:
         """Démarre le serveur Syslog"""
         try:
             if not self.server:
                 self.server = SyslogServer(config=self.config)
-                self.server.signals.new_message.connect(self.onNewMessage)
+                self.server.signals.messages_batch.connect(self.onNewMessages)
                 self.server.signals.log_message.connect(self.addLogMessage)
                 self.server.signals.server_started.connect(self.onServerStarted)
                 self.server.signals.server_stopped.connect(self.onServerStopped)
@@ -1361,6 +2055,7 @@ class SyslogServerGUI(QMainWindow):
             self.config.port = self.port_spin.value()
             self.config.auto_start = self.auto_start_check.isChecked()
             self.config.save_logs = self.save_logs_check.isChecked()
+            self._readReceptionControls()
             self.config.save_config()
             
             self.server.start()
@@ -1392,24 +2087,22 @@ class SyslogServerGUI(QMainWindow):
         self.status_label.setStyleSheet("padding: 5px; border-radius: 3px; background-color: #e74c3c; color: white; font-weight: bold;")
         self.addLogMessage("Serveur SYSLOG arrêté")
     
-    def onNewMessage(self, timestamp: str, source: str, facility_num: int, severity_num: int, message: str) -> None:
-        """Callback lorsqu'un nouveau message est reçu"""
-        self.log_table.addMessage(timestamp, source, facility_num, severity_num, message)
-        self.host_log_widget.addMessage(source, timestamp, source, facility_num, severity_num, message)
+    def onNewMessages(self, messages: list) -> None:
+        """Callback lorsqu'un lot de messages est reçu"""
+        self.log_table.addMessages(messages)
+        self.host_log_widget.addMessages(messages)
         
         # Mise à jour des statistiques rapides
         if self.server:
             stats = self.server.stats
             self.msg_count_label.setText(f"Messages: {stats.message_count}")
-            uptime = (datetime.now() - stats.start_time).total_seconds()
-            msgs_per_sec = stats.message_count / max(1, uptime)
-            self.msg_rate_label.setText(f"Débit: {msgs_per_sec:.2f}/s")
+            self.msg_rate_label.setText(f"Débit: {stats.current_rate(60):.2f}/s")
     
     def onStatsUpdated(self, stats: dict) -> None:
         """Callback lorsque les statistiques sont mises à jour"""
         self.stats_widget.updateStats(stats)
         self.msg_count_label.setText(f"Messages: {stats['message_count']}")
-        self.msg_rate_label.setText(f"Débit: {stats['msgs_per_second']:.2f}/s")
+        self.msg_rate_label.setText(f"Débit: {stats.get('rate_1m', stats['msgs_per_second']):.2f}/s")
     
     def onActiveHostsUpdated(self, hosts: set) -> None:
         """Callback lorsque la liste des hôtes actifs est mise à jour"""
@@ -1436,10 +2129,16 @@ class SyslogServerGUI(QMainWindow):
     
     def filterLogsByHost(self, host: str) -> None:
         """Filtre les logs pour afficher uniquement ceux de l'hôte sélectionné"""
-        if host == "Tous les équipements":
-            self.log_table.setFilterHost(None)
-        else:
-            self.log_table.setFilterHost(host)
+        self.applyLogFilters()
+    
+    def applyLogFilters(self) -> None:
+        """Applique les filtres combinés (équipement, sévérité, texte) à la table principale"""
+        self.log_search_timer.stop()
+        self.log_table.setFilter(
+            self.host_filter_combo.currentText(),
+            self.log_severity_combo.currentData(),
+            self.log_search_edit.text().strip()
+        )
         
     def clearLogs(self) -> None:
         """Efface tous les logs affichés"""
@@ -1451,44 +2150,65 @@ class SyslogServerGUI(QMainWindow):
         )
         if reply == QMessageBox.Yes:
             self.log_table.clearTable()
-            self.log_table.all_rows = []  # Effacer aussi l'historique
             self.host_log_widget.clearLogs()
             self.addLogMessage("Tous les logs ont été effacés")
     
     def saveLogs(self) -> None:
-        """Exporte les logs dans un fichier"""
+        """Exporte les logs en arrière-plan (archive ou messages en mémoire)"""
+        if self.export_worker is not None and self.export_worker.isRunning():
+            QMessageBox.information(self, "Export en cours", "Un export est déjà en cours.")
+            return
+        archive_path = self.config.get_archive_path()
+        dialog = SyslogExportDialog(sorted(self.active_hosts), os.path.exists(archive_path), self)
+        if dialog.exec_() != QDialog.Accepted:
+            return
+
+        export_format, compress = dialog.exportFormat(), dialog.compress()
+        extension = f".{export_format}" + (".gz" if compress else "")
         file_path, _ = QFileDialog.getSaveFileName(
             self, "Sauvegarder les logs",
-            os.path.join(os.path.expanduser("~"), "syslog_export.txt"),
-            "Fichiers texte (*.txt);;Fichiers CSV (*.csv);;Tous les fichiers (*)"
+            os.path.join(os.path.expanduser("~"), f"syslog_export{extension}"),
+            f"Export syslog (*{extension});;Tous les fichiers (*)"
         )
-        if file_path:
-            try:
-                with open(file_path, 'w', encoding='utf-8') as f:
-                    headers = ["Timestamp", "Source", "Facility", "Severity", "Message"]
-                    if file_path.lower().endswith('.csv'):
-                        f.write(",".join([f'"{h}"' for h in headers]) + "\n")
-                        for row in range(self.log_table.rowCount()):
-                            row_data = []
-                            for col in range(self.log_table.columnCount()):
-                                item = self.log_table.item(row, col)
-                                cell_text = item.text() if item else ""
-                                escaped_text = cell_text.replace('"', '""')
-                                row_data.append(f'"{escaped_text}"')
-                            f.write(",".join(row_data) + "\n")
-                    else:
-                        f.write("\t".join(headers) + "\n")
-                        f.write("-" * 100 + "\n")
-                        for row in range(self.log_table.rowCount()):
-                            row_data = []
-                            for col in range(self.log_table.columnCount()):
-                                item = self.log_table.item(row, col)
-                                row_data.append(item.text() if item else "")
-                            f.write("\t".join(row_data) + "\n")
-                QMessageBox.information(self, "Export réussi", f"Les données ont été exportées vers {file_path}")
-            except Exception as e:
-                QMessageBox.critical(self, "Erreur", f"Erreur lors de la sauvegarde: {e}")
-                self.addLogMessage(f"Erreur lors de la sauvegarde: {e}", error=True)
+        if not file_path:
+            return
+
+        if dialog.source() == SyslogExportDialog.SOURCE_ARCHIVE:
+            self.export_worker = SyslogExportWorker(file_path, export_format, compress,
+                                                    archive_path=archive_path, criteria=dialog.criteria())
+        else:
+            # Instantané des références (copie rapide) : l'export ne bloque pas la réception
+            self.export_worker = SyslogExportWorker(file_path, export_format, compress,
+                                                    buffer_rows=list(self.log_table.log_model.iterRows()),
+                                                    criteria=dialog.criteria())
+
+        self.export_progress = QProgressDialog("Préparation de l'export...", "Annuler", 0, 100, self)
+        self.export_progress.setWindowTitle("Export des logs")
+        self.export_progress.setMinimumDuration(0)
+        self.export_progress.setAutoClose(False)
+        self.export_progress.setAutoReset(False)
+        self.export_progress.canceled.connect(self.export_worker.cancel)
+        self.export_worker.progress_updated.connect(self.export_progress.setValue)
+        self.export_worker.status_updated.connect(self.export_progress.setLabelText)
+        self.export_worker.export_finished.connect(self.onExportFinished)
+        self.export_worker.error_occurred.connect(self.onExportError)
+        self.export_worker.finished.connect(self.export_progress.close)
+        self.export_worker.start()
+        self.addLogMessage(f"Export des logs vers {file_path}...")
+
+    def onExportFinished(self, file_path: str, count: int) -> None:
+        self.addLogMessage(f"{count} messages exportés vers {file_path}")
+        QMessageBox.information(self, "Export réussi", f"{count} messages ont été exportés vers {file_path}")
+
+    def _stopExport(self) -> None:
+        """Annule l'export en cours (le fichier partiel est supprimé)"""
+        if self.export_worker is not None and self.export_worker.isRunning():
+            self.export_worker.cancel()
+            self.export_worker.wait(5000)
+
+    def onExportError(self, error: str) -> None:
+        self.addLogMessage(error, error=True)
+        QMessageBox.critical(self, "Erreur", error)
         
     def addLogMessage(self, message: str, error: bool = False) -> None:
         """Ajoute un message au journal de l'application"""
@@ -1520,10 +2240,12 @@ class SyslogServerGUI(QMainWindow):
                 )
                 if reply == QMessageBox.Yes:
                     self.server.stop()
+                    self._stopExport()
                     event.accept()
                 else:
                     event.ignore()
             else:
+                self._stopExport()
                 event.accept()
         except Exception as e:
             logger.error(f"Erreur lors de la fermeture: {e}")
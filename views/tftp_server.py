@@ -5,8 +5,8 @@ import threading
 import time
 import logging
 from datetime import datetime
-from collections import defaultdict
-from typing import Dict, Optional, Tuple, Any
+from collections import OrderedDict, deque
+from typing import Deque, Dict, Optional, Tuple, Any
 
 from PyQt5.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QFormLayout, QLineEdit, 
@@ -18,6 +18,7 @@ from PyQt5.QtCore import Qt, QThreadPool, QObject, pyqtSignal, QTimer
 from PyQt5.QtGui import QBrush, QColor
 
 from worker.tftp_worker import TFTPWorker, TFTPServerSignals
+from worker.tftp_engine import TFTPEngine, TFTPEngineListener, TransferProgress
 
 # Tentative d'importation de netifaces pour obtenir les interfaces réseau
 try:
@@ -32,27 +33,6 @@ logging.basicConfig(level=logging.INFO,
                     handlers=[logging.StreamHandler()])
 logger = logging.getLogger("TFTPServer")
 
-# -------------------- CONSTANTES DU PROTOCOLE TFTP -------------------- #
-OPCODE_RRQ = 1    # Read request
-OPCODE_WRQ = 2    # Write request
-OPCODE_DATA = 3   # Data packet
-OPCODE_ACK = 4    # Acknowledgment
-OPCODE_ERROR = 5  # Error
-OPCODE_OACK = 6   # Option Acknowledgment (RFC2347)
-
-# TFTP Error codes
-ERROR_NOT_DEFINED = 0
-ERROR_FILE_NOT_FOUND = 1
-ERROR_ACCESS_VIOLATION = 2
-ERROR_DISK_FULL = 3
-ERROR_ILLEGAL_OPERATION = 4
-ERROR_UNKNOWN_TRANSFER_ID = 5
-ERROR_FILE_EXISTS = 6
-ERROR_NO_SUCH_USER = 7
-
-# Pour Windows, on limite la taille de bloc négociée à 1024 octets.
-MAX_ALLOWED_BLKSIZE = 1024 if sys.platform.startswith('win') else 8192
-
 # -------------------- CLASSE DE SIGNALS -------------------- #
 class TFTPServerSignals(QObject):
     log_message = pyqtSignal(str, str)     # niveau, message
@@ -63,34 +43,40 @@ class TFTPServerSignals(QObject):
     transfer_completed = pyqtSignal(str, bool) # client_id, succès
 
 # -------------------- CLASSE DU SERVEUR TFTP -------------------- #
-class TFTPServer:
-    def __init__(self, interface='0.0.0.0', port=69, block_size=8192, root_dir='./tftp_root', timeout=5.0):
+class TFTPServer(TFTPEngineListener):
+    """Serveur TFTP du GUI : état des clients et transferts, signaux Qt.
+
+    Le protocole est assuré par TFTPEngine (worker.tftp_engine), qui sert tous les transferts
+    depuis une seule boucle ; ce serveur en reçoit les événements.
+    """
+    MAX_CLIENTS = 1024   # Résumés de clients conservés (les inactifs les plus anciens sont oubliés)
+    RECENT_FILES = 5     # Derniers fichiers retenus par client
+
+    def __init__(self, interface='0.0.0.0', port=69, block_size=8192, root_dir='./tftp_root', timeout=5.0,
+                 max_sessions=256, cache_bytes=256 * 1024 * 1024, history_size=500):
         self.interface = interface
         self.port = port
         # Sur Windows, forcer la taille de bloc à 1024 par défaut
         self.block_size = 1024 if sys.platform.startswith('win') else block_size
         self.root_dir = os.path.abspath(root_dir)
         self.timeout = timeout
-        self.clients: Dict[str, Dict[str, Any]] = {}
-        self.transfers: Dict[str, Dict[str, Any]] = defaultdict(dict)
-        self.lock = threading.Lock()
-        self.running = False
-        self.sock: Optional[socket.socket] = None
+        self.clients: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()  # Résumés par adresse IP
+        self.history: Deque[Dict[str, Any]] = deque(maxlen=history_size)  # Transferts terminés
+        self._active_transfers: Dict[str, TransferProgress] = {}  # Transferts en cours, par ip:port
+        self._active_clients = 0
+        self.lock = threading.Lock()  # Événements du moteur (début/fin, clients), pas la progression
         self.signals = TFTPServerSignals()
+        self.engine = TFTPEngine(interface=interface, port=port, root_dir=self.root_dir, timeout=timeout,
+                                 max_sessions=max_sessions, cache_bytes=cache_bytes, listener=self)
 
-        # Options TFTP supportées
-        self.support_options = True
-        self.default_options = {
-            'blksize': str(self.block_size),
-            'timeout': str(timeout)
-        }
-        
         self.statistics = {
             'total_transfers': 0,
             'successful_transfers': 0,
             'failed_transfers': 0,
             'bytes_uploaded': 0,
             'bytes_downloaded': 0,
+            'seconds_uploaded': 0.0,
+            'seconds_downloaded': 0.0,
             'start_time': time.time()
         }
         
@@ -100,579 +86,184 @@ class TFTPServer:
         
         logger.info(f"Server initialized with root directory: {self.root_dir}")
         logger.info(f"Platform detected: {'Windows' if self.is_windows else 'Unix-like'}")
-        logger.info(f"Server parameters: Interface={interface}, Port={port}, Block Size={block_size}, Timeout={timeout}s")
-    
-    def debug_socket_buffers(self):
-        """Affiche les tailles actuelles des tampons de socket pour le débogage"""
-        try:
-            test_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-            current_recv = test_socket.getsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF)
-            current_send = test_socket.getsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF)
-            logger.info(f"Current socket buffers - Receive: {current_recv} bytes, Send: {current_send} bytes")
-            test_sizes = [8192, 16384, 32768, 65536, 131072, 262144]
-            max_recv = current_recv
-            max_send = current_send
-            for size in test_sizes:
-                try:
-                    test_socket.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, size)
-                    actual_recv = test_socket.getsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF)
-                    if actual_recv > max_recv:
-                        max_recv = actual_recv
-                    test_socket.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, size)
-                    actual_send = test_socket.getsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF)
-                    if actual_send > max_send:
-                        max_send = actual_send
-                except Exception as e:
-                    logger.info(f"Error testing buffer size {size}: {e}")
-                    break
-            logger.info(f"Max socket buffers - Receive: {max_recv} bytes, Send: {max_send} bytes")
-            test_socket.close()
-            return max_recv, max_send
-        except Exception as e:
-            logger.error(f"Error debugging socket buffers: {e}")
-            return 65536, 65536
+        logger.info(f"Server parameters: Interface={interface}, Port={port}, Block Size={block_size}, "
+                    f"Timeout={timeout}s, Max sessions={max_sessions}")
+
+    @property
+    def running(self) -> bool:
+        return self.engine.running
+
+    @property
+    def sock(self) -> Optional[socket.socket]:
+        return self.engine.sock
+
+    @property
+    def support_options(self) -> bool:
+        return self.engine.support_options
+
+    @support_options.setter
+    def support_options(self, value: bool) -> None:
+        self.engine.support_options = value
 
     def start(self):
-        """Démarre le serveur TFTP"""
+        """Démarre le serveur TFTP (bloquant jusqu'à stop())"""
         try:
-            self.running = True
-            if self.is_windows:
-                max_recv, max_send = self.debug_socket_buffers()
-            else:
-                max_recv, max_send = 65536, 65536
-            self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-            self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-            self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, max_recv)
-            self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, max_send)
-            actual_recv = self.sock.getsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF)
-            actual_send = self.sock.getsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF)
-            logger.info(f"Configured socket buffers - Receive: {actual_recv} bytes, Send: {actual_send} bytes")
-            
-            bind_attempts = 0
-            max_attempts = 5
-            while bind_attempts < max_attempts:
-                try:
-                    self.sock.bind((self.interface, self.port))
-                    break
-                except OSError as e:
-                    if e.errno == 10048:
-                        bind_attempts += 1
-                        wait_time = bind_attempts * 2
-                        logger.warning(f"Port {self.port} is busy, waiting {wait_time} seconds (attempt {bind_attempts}/{max_attempts})")
-                        time.sleep(wait_time)
-                    else:
-                        raise
-            if bind_attempts >= max_attempts:
-                raise OSError(f"Failed to bind to port {self.port} after {max_attempts} attempts")
-            
-            logger.info(f"Server started on {self.interface}:{self.port}")
-            self.signals.log_message.emit("INFO", f"Server started on {self.interface}:{self.port}")
-            self.sock.setblocking(False)
-            
-            while self.running:
-                try:
-                    import select
-                    ready, _, _ = select.select([self.sock], [], [], 0.5)
-                    if ready:
-                        try:
-                            # Lecture : on reçoit au maximum block_size + 4 octets
-                            data, client_addr = self.sock.recvfrom(self.block_size + 4)
-                            client_thread = threading.Thread(
-                                target=self.handle_client,
-                                args=(data, client_addr),
-                                daemon=True
-                            )
-                            client_thread.start()
-                        except (ConnectionResetError, OSError) as e:
-                            logger.error(f"Socket receive error: {str(e)}")
-                            continue
-                    time.sleep(0.01)
-                except Exception as e:
-                    if self.running:
-                        logger.error(f"Server loop error: {str(e)}")
-                        continue
-                    else:
-                        break
+            self.engine.run()
         except Exception as e:
             logger.error(f"Failed to start server: {str(e)}")
             self.signals.log_message.emit("ERROR", f"Failed to start server: {str(e)}")
-            self.running = False
             raise
-        finally:
-            logger.info("Server main loop exited")
     
     def stop(self):
         """Arrête le serveur TFTP"""
         logger.info("Stopping server...")
-        self.running = False
-        time.sleep(0.5)
-        if self.sock:
-            try:
-                dummy_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-                dummy_socket.sendto(b'', ('127.0.0.1', self.port))
-                dummy_socket.close()
-                self.sock.close()
-                self.sock = None
-            except Exception as e:
-                logger.error(f"Error while closing server socket: {str(e)}")
+        self.engine.stop()
         logger.info("Server stopped")
         self.signals.log_message.emit("INFO", "Server stopped")
-    
-    def handle_client(self, data: bytes, client_addr: Tuple[str, int]):
-        """Gère les requêtes clients TFTP"""
-        client_ip, client_port = client_addr
-        client_id = f"{client_ip}:{client_port}"
-        try:
-            if len(data) < 2:
-                self.send_error(client_addr, ERROR_ILLEGAL_OPERATION, "Invalid packet size")
-                return
-            opcode = int.from_bytes(data[:2], 'big')
-            if opcode not in [OPCODE_RRQ, OPCODE_WRQ, OPCODE_DATA, OPCODE_ACK, OPCODE_ERROR]:
-                logger.warning(f"Invalid opcode {opcode} from {client_id}")
-                self.send_error(client_addr, ERROR_ILLEGAL_OPERATION, f"Illegal TFTP operation: {opcode}")
-                return
-
-            with self.lock:
-                if client_id not in self.clients:
-                    self.clients[client_id] = {
-                        'ip': client_ip,
-                        'port': client_port,
-                        'last_seen': datetime.now(),
-                        'active': True
-                    }
-                    self.signals.client_connected.emit(client_id, self.clients[client_id])
-                else:
-                    self.clients[client_id]['last_seen'] = datetime.now()
-                    self.clients[client_id]['active'] = True
-            
-            if opcode == OPCODE_RRQ:
-                filename, mode, options = self.parse_tftp_request(data[2:])
-                logger.info(f"Received READ request from {client_id} for file: {filename}")
-                filepath = os.path.join(self.root_dir, filename)
-                file_size = os.path.getsize(filepath) if os.path.exists(filepath) else 0
-                if options and 'tsize' in options:
-                    options['tsize'] = str(file_size)
-                self.signals.log_message.emit("INFO", f"Received READ request from {client_id} for file: {filename}")
-                self.record_transfer(client_id, filename, 'download', file_size)
-                thread = threading.Thread(
-                    target=self.handle_read_request,
-                    args=(client_addr, filename, mode, options),
-                    daemon=True
-                )
-                thread.start()
-            elif opcode == OPCODE_WRQ:
-                filename, mode, options = self.parse_tftp_request(data[2:])
-                logger.info(f"Received WRITE request from {client_id} for file: {filename}")
-                file_size = int(options.get('tsize', 0)) if options else 0
-                self.signals.log_message.emit("INFO", f"Received WRITE request from {client_id} for file: {filename}")
-                self.record_transfer(client_id, filename, 'upload', file_size)
-                thread = threading.Thread(
-                    target=self.handle_write_request,
-                    args=(client_addr, filename, mode, options),
-                    daemon=True
-                )
-                thread.start()
-        except Exception as e:
-            logger.error(f"Error handling client {client_id}: {str(e)}")
-            self.send_error(client_addr, ERROR_NOT_DEFINED, str(e))
-            self.signals.transfer_completed.emit(client_id, False)
-
-    def parse_tftp_request(self, data: bytes) -> Tuple[str, str, Dict[str, str]]:
-        """Extrait le nom de fichier, le mode et les options supportées (blksize, timeout, tsize)."""
-        try:
-            parts = data.split(b'\x00')
-            if len(parts) < 2:
-                raise ValueError("Invalid TFTP request format")
-            filename = parts[0].decode('utf-8')
-            mode = parts[1].decode('utf-8').lower()
-            filename = os.path.normpath(filename).lstrip('/')
-            if mode not in ['netascii', 'octet', 'mail']:
-                logger.warning(f"Unsupported mode: {mode}, using octet")
-                mode = 'octet'
-            valid_options = {"blksize", "timeout", "tsize"}
-            options = {}
-            i = 2
-            while i < len(parts) - 1:
-                if parts[i] and parts[i+1]:
-                    try:
-                        key = parts[i].decode('utf-8').lower()
-                        value = parts[i+1].decode('utf-8')
-                        if key in valid_options:
-                            if key == 'blksize':
-                                # Limiter la taille des blocs sur Windows
-                                requested_size = int(value)
-                                if sys.platform.startswith('win'):
-                                    value = str(min(requested_size, MAX_ALLOWED_BLKSIZE))
-                                    logger.info(f"Adjusting block size from {requested_size} to {value} for Windows compatibility")
-                            options[key] = value
-                            logger.info(f"Option negotiation: {key}={value}")
-                        else:
-                            logger.info(f"Ignoring unsupported option: {key}={value}")
-                    except Exception as e:
-                        logger.warning(f"Error parsing option: {e}")
-                    i += 2
-            return filename, mode, options
-        except Exception as e:
-            logger.error(f"Error parsing TFTP request: {str(e)}")
-            raise ValueError(f"Invalid TFTP request format: {str(e)}")
-
-    def handle_read_request(self, client_addr: Tuple[str, int], filename: str, mode: str, options: Dict[str, str] = None):
-        """Traite une demande de lecture (download) d'un fichier"""
-        client_ip, client_port = client_addr 
-        client_id = f"{client_ip}:{client_port}"
-        filepath = os.path.join(self.root_dir, filename)
-        
-        # Vérification d'accès et existence du fichier
-        if not os.path.abspath(filepath).startswith(self.root_dir):
-            logger.warning(f"Access violation attempt from {client_id}: {filename}")
-            self.send_error(client_addr, ERROR_ACCESS_VIOLATION, "Access violation")
-            return
-        if not os.path.exists(filepath) or not os.path.isfile(filepath):
-            logger.warning(f"File not found: {filepath}")
-            self.send_error(client_addr, ERROR_FILE_NOT_FOUND, "File not found")
-            return
-        
-        # Préparation des options de transfert
-        if options is None:
-            options = {}
-        negotiated_options = {}
-        
-        # SOLUTION CLÉE: Limiter la taille du bloc à une valeur sûre pour éviter les erreurs Windows
-        safe_blksize = 1024 if self.is_windows else 8192
-        
-        if self.support_options and options:
-            if 'blksize' in options:
-                try:
-                    requested_blksize = int(options['blksize'])
-                    if self.is_windows:
-                        logger.warning(f"Client requested blksize {requested_blksize}, but Windows has buffer limitations")
-                        logger.warning(f"Using safe blksize of {safe_blksize} to avoid WinError 10040")
-                        negotiated_options['blksize'] = str(safe_blksize)
-                    else:
-                        negotiated_options['blksize'] = options['blksize']
-                    logger.info(f"Option negotiation: blksize={negotiated_options['blksize']}")
-                except ValueError:
-                    negotiated_options['blksize'] = str(safe_blksize)
-            if 'timeout' in options:
-                negotiated_options['timeout'] = options['timeout']
-            if 'tsize' in options and options['tsize'] == '0' and os.path.exists(filepath):
-                negotiated_options['tsize'] = str(os.path.getsize(filepath))
-                logger.info(f"File size (tsize): {negotiated_options['tsize']} bytes")
-        
-        requested_blksize = int(negotiated_options.get('blksize', safe_blksize))
-        
-        # Création du socket de transfert
-        transfer_socket = None
-        try:
-            transfer_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-            # Configuration des tampons pour le socket de transfert (512KB)
-            try:
-                buffer_size = 524288  # 512 KB
-                transfer_socket.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, buffer_size)
-                transfer_socket.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, buffer_size)
-                actual_recv = transfer_socket.getsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF)
-                actual_send = transfer_socket.getsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF)
-                logger.info(f"Transfer socket buffers - Receive: {actual_recv} bytes, Send: {actual_send} bytes")
-            except Exception as e:
-                logger.warning(f"Could not set socket buffer sizes: {e}")
-            
-            transfer_socket.bind((self.interface, 0))
-            transfer_socket.settimeout(self.timeout)
-            _, transfer_port = transfer_socket.getsockname()
-            logger.info(f"Starting RRQ transfer to {client_id} from port {transfer_port}")
-            
-            # Envoi de l'OACK si des options négociées sont présentes
-            if negotiated_options:
-                logger.info(f"Sending OACK to {client_id} with options: {negotiated_options}")
-                packet = bytearray()
-                packet.extend(OPCODE_OACK.to_bytes(2, 'big'))
-                for key, value in negotiated_options.items():
-                    packet.extend(key.encode('utf-8') + b'\x00')
-                    packet.extend(value.encode('utf-8') + b'\x00')
-                oack_acknowledged = False
-                retry_count = 0
-                max_retries = 5
-                while not oack_acknowledged and retry_count < max_retries:
-                    try:
-                        transfer_socket.sendto(packet, client_addr)
-                        transfer_socket.settimeout(self.timeout)
-                        response, addr = transfer_socket.recvfrom(4)
-                        if addr != client_addr:
-                            logger.warning(f"Received response from unexpected address: {addr}")
-                            continue
-                        if len(response) < 4:
-                            logger.warning(f"Received packet too small: {len(response)} bytes")
-                            continue
-                        resp_opcode = int.from_bytes(response[:2], 'big')
-                        if resp_opcode == OPCODE_ACK:
-                            block_num = int.from_bytes(response[2:4], 'big')
-                            if block_num == 0:
-                                logger.info(f"Client {client_id} acknowledged options with ACK 0")
-                                oack_acknowledged = True
-                            else:
-                                logger.warning(f"Expected ACK 0, got ACK {block_num}")
-                        elif resp_opcode == OPCODE_ERROR:
-                            error_code = int.from_bytes(response[2:4], 'big')
-                            error_msg = response[4:].split(b'\x00')[0].decode('utf-8', errors='replace')
-                            logger.error(f"Client rejected options with error {error_code}: {error_msg}")
-                            logger.info("Falling back to standard TFTP (no options)")
-                            requested_blksize = 512  # Taille par défaut du TFTP standard 
-                            negotiated_options = {}
-                            oack_acknowledged = True
-                        else:
-                            logger.warning(f"Expected ACK or ERROR, got opcode {resp_opcode}")
-                    except socket.timeout:
-                        retry_count += 1
-                        logger.warning(f"Timeout waiting for OACK acknowledgment, retry {retry_count}/{max_retries}")
-                    except Exception as e:
-                        logger.error(f"Error in OACK handshake: {str(e)}")
-                        raise
-                if not oack_acknowledged:
-                    raise Exception("Failed to negotiate options - max retries exceeded")
-            
-            # Envoi du fichier
-            with open(filepath, 'rb') as f:
-                file_size = os.path.getsize(filepath)
-                # Stocker la taille du fichier dans le transfert pour le calcul de progression
-                with self.lock:
-                    if client_id in self.transfers:
-                        self.transfers[client_id]['file_size'] = file_size
-                block_number = 1
-                bytes_sent = 0
-                start_time = time.time()
-                while self.running:
-                    data_chunk = f.read(requested_blksize)
-                    if not data_chunk:
-                        break
-                    
-                    packet = bytearray()
-                    packet.extend(OPCODE_DATA.to_bytes(2, 'big'))
-                    packet.extend(block_number.to_bytes(2, 'big'))
-                    packet.extend(data_chunk)
-                    
-                    # Tentatives d'envoi pour chaque bloc
-                    retries_left = 5
-                    while retries_left > 0 and self.running:
-                        try:
-                            transfer_socket.sendto(packet, client_addr)
-                            ack_data, ack_addr = transfer_socket.recvfrom(4)
-                            if self._validate_ack(ack_data, ack_addr, client_addr, block_number):
-                                bytes_sent += len(data_chunk)
-                                self._update_transfer_progress(client_id, bytes_sent, start_time)
-                                break  # Passage au bloc suivant
-                        except socket.error as e:
-                            if self.is_windows and "10040" in str(e):
-                                logger.error(f"Windows socket buffer error (10040): {e}")
-                                self.send_error(client_addr, ERROR_NOT_DEFINED, str(e))
-                                raise Exception(f"Windows buffer overflow error: {e}")
-                            retries_left -= 1
-                            if retries_left <= 0:
-                                logger.error(f"Max retries exceeded for block {block_number}")
-                                raise Exception(f"Transfer failed after maximum retries for block {block_number}")
-                            logger.warning(f"Socket error, retrying block {block_number} ({5 - retries_left}/5): {e}")
-                        except socket.timeout:
-                            retries_left -= 1
-                            if retries_left <= 0:
-                                logger.error(f"Max retries exceeded for block {block_number}")
-                                raise Exception(f"Transfer timed out for block {block_number}")
-                            logger.warning(f"Timeout, retrying block {block_number} ({5 - retries_left}/5)")
-                    if retries_left <= 0:
-                        raise Exception(f"Transfer failed after maximum retries for block {block_number}")
-                    
-                    # Si le bloc est plus petit que la taille demandée, c'est la fin du fichier
-                    if len(data_chunk) < requested_blksize:
-                        break
-                    
-                    block_number = (block_number + 1) % 65536
-                
-                logger.info(f"Transfer completed for {client_id}: {filename}")
-                self._complete_transfer(client_id, filename, file_size, True)
-        except Exception as e:
-            logger.error(f"Error in file transfer to {client_id}: {str(e)}")
-            self._handle_transfer_error(client_id, client_addr, str(e))
-        finally:
-            self._cleanup_transfer(transfer_socket, client_id)
-
-    def _validate_ack(self, ack_data: bytes, ack_addr: Tuple[str, int], client_addr: Tuple[str, int], expected_block: int) -> bool:
-        """Valide un ACK reçu"""
-        if ack_addr != client_addr:
-            logger.warning(f"Received ACK from unexpected address: {ack_addr}")
-            return False
-        if len(ack_data) < 4:
-            logger.warning(f"Received invalid packet size: {len(ack_data)}")
-            return False
-        opcode = int.from_bytes(ack_data[:2], 'big')
-        block = int.from_bytes(ack_data[2:4], 'big')
-        return opcode == OPCODE_ACK and block == expected_block
-
-    def _update_transfer_progress(self, client_id: str, bytes_sent: int, start_time: float) -> None:
-        """Met à jour la progression du transfert"""
-        with self.lock:
-            if client_id in self.transfers:
-                self.transfers[client_id]['progress'] = bytes_sent
-                elapsed = time.time() - start_time
-                self.transfers[client_id]['speed'] = bytes_sent / elapsed if elapsed > 0 else 0
-                file_size = self.transfers[client_id].get('file_size', 1)
-                remaining_bytes = file_size - bytes_sent
-                self.transfers[client_id]['remaining_time'] = (remaining_bytes / self.transfers[client_id]['speed']
-                                                                if self.transfers[client_id]['speed'] > 0 else -1)
-                self.signals.transfer_updated.emit(client_id, self.transfers[client_id])
-
-    def _complete_transfer(self, client_id: str, filename: str, file_size: int, success: bool) -> None:
-        """Marque la fin du transfert, met à jour les statistiques et émet le signal de fin"""
-        with self.lock:
-            if client_id in self.transfers:
-                self.transfers[client_id]['completed'] = True
-                self.transfers[client_id]['end_time'] = datetime.now()
-                if success:
-                    self.statistics['successful_transfers'] += 1
-                    self.statistics['bytes_downloaded'] += file_size
-                else:
-                    self.statistics['failed_transfers'] += 1
-        self.signals.transfer_completed.emit(client_id, success)
-
-    def _handle_transfer_error(self, client_id: str, client_addr: Tuple[str, int], error_message: str) -> None:
-        """Gère une erreur pendant un transfert : envoi d'un paquet ERROR et marquage du transfert comme échoué"""
-        self.send_error(client_addr, ERROR_NOT_DEFINED, error_message)
-        with self.lock:
-            if client_id in self.transfers:
-                self.transfers[client_id]['completed'] = True
-                self.transfers[client_id]['end_time'] = datetime.now()
-        self.signals.transfer_completed.emit(client_id, False)
-
-    def _cleanup_transfer(self, transfer_socket: Optional[socket.socket], client_id: str) -> None:
-        """Nettoie et ferme le socket de transfert"""
-        if transfer_socket:
-            try:
-                transfer_socket.close()
-            except Exception as e:
-                logger.error(f"Error closing transfer socket: {str(e)}")
 
-    def _send_data_safely(self, socket_obj: socket.socket, data: bytes, addr: Tuple[str, int]) -> bool:
-        """Envoie des données de manière sécurisée en gérant les erreurs de dépassement du tampon sur Windows"""
-        try:
-            socket_obj.sendto(data, addr)
-            return True
-        except OSError as e:
-            if self.is_windows and "10040" in str(e):
-                logger.warning(f"OSError 10040 - Data size {len(data)} exceeds buffer limit. Attempting safe send.")
-                # Réduire la taille du payload à une taille sûre
-                safe_size = 512  # taille réduite pour Windows
-                if len(data) > 4:  # on garde l'en-tête
-                    opcode = int.from_bytes(data[:2], 'big')
-                    if opcode == OPCODE_DATA:
-                        block_num = int.from_bytes(data[2:4], 'big')
-                        reduced_payload = data[4:4+safe_size]
-                        reduced_packet = bytearray()
-                        reduced_packet.extend(OPCODE_DATA.to_bytes(2, 'big'))
-                        reduced_packet.extend(block_num.to_bytes(2, 'big'))
-                        reduced_packet.extend(reduced_payload)
-                        try:
-                            socket_obj.sendto(reduced_packet, addr)
-                            logger.info(f"Sent reduced data packet of size {len(reduced_packet)} bytes")
-                            return True
-                        except Exception as e2:
-                            logger.error(f"Failed to send reduced packet: {e2}")
-                            return False
-                return False
-            else:
-                raise
+    # --- Événements du moteur (thread de la boucle) ---
+    def on_log(self, level: str, message: str) -> None:
+        self.signals.log_message.emit(level, message)
 
-    def send_error(self, client_addr: Tuple[str, int], error_code: int, error_msg: str):
-        """Envoie un paquet d'erreur au client"""
-        try:
-            error_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-            try:
-                error_socket.bind((self.interface, 0))
-                packet = bytearray()
-                packet.extend(OPCODE_ERROR.to_bytes(2, 'big'))
-                packet.extend(error_code.to_bytes(2, 'big'))
-                packet.extend(error_msg.encode('utf-8'))
-                packet.append(0)
-                if self._send_data_safely(error_socket, packet, client_addr):
-                    logger.error(f"Sent error to {client_addr[0]}:{client_addr[1]}: {error_code} - {error_msg}")
-                else:
-                    logger.error(f"Failed to send error to {client_addr[0]}:{client_addr[1]}")
-            finally:
-                error_socket.close()
-        except Exception as e:
-            logger.error(f"Error sending ERROR packet: {str(e)}")
+    def on_request(self, client_addr: Tuple[str, int], opcode: int, filename: str) -> None:
+        self._touch_client(client_addr[0])
 
-    def record_transfer(self, client_id: str, filename: str, direction: str, file_size: int):
-        """Enregistre un nouveau transfert"""
+    def _touch_client(self, ip: str) -> Dict[str, Any]:
+        """Enregistre l'activité d'un client (événements du moteur, peu fréquents) ; retourne son résumé"""
         with self.lock:
-            if client_id not in self.clients:
-                ip, port = client_id.split(':')
-                self.clients[client_id] = {
+            client = self.clients.get(ip)
+            if client is None:
+                client = self.clients[ip] = {
                     'ip': ip,
-                    'port': int(port),
-                    'last_seen': datetime.now(),
-                    'active': True
+                    'active': False,
+                    'transfers': 0,
+                    'successful': 0,
+                    'failed': 0,
+                    'bytes': 0,
+                    'recent_files': deque(maxlen=self.RECENT_FILES),
                 }
-                self.signals.client_connected.emit(client_id, self.clients[client_id])
+                self._evict_clients()
             else:
-                self.clients[client_id]['last_seen'] = datetime.now()
-                self.clients[client_id]['active'] = True
-            transfer_info = {
-                'filename': filename,
-                'direction': direction,
-                'file_size': file_size,
-                'start_time': datetime.now(),
-                'last_activity': datetime.now(),
-                'progress': 0,
-                'completed': False,
-                'end_time': None,
-                'speed': 0.0,
-                'block_size': self.block_size,
-                'remaining_time': -1
-            }
-            self.transfers[client_id] = transfer_info
+                self.clients.move_to_end(ip)
+            client['last_seen'] = datetime.now()
+            if not client['active']:
+                client['active'] = True
+                self._active_clients += 1
+                self.signals.client_connected.emit(ip, self._client_summary(client))
+            return client
+
+    def _evict_clients(self) -> None:
+        """Oublie les clients inactifs les plus anciens au-delà de MAX_CLIENTS (appel sous verrou)"""
+        excess = len(self.clients) - self.MAX_CLIENTS
+        if excess <= 0:
+            return
+        for ip in [ip for ip, client in self.clients.items() if not client['active']][:excess]:
+            del self.clients[ip]
+
+    @staticmethod
+    def _client_summary(client: Dict[str, Any]) -> Dict[str, Any]:
+        summary = dict(client)
+        summary['recent_files'] = list(client['recent_files'])
+        return summary
+
+    def on_transfer_started(self, session) -> None:
+        progress = session.progress
+        self._touch_client(session.client_addr[0])
+        with self.lock:
+            self._active_transfers[progress.client_id] = progress
             self.statistics['total_transfers'] += 1
-            self.signals.transfer_started.emit(client_id, transfer_info)
+        self.signals.transfer_started.emit(progress.client_id, progress.snapshot())
+
+    def on_transfer_progress(self, session) -> None:
+        # Déjà limité par le moteur (PROGRESS_INTERVAL) ; aucun verrou sur le chemin des données
+        progress = session.progress
+        self.signals.transfer_updated.emit(progress.client_id, progress.snapshot())
+
+    def on_transfer_finished(self, session, success: bool, error: Optional[str]) -> None:
+        progress = session.progress
+        snapshot = progress.snapshot()
+        snapshot['error'] = error
+        client = self._touch_client(session.client_addr[0])
+        with self.lock:
+            self.history.append(snapshot)
+            self._active_transfers.pop(progress.client_id, None)
+            client['transfers'] += 1
+            recent_files = client['recent_files']
+            if progress.filename in recent_files:
+                recent_files.remove(progress.filename)
+            recent_files.append(progress.filename)
+            if success:
+                # Débit par sens : octets transférés / durée cumulée des transferts réussis
+                direction = 'uploaded' if progress.direction == 'upload' else 'downloaded'
+                self.statistics['successful_transfers'] += 1
+                self.statistics[f'bytes_{direction}'] += progress.bytes_done
+                self.statistics[f'seconds_{direction}'] += snapshot['elapsed']
+                client['successful'] += 1
+                client['bytes'] += progress.bytes_done
+            else:
+                self.statistics['failed_transfers'] += 1
+                client['failed'] += 1
+        self.signals.transfer_completed.emit(progress.client_id, success)
+
+    def sweep_inactive_clients(self, inactive_timeout: float = 300) -> None:
+        """Marque inactifs les clients silencieux depuis `inactive_timeout` s (appelé périodiquement)"""
+        now = datetime.now()
+        with self.lock:
+            for ip, client in self.clients.items():
+                if client['active'] and (now - client['last_seen']).total_seconds() > inactive_timeout:
+                    client['active'] = False
+                    self._active_clients -= 1
+                    self.signals.client_disconnected.emit(ip)
+            self._evict_clients()
 
     def get_status(self) -> Dict[str, Any]:
-        """Retourne l'état du serveur"""
+        """Retourne l'état du serveur.
+
+        Sans verrou sur la progression : seuls les transferts en cours sont recalculés depuis leurs
+        compteurs ; les terminés sont dans l'historique borné (`history`, du plus ancien au plus
+        récent) et les clients (par adresse IP) en résumés cumulés.
+        """
+        now = time.monotonic()
+        transfers = {client_id: progress.snapshot(now)
+                     for client_id, progress in list(self._active_transfers.items())}
         with self.lock:
-            now = datetime.now()
-            inactive_timeout = 300  # 5 minutes
-            inactive_clients = [client_id for client_id, client in self.clients.items() 
-                                if (now - client['last_seen']).total_seconds() > inactive_timeout]
-            for client_id in inactive_clients:
-                self.clients[client_id]['active'] = False
-                if client_id in self.transfers and not self.transfers[client_id]['completed']:
-                    self.transfers[client_id]['completed'] = True
-                    self.transfers[client_id]['end_time'] = now
-                self.signals.client_disconnected.emit(client_id)
-            for client_id, transfer in self.transfers.items():
-                if not transfer['completed'] and transfer['progress'] > 0:
-                    elapsed = (now - transfer['start_time']).total_seconds()
-                    if elapsed > 0:
-                        transfer['speed'] = transfer['progress'] / elapsed
-            uptime = time.time() - self.statistics.get('start_time', time.time())
-            total_bytes = self.statistics.get('bytes_downloaded', 0) + self.statistics.get('bytes_uploaded', 0)
-            avg_speed = total_bytes / uptime if uptime > 0 else 0
-            return {
-                'running': self.running,
-                'interface': self.interface,
-                'port': self.port,
-                'block_size': self.block_size,
-                'root_dir': self.root_dir,
-                'clients': dict(self.clients),
-                'transfers': dict(self.transfers),
-                'active_clients': sum(1 for c in self.clients.values() if c['active']),
-                'active_transfers': sum(1 for t in self.transfers.values() if not t['completed']),
-                'statistics': {
-                    'total_transfers': self.statistics.get('total_transfers', 0),
-                    'successful_transfers': self.statistics.get('successful_transfers', 0),
-                    'failed_transfers': self.statistics.get('failed_transfers', 0),
-                    'bytes_downloaded': self.statistics.get('bytes_downloaded', 0),
-                    'bytes_uploaded': self.statistics.get('bytes_uploaded', 0),
-                    'uptime': uptime,
-                    'uptime_str': self.format_uptime(uptime),
-                    'average_speed': avg_speed,
-                    'average_speed_str': self.format_speed(avg_speed)
-                }
-            }
+            clients = {ip: self._client_summary(client) for ip, client in self.clients.items()}
+            history = list(self.history)
+        statistics = dict(self.statistics)
+        uptime = time.time() - statistics['start_time']
+        avg_speed = (statistics['bytes_downloaded'] + statistics['bytes_uploaded']) / uptime if uptime > 0 else 0
+        seconds_down = statistics['seconds_downloaded']
+        seconds_up = statistics['seconds_uploaded']
+        download_speed = statistics['bytes_downloaded'] / seconds_down if seconds_down > 0 else 0
+        upload_speed = statistics['bytes_uploaded'] / seconds_up if seconds_up > 0 else 0
+        return {
+            'running': self.running,
+            'interface': self.interface,
+            'port': self.port,
+            'block_size': self.block_size,
+            'root_dir': self.root_dir,
+            'clients': clients,
+            'transfers': transfers,
+            'history': history,
+            'active_clients': self._active_clients,
+            'active_transfers': len(self._active_transfers),
+            'statistics': {
+                'total_transfers': statistics['total_transfers'],
+                'successful_transfers': statistics['successful_transfers'],
+                'failed_transfers': statistics['failed_transfers'],
+                'bytes_downloaded': statistics['bytes_downloaded'],
+                'bytes_uploaded': statistics['bytes_uploaded'],
+                'uptime': uptime,
+                'uptime_str': self.format_uptime(uptime),
+                'average_speed': avg_speed,
+                'average_speed_str': self.format_speed(avg_speed),
+                'download_speed': download_speed,
+                'download_speed_str': self.format_speed(download_speed),
+                'upload_speed': upload_speed,
+                'upload_speed_str': self.format_speed(upload_speed)
+            },
+            'image_cache': self.engine.cache.stats()
+        }
 
     def format_uptime(self, seconds: float) -> str:
         days, remainder = divmod(int(seconds), 86400)
@@ -697,6 +288,8 @@ class TFTPServerWidget(QWidget):
         super().__init__(parent)
         self.server = None
         self.worker = None
+        self._client_rows = {}    # Adresse IP -> élément de la colonne 0 (mise à jour par clé)
+        self._transfer_rows = {}  # ip:port -> élément de la colonne Client
         self.refresh_interval = 0.2
         self.last_refresh = 0
         self.initUI()
@@ -708,7 +301,7 @@ class TFTPServerWidget(QWidget):
 
         self.timer = QTimer(self)
         self.timer.timeout.connect(self.refreshStatus)
-        self.timer.start(200)
+        self.timer.start(1000)  # Progression poussée par transfer_updated entre deux rafraîchissements
 
     def initUI(self):
         main_layout = QVBoxLayout(self)
@@ -749,6 +342,10 @@ class TFTPServerWidget(QWidget):
         self.status_label.setStyleSheet("color: red; font-weight: bold;")
         config_layout.addRow("Statut:", self.status_label)
 
+        # Statistiques (débit moyen par sens, sur la durée des transferts réussis)
+        self.stats_label = QLabel("Aucun transfert")
+        config_layout.addRow("Statistiques:", self.stats_label)
+
         config_group.setLayout(config_layout)
         main_layout.addWidget(config_group)
 
@@ -773,11 +370,14 @@ class TFTPServerWidget(QWidget):
         # Table des clients connectés
         clients_group = QGroupBox("Clients connectés")
         clients_layout = QVBoxLayout()
-        self.clients_table = QTableWidget(0, 3)
-        self.clients_table.setHorizontalHeaderLabels(["Adresse IP", "Dernière activité", "Fichiers"])
+        self.clients_table = QTableWidget(0, 5)
+        self.clients_table.setHorizontalHeaderLabels(["Adresse IP", "Dernière activité", "Fichiers",
+                                                      "Réussis / échoués", "Volume"])
         self.clients_table.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
         self.clients_table.horizontalHeader().setSectionResizeMode(1, QHeaderView.ResizeToContents)
         self.clients_table.horizontalHeader().setSectionResizeMode(2, QHeaderView.Stretch)
+        self.clients_table.horizontalHeader().setSectionResizeMode(3, QHeaderView.ResizeToContents)
+        self.clients_table.horizontalHeader().setSectionResizeMode(4, QHeaderView.ResizeToContents)
         self.clients_table.setAlternatingRowColors(True)
         clients_layout.addWidget(self.clients_table)
         clients_group.setLayout(clients_layout)
@@ -786,14 +386,17 @@ class TFTPServerWidget(QWidget):
         # Table des transferts actifs
         transfers_group = QGroupBox("Transferts actifs")
         transfers_layout = QVBoxLayout()
-        self.transfers_table = QTableWidget(0, 6)
-        self.transfers_table.setHorizontalHeaderLabels(["Fichier", "Client", "Progression", "Statut", "Type", "Temps restant"])
+        self.transfers_table = QTableWidget(0, 8)
+        self.transfers_table.setHorizontalHeaderLabels(["Fichier", "Client", "Progression", "Statut", "Type", "Temps restant",
+                                                        "Renvois / timeouts", "RTT (RTO)"])
         self.transfers_table.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
         self.transfers_table.horizontalHeader().setSectionResizeMode(1, QHeaderView.ResizeToContents)
         self.transfers_table.horizontalHeader().setSectionResizeMode(2, QHeaderView.Stretch)
         self.transfers_table.horizontalHeader().setSectionResizeMode(3, QHeaderView.ResizeToContents)
         self.transfers_table.horizontalHeader().setSectionResizeMode(4, QHeaderView.ResizeToContents)
         self.transfers_table.horizontalHeader().setSectionResizeMode(5, QHeaderView.ResizeToContents)
+        self.transfers_table.horizontalHeader().setSectionResizeMode(6, QHeaderView.ResizeToContents)
+        self.transfers_table.horizontalHeader().setSectionResizeMode(7, QHeaderView.ResizeToContents)
         self.transfers_table.setAlternatingRowColors(True)
         transfers_layout.addWidget(self.transfers_table)
         transfers_group.setLayout(transfers_layout)
@@ -886,7 +489,7 @@ class TFTPServerWidget(QWidget):
             self.server = TFTPServer(interface=interface, port=port, block_size=512, root_dir=root_dir, timeout=5)
             self.worker = TFTPWorker(self.server)
             
-            self.worker.signals.log_message.connect(self.addLogMessage)
+            self.worker.signals.log_message.connect(self.onServerLog)
             self.worker.signals.client_connected.connect(self.onClientConnected)
             self.worker.signals.client_disconnected.connect(self.onClientDisconnected)
             self.worker.signals.transfer_started.connect(self.onTransferStarted)
@@ -965,58 +568,103 @@ class TFTPServerWidget(QWidget):
             status = self.server.get_status()
             self.updateClientsTable(status.get('clients', {}))
             self.updateTransfersTable(status.get('transfers', {}))
+            self.updateStatistics(status.get('statistics', {}), status.get('image_cache'))
+
+    def updateStatistics(self, stats, cache=None):
+        if not stats.get('total_transfers'):
+            return
+        text = (f"{stats['successful_transfers']} réussi(s), {stats['failed_transfers']} échoué(s) - "
+                f"téléchargements: {self.format_size(stats['bytes_downloaded'])} à {stats['download_speed_str']}, "
+                f"uploads: {self.format_size(stats['bytes_uploaded'])} à {stats['upload_speed_str']}")
+        if cache and cache['hits'] + cache['misses']:
+            text += (f"\nCache d'images: {cache['images']} image(s), {self.format_size(cache['mapped_bytes'])}, "
+                     f"succès {cache['hit_ratio']:.0%}")
+        self.stats_label.setText(text)
+
+    @staticmethod
+    def _syncRows(table, rows, keys, key_column=0):
+        """Aligne les lignes de `table` sur `keys` : supprime les absentes, ajoute les nouvelles.
+
+        `rows` associe chaque clé à l'élément de sa colonne `key_column`, qui suit la ligne quand
+        d'autres sont supprimées ; retourne {clé: numéro de ligne}.
+        """
+        for key in [key for key in rows if key not in keys]:
+            table.removeRow(rows.pop(key).row())
+        for key in keys:
+            if key not in rows:
+                row = table.rowCount()
+                table.insertRow(row)
+                rows[key] = QTableWidgetItem(key)
+                table.setItem(row, key_column, rows[key])
+        return {key: item.row() for key, item in rows.items()}
+
+    @staticmethod
+    def _setCell(table, row, column, text, color=None):
+        """Met à jour le texte d'une cellule, en réutilisant son élément"""
+        item = table.item(row, column)
+        if item is None:
+            item = QTableWidgetItem(text)
+            table.setItem(row, column, item)
+        elif item.text() != text:
+            item.setText(text)
+        if color is not None:
+            item.setForeground(QBrush(QColor(color)))
 
     def updateClientsTable(self, clients):
-        self.clients_table.setRowCount(0)
-        current_time = time.time()
-        for client_id, info in clients.items():
+        active = {ip: info for ip, info in clients.items() if info.get('active')}
+        rows = self._syncRows(self.clients_table, self._client_rows, active)
+        for ip, info in active.items():
+            row = rows[ip]
             last_seen = info.get('last_seen')
-            if last_seen:
-                last_ts = time.mktime(last_seen.timetuple())
-                if current_time - last_ts < 300:
-                    row = self.clients_table.rowCount()
-                    self.clients_table.insertRow(row)
-                    self.clients_table.setItem(row, 0, QTableWidgetItem(client_id))
-                    activity = last_seen.strftime("%H:%M:%S\n%Y-%m-%d")
-                    self.clients_table.setItem(row, 1, QTableWidgetItem(activity))
-                    files = info.get('files_transferred', [])
-                    self.clients_table.setItem(row, 2, QTableWidgetItem(", ".join(files)))
+            activity = last_seen.strftime("%H:%M:%S\n%Y-%m-%d") if last_seen else ""
+            self._setCell(self.clients_table, row, 1, activity)
+            self._setCell(self.clients_table, row, 2, ", ".join(info.get('recent_files', [])))
+            failed = info.get('failed', 0)
+            self._setCell(self.clients_table, row, 3, f"{info.get('successful', 0)} / {failed}",
+                          "red" if failed else None)
+            self._setCell(self.clients_table, row, 4, self.format_size(info.get('bytes', 0)))
 
     def updateTransfersTable(self, transfers):
-        self.transfers_table.setRowCount(0)
-        for client_id, transfer in transfers.items():
-            if not transfer.get('completed', False):
-                row = self.transfers_table.rowCount()
-                self.transfers_table.insertRow(row)
-                filename = transfer.get('filename', "Inconnu")
-                self.transfers_table.setItem(row, 0, QTableWidgetItem(filename))
-                self.transfers_table.setItem(row, 1, QTableWidgetItem(client_id))
-                progress_bar = QProgressBar()
-                progress_bar.setRange(0, 100)
-                total = transfer.get('file_size', 1)
-                current = transfer.get('progress', 0)
-                percent = min(100, int(current * 100 / total))
-                progress_bar.setValue(percent)
-                progress_bar.setFormat(f"{percent}% ({self.format_size(current)}/{self.format_size(total)})")
-                progress_bar.setAlignment(Qt.AlignCenter)
-                self.transfers_table.setCellWidget(row, 2, progress_bar)
-                status_text = "En cours" if not transfer.get('completed', False) else "Terminé"
-                status_item = QTableWidgetItem(status_text)
-                if status_text == "En cours":
-                    status_item.setForeground(QBrush(QColor("blue")))
-                else:
-                    status_item.setForeground(QBrush(QColor("green")))
-                self.transfers_table.setItem(row, 3, status_item)
-                typ = "Téléchargement" if transfer.get('direction', '') == 'download' else "Upload"
-                self.transfers_table.setItem(row, 4, QTableWidgetItem(typ))
-                remaining = transfer.get('remaining_time', -1)
-                if remaining < 0:
-                    remaining_text = "Calcul en cours"
-                else:
-                    hrs, rem = divmod(int(remaining), 3600)
-                    mins, secs = divmod(rem, 60)
-                    remaining_text = f"{hrs:02d}:{mins:02d}:{secs:02d}"
-                self.transfers_table.setItem(row, 5, QTableWidgetItem(remaining_text))
+        active = {client_id: t for client_id, t in transfers.items() if not t.get('completed', False)}
+        rows = self._syncRows(self.transfers_table, self._transfer_rows, active, key_column=1)
+        for client_id, transfer in active.items():
+            self.fillTransferRow(rows[client_id], transfer)
+
+    def fillTransferRow(self, row, transfer):
+        table = self.transfers_table
+        self._setCell(table, row, 0, transfer.get('filename', "Inconnu"))
+        progress_bar = table.cellWidget(row, 2)
+        if progress_bar is None:
+            progress_bar = QProgressBar()
+            progress_bar.setRange(0, 100)
+            progress_bar.setAlignment(Qt.AlignCenter)
+            table.setCellWidget(row, 2, progress_bar)
+        total = transfer.get('file_size') or 0  # Taille inconnue pour un upload sans tsize
+        current = transfer.get('progress', 0)
+        percent = min(100, int(current * 100 / total)) if total else 0
+        progress_bar.setValue(percent)
+        progress_bar.setFormat(f"{percent}% ({self.format_size(current)}/{self.format_size(total)})")
+        if transfer.get('completed', False):
+            self._setCell(table, row, 3, "Terminé", "green")
+        else:
+            self._setCell(table, row, 3, "En cours", "blue")
+        typ = "Téléchargement" if transfer.get('direction', '') == 'download' else "Upload"
+        self._setCell(table, row, 4, typ)
+        remaining = transfer.get('remaining_time', -1)
+        if remaining < 0:
+            remaining_text = "Calcul en cours"
+        else:
+            hrs, rem = divmod(int(remaining), 3600)
+            mins, secs = divmod(rem, 60)
+            remaining_text = f"{hrs:02d}:{mins:02d}:{secs:02d}"
+        self._setCell(table, row, 5, remaining_text)
+        self._setCell(table, row, 6, f"{transfer.get('retransmits', 0)} / {transfer.get('timeouts', 0)}",
+                      "orange" if transfer.get('timeouts') else None)
+        srtt = transfer.get('srtt')
+        rtt_text = f"{srtt * 1000:.1f} ms" if srtt is not None else "-"
+        if 'rto' in transfer:
+            rtt_text += f" ({transfer['rto'] * 1000:.0f} ms)"
+        self._setCell(table, row, 7, rtt_text)
 
     def format_size(self, size_bytes):
         if size_bytes < 1024:
@@ -1029,6 +677,9 @@ class TFTPServerWidget(QWidget):
             return f"{size_bytes/(1024*1024*1024):.1f} Go"
 
     # Slots pour les signaux
+    def onServerLog(self, level, message):
+        self.addLogMessage(message, level)
+
     def onClientConnected(self, client_id, info):
         self.addLogMessage(f"Client connecté: {client_id}")
         self.refreshStatus()
@@ -1042,7 +693,12 @@ class TFTPServerWidget(QWidget):
         self.refreshStatus()
 
     def onTransferUpdated(self, client_id, transfer_info):
-        self.refreshStatus()
+        # Mise à jour de la seule ligne du transfert ; le reste est rafraîchi par le minuteur
+        item = self._transfer_rows.get(client_id)
+        if item is not None:
+            self.fillTransferRow(item.row(), transfer_info)
+        else:
+            self.refreshStatus()
 
     def onTransferCompleted(self, client_id, success):
         stat = "réussi" if success else "échoué"
@@ -0,0 +1,435 @@
+"""Moteur de collecte syslog sans Qt : réception, analyse, filtrage, regroupement et stockage.
+
+Le GUI (views.sys_log) et le démon en ligne de commande (tools.syslogd) en sont des clients :
+les messages retenus sont livrés par rappel, depuis les threads de réception.
+"""
+import logging
+import os
+import select
+import socket
+import threading
+import time
+from datetime import datetime
+from typing import Callable, List, Optional, Set, Tuple
+
+from utils.syslog_archive import SyslogArchive
+from utils.syslog_dedup import SyslogDeduplicator, dedup_key
+from utils.syslog_filter import SyslogFilter
+from utils.syslog_parser import parse
+from utils.syslog_stats import SyslogStats
+from utils.syslog_writer import HostLogWriter
+from worker.syslog_processes import (
+    SyslogProcessPool, drain_socket, read_udp_socket_drops, MSG_BATCH, MSG_DROPS, MSG_ERROR, MSG_READY
+)
+from worker.syslog_tcp import SyslogTcpListener, create_server_ssl_context
+
+logger = logging.getLogger("SyslogServer")
+
+DEFAULT_PORT = 514
+
+# (timestamp, source, facility, severity, message) : message retenu, tel qu'affiché
+MessagesCallback = Callable[[List[tuple]], None]
+# (niveau, message) : niveaux "INFO", "WARNING", "ERROR"
+LogCallback = Callable[[str, str], None]
+# Détails conservés avec chaque message retenu : (received_at, ip, app, mnémonique)
+_Details = Tuple[float, str, Optional[str], Optional[str]]
+
+
+class SyslogEngineConfig:
+    """Paramètres du moteur (sans persistance ; ServerConfig y ajoute les QSettings et l'interface)"""
+
+    def __init__(self):
+        self.host: str = "0.0.0.0"
+        self.port: int = DEFAULT_PORT
+        self.buffer_size: int = 8192
+        self.recv_max_batch: int = 512  # Datagrammes lus au maximum par réveil du socket
+        self.recv_socket_buffer: int = 4 * 1024 * 1024  # SO_RCVBUF demandé (0 = valeur système)
+        self.worker_processes: int = 0  # Processus de réception/analyse (0 = threads dans le processus courant)
+        self.reuse_port: bool = True    # Répartition entre processus par SO_REUSEPORT (Linux)
+        # Réception TCP / TLS (RFC 6587 : comptage d'octets ou fin de ligne)
+        self.tcp_enabled: bool = False
+        self.tcp_port: int = DEFAULT_PORT
+        self.tls_enabled: bool = False
+        self.tls_port: int = 6514
+        self.tls_certfile: str = ""
+        self.tls_keyfile: str = ""
+        self.tcp_max_connections: int = 10000
+        self.save_logs: bool = True
+        self.log_directory: str = os.path.join(os.path.expanduser("~"), "syslog_logs")
+        self.archive_enabled: bool = True  # Archive SQLite interrogeable (dans log_directory)
+        self.archive_retention_days: int = 30  # 0 = conservation illimitée
+        # Regroupement des messages répétés (même hôte, mnémonique et texte) pendant dedup_window secondes
+        self.dedup_enabled: bool = False
+        self.dedup_window: float = 5.0
+        # Écriture des fichiers texte par hôte (voir utils.syslog_writer)
+        self.log_writer_options: dict = {
+            "max_open_files": 128,        # Descripteurs ouverts simultanément (LRU)
+            "commit_interval": 1.0,       # Délai maximal (s) avant écriture sur disque
+            "commit_bytes": 256 * 1024,   # Volume en tampon déclenchant une écriture
+            "fsync_policy": "never",      # Options: never, commit, rotate
+            "max_file_size_mb": 50,       # Rotation par taille (0 = rotation journalière seule)
+            "compress_rotated": False     # Compression gzip des segments fermés
+        }
+        self.filters: dict = {
+            "enabled": False,
+            "hosts": [],
+            "facilities": [],
+            "severities": [],
+            "keywords": [],
+            "patterns": []  # Expressions régulières (un message passe si un mot-clé OU une expression correspond)
+        }
+
+    def get_archive_path(self) -> str:
+        """Chemin de la base SQLite d'archive des messages"""
+        return os.path.join(self.log_directory, "syslog_archive.db")
+
+    def create_tcp_listener(self, on_messages) -> Optional[SyslogTcpListener]:
+        """Crée l'écoute TCP/TLS configurée (None si aucune n'est activée)"""
+        if not (self.tcp_enabled or self.tls_enabled):
+            return None
+        listener = SyslogTcpListener(on_messages, max_connections=self.tcp_max_connections)
+        if self.tcp_enabled:
+            listener.add_endpoint(self.host, self.tcp_port)
+        if self.tls_enabled:
+            listener.add_endpoint(self.host, self.tls_port,
+                                  create_server_ssl_context(self.tls_certfile, self.tls_keyfile))
+        return listener
+
+    def create_deduplicator(self) -> Optional[SyslogDeduplicator]:
+        """Crée l'étape de regroupement des répétitions (None si désactivée)"""
+        if not self.dedup_enabled or self.dedup_window <= 0:
+            return None
+        return SyslogDeduplicator(self.dedup_window)
+
+    def create_log_writer(self) -> HostLogWriter:
+        """Crée l'écrivain des fichiers de logs par hôte selon log_writer_options"""
+        options = self.log_writer_options
+        return HostLogWriter(
+            self.log_directory,
+            max_open_files=int(options.get("max_open_files", 128)),
+            commit_interval=float(options.get("commit_interval", 1.0)),
+            commit_bytes=int(options.get("commit_bytes", 256 * 1024)),
+            fsync_policy=options.get("fsync_policy", "never"),
+            max_file_size=int(float(options.get("max_file_size_mb", 50)) * 1024 * 1024),
+            compress_rotated=bool(options.get("compress_rotated", False))
+        )
+
+
+class SyslogEngine:
+    """Collecteur syslog UDP (+ TCP/TLS, + processus de réception optionnels).
+
+    Les messages retenus sont livrés par lots à `on_messages`, appelé depuis les threads
+    de réception : le rappel doit être court (mise en file, lot Qt, écriture console...).
+    """
+
+    STATS_INTERVAL = 5.0  # Période de lecture des pertes noyau (s)
+
+    def __init__(self, config: Optional[SyslogEngineConfig] = None,
+                 on_messages: Optional[MessagesCallback] = None, on_log: Optional[LogCallback] = None,
+                 stats: Optional[SyslogStats] = None):
+        """
+        Args:
+            config: Paramètres (SyslogEngineConfig ou ServerConfig)
+            on_messages: Reçoit les messages retenus [(timestamp, source, facility, severity, message), ...]
+            on_log: Reçoit les événements du moteur (niveau, texte)
+            stats: Statistiques partagées (créées si absentes)
+        """
+        self.config = config or SyslogEngineConfig()
+        self.on_messages = on_messages
+        self.on_log = on_log
+        self.stats: SyslogStats = stats or SyslogStats()
+        self.running = False
+        self.sock: Optional[socket.socket] = None
+        self.active_hosts: Set[str] = set()
+        self.archive: Optional[SyslogArchive] = None
+        self.log_writer: Optional[HostLogWriter] = None
+        self._writer_lock = threading.Lock()  # Écrivain partagé par les réceptions UDP et TCP
+        self.tcp_listener: Optional[SyslogTcpListener] = None
+        self.process_pool: Optional[SyslogProcessPool] = None
+        self.message_filter: SyslogFilter = SyslogFilter.compile(self.config.filters)
+        self.deduplicator: Optional[SyslogDeduplicator] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def _log(self, level: str, message: str) -> None:
+        logger.log(logging.getLevelName(level), message)
+        if self.on_log is not None:
+            self.on_log(level, message)
+
+    # --- Cycle de vie ---
+    def start(self) -> None:
+        """Ouvre les ports et démarre la réception ; lève l'erreur de bind éventuelle"""
+        if self.running:
+            return
+        config = self.config
+        self.stats.reset()
+        self.active_hosts.clear()
+        self.update_filters()
+        self.deduplicator = config.create_deduplicator()
+        if (config.save_logs or config.archive_enabled) and not os.path.exists(config.log_directory):
+            os.makedirs(config.log_directory)
+
+        if config.worker_processes > 0:
+            self.process_pool = SyslogProcessPool(config.worker_processes, {
+                "host": config.host,
+                "port": config.port,
+                "buffer_size": config.buffer_size,
+                "recv_max_batch": config.recv_max_batch,
+                "recv_socket_buffer": config.recv_socket_buffer,
+                "reuse_port": config.reuse_port,
+                "filters": config.filters,
+                "stats_interval": self.STATS_INTERVAL,
+            })
+            self.process_pool.start()
+            target = self._process_loop
+        else:
+            self.sock = self._open_socket()
+            target = self._receive_loop
+
+        if config.archive_enabled:
+            try:
+                self.archive = SyslogArchive(config.get_archive_path(),
+                                             retention_days=config.archive_retention_days)
+                self.archive.start()
+            except Exception as e:
+                self.archive = None
+                self._log("ERROR", f"Archive désactivée: {e}")
+        if config.save_logs:
+            try:
+                self.log_writer = config.create_log_writer()
+            except Exception as e:
+                self.log_writer = None
+                self._log("ERROR", f"Impossible d'initialiser l'écriture des logs: {e}")
+
+        self.running = True
+        self._thread = threading.Thread(target=target, name="SyslogEngine", daemon=True)
+        self._thread.start()
+        try:
+            self.tcp_listener = config.create_tcp_listener(self._handle_messages)
+            if self.tcp_listener is not None:
+                self.tcp_listener.start()
+        except Exception as e:
+            self.tcp_listener = None
+            self._log("ERROR", f"Écoute TCP/TLS désactivée: {e}")
+        if self.process_pool is not None:
+            self._log("INFO", f"Réception syslog répartie sur {self.process_pool.process_count} processus")
+        logger.info(f"Syslog Server démarré sur {config.host}:{config.port}")
+
+    def _open_socket(self) -> socket.socket:
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        try:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            self._configure_receive_buffer(sock)
+            sock.bind((self.config.host, self.config.port))
+            # Socket non bloquant : la boucle de réception vide la file jusqu'à EAGAIN
+            sock.setblocking(False)
+        except OSError:
+            sock.close()
+            raise
+        return sock
+
+    def _configure_receive_buffer(self, sock: socket.socket) -> None:
+        """Agrandit le tampon de réception du socket pour absorber les rafales"""
+        requested = self.config.recv_socket_buffer
+        if requested <= 0:
+            return
+        try:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, requested)
+            self._check_receive_buffer(sock.getsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF))
+        except OSError as e:
+            logger.warning(f"Impossible de configurer SO_RCVBUF: {e}")
+
+    def _check_receive_buffer(self, actual: int) -> None:
+        requested = self.config.recv_socket_buffer
+        logger.info(f"Tampon de réception syslog - demandé: {requested} octets, obtenu: {actual} octets")
+        # Linux double la valeur demandée ; une valeur inférieure signifie un plafond (net.core.rmem_max)
+        if 0 < requested and actual < requested:
+            self._log("WARNING",
+                      f"Tampon de réception limité à {actual} octets (demandé: {requested}), vérifiez net.core.rmem_max")
+
+    def stop(self) -> None:
+        """Arrête la réception, vide les regroupements et ferme fichiers et archive"""
+        if not self.running:
+            return
+        self.running = False
+        if self.tcp_listener is not None:
+            self.tcp_listener.stop()
+            self.tcp_listener = None
+        if self._thread is not None:
+            self._thread.join(timeout=5)  # Synthèses finales et fermeture des fichiers avant l'archive
+            self._thread = None
+        if self.sock is not None:
+            self.sock.close()
+            self.sock = None
+        if self.archive is not None:
+            self.archive.stop()
+            self.archive = None
+        logger.info("Syslog Server arrêté")
+
+    def update_filters(self, filters: Optional[dict] = None) -> None:
+        """Compile les filtres (config.filters par défaut) et les applique immédiatement"""
+        if filters is not None:
+            self.config.filters = filters
+        # Simple remplacement de référence : les threads de réception voient l'ancien ou le nouveau filtre
+        self.message_filter = SyslogFilter.compile(self.config.filters)
+        if self.process_pool is not None:
+            self.process_pool.update_filters(self.config.filters)
+
+    def get_stats(self) -> dict:
+        """Statistiques de réception, complétées des métriques d'écriture, TCP et regroupement"""
+        stats = self.stats.get_stats_dict()
+        if self.log_writer is not None:
+            stats["log_writer"] = self.log_writer.get_metrics()
+        if self.tcp_listener is not None:
+            stats["tcp_connections"] = len(self.tcp_listener.connections)
+        if self.deduplicator is not None:
+            stats["dedup"] = self.deduplicator.get_metrics()
+        if self.archive is not None:
+            stats["archive"] = {"written": self.archive.written, "dropped": self.archive.dropped}
+        return stats
+
+    # --- Boucles de réception ---
+    def _receive_loop(self) -> None:
+        """Boucle de réception UDP : vide la file du noyau à chaque réveil du socket"""
+        max_batch = max(1, self.config.recv_max_batch)
+        last_drops_check = 0.0
+        while self.running:
+            try:
+                ready, _, _ = select.select([self.sock], [], [], 0.5)
+                current_time = time.time()
+                if ready:
+                    # Un seul horodatage par lot : tous les datagrammes ont été mis en file avant ce réveil
+                    batch = drain_socket(self.sock, self.config.buffer_size, max_batch)
+                    if batch:
+                        self._handle_datagrams(batch, current_time)
+                self._housekeeping(current_time)
+                if current_time - last_drops_check >= self.STATS_INTERVAL:
+                    drops = read_udp_socket_drops(self.sock)
+                    if drops is not None:
+                        self.stats.update_kernel_drops(drops)
+                    last_drops_check = current_time
+            except Exception as e:
+                if self.running:
+                    self._log("ERROR", f"Erreur dans la réception: {e}")
+                    time.sleep(0.1)  # Éviter la surcharge en cas d'erreur
+        self._close_outputs()
+
+    def _process_loop(self) -> None:
+        """Mode multi-processus : collecte des lots déjà analysés et filtrés par les processus fils"""
+        try:
+            while self.running:
+                for message in self.process_pool.get_many(timeout=0.5):
+                    self._handle_process_message(message)
+                self._housekeeping(time.time())
+                if not self.process_pool.is_alive():
+                    self._log("ERROR", "Les processus de réception syslog se sont arrêtés")
+                    break
+        except Exception as e:
+            if self.running:
+                self._log("ERROR", f"Erreur dans la collecte des processus: {e}")
+        finally:
+            self.process_pool.stop()
+            self.process_pool = None
+            self._close_outputs()
+
+    def _handle_process_message(self, message: tuple) -> None:
+        kind = message[0]
+        if kind == MSG_BATCH:
+            _, received_at, timestamp, rows = message
+            self.stats.update_many([(ip, facility, severity) for ip, _, facility, severity, _, _ in rows], received_at)
+            deduplicator = self.deduplicator
+            accepted = []
+            for ip, source, facility, severity, text, keep in rows:
+                if not keep:
+                    continue
+                self.active_hosts.add(ip)
+                row = (timestamp, source, facility, severity, text)
+                details = (received_at, ip, None, None)
+                # Les processus fils ne transmettent que le texte : la clé est calculée sur celui-ci
+                if deduplicator is None or deduplicator.offer(dedup_key(ip, None, text), row, received_at, details):
+                    accepted.append((row, details))
+            self._dispatch(accepted)
+        elif kind == MSG_DROPS:
+            self.stats.update_kernel_drops(self.process_pool.record_drops(message[1], message[2]))
+        elif kind == MSG_READY:
+            self._check_receive_buffer(message[2])
+        elif kind == MSG_ERROR:
+            self._log("ERROR", message[2])
+
+    def _housekeeping(self, now: float) -> None:
+        """Commit groupé des fichiers et fermeture des fenêtres de regroupement échues"""
+        if self.log_writer is not None:
+            with self._writer_lock:
+                self.log_writer.tick()
+        if self.deduplicator is not None:
+            self._dispatch(self.deduplicator.expire(now))
+
+    def _close_outputs(self) -> None:
+        """Fin de la réception : synthèses restantes puis fermeture des fichiers de logs"""
+        if self.deduplicator is not None:
+            self._dispatch(self.deduplicator.flush())
+        if self.log_writer is not None:
+            try:
+                with self._writer_lock:
+                    self.log_writer.close()
+            except Exception as e:
+                logger.error(f"Erreur lors de la fermeture des fichiers de log: {e}")
+            self.log_writer = None
+
+    # --- Pipeline ---
+    def _handle_messages(self, datagrams: List[bytes], src_ip: str, src_port: int, received_at: float) -> None:
+        """Messages d'une même source (rappel de l'écoute TCP/TLS)"""
+        self._handle_datagrams([(data, (src_ip, src_port)) for data in datagrams], received_at)
+
+    def _handle_datagrams(self, batch: list, received_at: float) -> None:
+        """Pipeline commun UDP/TCP : analyse, statistiques, filtres, regroupement, fichiers, archive et livraison"""
+        timestamp = datetime.fromtimestamp(received_at).strftime("%Y-%m-%d %H:%M:%S")
+        message_filter = self.message_filter
+        deduplicator = self.deduplicator
+        active_hosts = self.active_hosts
+        counted, accepted = [], []
+        last_addr, src = None, ""
+        for data, addr in batch:
+            try:
+                src_ip = addr[0]
+                if addr != last_addr:
+                    last_addr, src = addr, f"{src_ip}:{addr[1]}"
+                    active_hosts.add(src_ip)
+                record = parse(data.decode('utf-8', errors='replace').strip())
+                facility_num, severity_num, parsed_message = record.facility, record.severity, record.text
+                counted.append((src_ip, facility_num, severity_num))
+
+                if not message_filter.matches(src_ip, facility_num, severity_num, parsed_message):
+                    continue
+
+                row = (timestamp, src, facility_num, severity_num, parsed_message)
+                details = (received_at, src_ip, record.app, record.mnemonic)
+                if deduplicator is not None and not deduplicator.offer(
+                        dedup_key(src_ip, record.mnemonic, record.msg), row, received_at, details):
+                    continue  # Répétition : comptée dans la synthèse de la fenêtre
+                accepted.append((row, details))
+            except Exception as e:
+                self._log("ERROR", f"Erreur lors du traitement du message: {e}")
+
+        self.stats.update_many(counted, received_at)
+        if deduplicator is not None:
+            accepted.extend(deduplicator.expire(received_at))
+        self._dispatch(accepted)
+
+    def _dispatch(self, entries: List[Tuple[tuple, _Details]]) -> None:
+        """Écrit les messages retenus (ligne affichée, détails) : fichiers, archive, puis livraison"""
+        if not entries:
+            return
+        archive = self.archive
+        log_writer = self.log_writer
+        if archive is not None:
+            archive.append_many((received_at, src_ip, row[1], row[2], row[3], app, mnemonic, row[4])
+                                for row, (received_at, src_ip, app, mnemonic) in entries)
+        if log_writer is not None:
+            with self._writer_lock:
+                for (timestamp, _, facility_num, severity_num, message), (_, src_ip, _, _) in entries:
+                    log_writer.write(src_ip, f"[{timestamp}] <{facility_num}.{severity_num}> {message}\n")
+        if self.on_messages is not None:
+            try:
+                self.on_messages([row for row, _ in entries])
+            except Exception as e:
+                logger.error(f"Erreur lors de la livraison des messages: {e}")
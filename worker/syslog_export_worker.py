@@ -0,0 +1,84 @@
+from PyQt5.QtCore import QThread, pyqtSignal
+import traceback
+import logging
+from typing import List, Optional
+
+from utils.syslog_archive import SyslogArchive
+from utils.syslog_export import ExportCanceled, SyslogExporter, archive_to_rows, select_rows
+
+logger = logging.getLogger(__name__)
+
+
+class SyslogExportWorker(QThread):
+    """Worker d'export syslog en arrière-plan, depuis l'archive SQLite ou un instantané du tampon."""
+    progress_updated = pyqtSignal(int)
+    status_updated = pyqtSignal(str)
+    export_finished = pyqtSignal(str, int)
+    error_occurred = pyqtSignal(str)
+
+    CHUNK_SIZE = 5000
+
+    def __init__(self, path: str, export_format: str, compress: bool = False,
+                 archive_path: Optional[str] = None, buffer_rows: Optional[List[tuple]] = None,
+                 criteria: Optional[dict] = None, parent=None):
+        """
+        Args:
+            path (str): Fichier de destination
+            export_format (str): Format (voir utils.syslog_export.EXPORT_FORMATS)
+            compress (bool): Compression gzip
+            archive_path (str): Base d'archive à exporter (prioritaire sur buffer_rows)
+            buffer_rows (list): Instantané des messages du tampon d'affichage
+            criteria (dict): start, end, hosts, severities (et text pour l'archive)
+        """
+        super().__init__(parent)
+        self.exporter = SyslogExporter(path, export_format, compress)
+        self.archive_path = archive_path
+        self.buffer_rows = buffer_rows or []
+        self.criteria = criteria or {}
+        self.is_canceled = False
+        self._total = 0
+        self._last_percent = -1
+        self._chunks_done = 0
+
+    def run(self):
+        try:
+            self.status_updated.emit("Préparation de l'export...")
+            archive = None
+            if self.archive_path:
+                archive = SyslogArchive(self.archive_path)
+                self._total = archive.count(**self.criteria)
+                chunks = archive_to_rows(archive.iter_chunks(chunk_size=self.CHUNK_SIZE, **self.criteria))
+            else:
+                self._total = len(self.buffer_rows)
+                chunks = select_rows(self.buffer_rows, chunk_size=self.CHUNK_SIZE, **self.criteria)
+
+            self.status_updated.emit(f"Export en cours vers {self.exporter.path}...")
+            try:
+                exported = self.exporter.export(chunks, self._onProgress, lambda: self.is_canceled)
+            finally:
+                if archive is not None:
+                    archive.close()
+            self.progress_updated.emit(100)
+            self.export_finished.emit(self.exporter.path, exported)
+
+        except ExportCanceled:
+            logger.info("Export syslog annulé")
+            self.status_updated.emit("Export annulé")
+        except Exception as e:
+            error_msg = f"Erreur lors de l'export: {str(e)}"
+            logger.error(f"{error_msg}\n{traceback.format_exc()}")
+            self.error_occurred.emit(error_msg)
+
+    def _onProgress(self, exported: int) -> None:
+        # Un appel par bloc : pour le tampon, la progression suit les messages parcourus
+        self._chunks_done += 1
+        done = exported if self.archive_path else min(self._total, self._chunks_done * self.CHUNK_SIZE)
+        percent = int(done * 100 / self._total) if self._total else 100
+        if percent != self._last_percent:
+            self._last_percent = percent
+            self.progress_updated.emit(min(percent, 99))
+
+    def cancel(self):
+        """Permet d'annuler l'export en cours"""
+        self.is_canceled = True
+        logger.info("Demande d'annulation de l'export syslog")
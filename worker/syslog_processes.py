@@ -0,0 +1,220 @@
+"""Réception et analyse syslog dans des processus séparés (hors du GIL du GUI).
+
+Ce module ne dépend pas de Qt : il est importé par les processus fils (contexte "spawn").
+"""
+import errno
+import logging
+import multiprocessing
+import os
+import queue
+import select
+import socket
+import sys
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from utils.syslog_filter import SyslogFilter
+from utils.syslog_parser import parse
+
+logger = logging.getLogger("SyslogProcesses")
+
+# SO_REUSEPORT répartit les datagrammes entre sockets (hachage de l'émetteur) sous Linux uniquement
+HAS_REUSEPORT = hasattr(socket, "SO_REUSEPORT") and sys.platform.startswith("linux")
+
+# Messages envoyés par les processus fils
+MSG_READY = "ready"  # (MSG_READY, index, taille SO_RCVBUF obtenue)
+MSG_BATCH = "batch"  # (MSG_BATCH, received_at, timestamp, [(ip, source, facility, severity, message, retenu), ...])
+MSG_DROPS = "drops"  # (MSG_DROPS, index, pertes noyau cumulées)
+MSG_ERROR = "error"  # (MSG_ERROR, index, texte)
+
+# (ip, source, facility, severity, message, retenu par les filtres)
+ProcessedRow = Tuple[str, str, int, int, str, bool]
+
+
+def read_udp_socket_drops(sock: socket.socket) -> Optional[int]:
+    """Lit le compteur de datagrammes perdus par le noyau pour ce socket (/proc/net/udp, Linux uniquement)"""
+    if not sys.platform.startswith('linux'):
+        return None
+    try:
+        inode = str(os.fstat(sock.fileno()).st_ino)
+    except (OSError, ValueError):
+        return None
+    for table in ("/proc/net/udp", "/proc/net/udp6"):
+        try:
+            with open(table, "r") as f:
+                next(f, None)  # En-tête
+                for line in f:
+                    fields = line.split()
+                    # sl local rem st tx:rx tr:when retrnsmt uid timeout inode ref pointer drops
+                    if len(fields) >= 13 and fields[9] == inode:
+                        return int(fields[12])
+        except (OSError, ValueError):
+            continue
+    return None
+
+
+def _open_socket(options: dict) -> socket.socket:
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    if options.get("reuse_port") and HAS_REUSEPORT:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+    if options.get("recv_socket_buffer", 0) > 0:
+        try:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, options["recv_socket_buffer"])
+        except OSError:
+            pass
+    sock.bind((options["host"], options["port"]))
+    sock.setblocking(False)
+    return sock
+
+
+def drain_socket(sock: socket.socket, buffer_size: int, max_batch: int) -> list:
+    """Lit tous les datagrammes en attente (jusqu'à EAGAIN ou max_batch)"""
+    batch = []
+    recvfrom = sock.recvfrom
+    while len(batch) < max_batch:
+        try:
+            batch.append(recvfrom(buffer_size))
+        except (BlockingIOError, InterruptedError):
+            break
+        except OSError as e:
+            # ECONNREFUSED/ENETUNREACH remontés par ICMP sous Windows : on continue à vider la file
+            if e.errno in (errno.ECONNREFUSED, errno.ENETUNREACH, errno.ECONNRESET):
+                continue
+            raise
+    return batch
+
+
+def _put(out_queue, message, stop_event) -> bool:
+    """Envoie un message au processus GUI ; attend tant que la file est pleine (sauf arrêt)"""
+    while not stop_event.is_set():
+        try:
+            out_queue.put(message, timeout=0.5)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def receiver_main(index: int, options: dict, out_queue, control_queue, stop_event) -> None:
+    """Point d'entrée d'un processus fils : réception, analyse et filtrage par lots"""
+    try:
+        sock = _open_socket(options)
+    except OSError as e:
+        out_queue.put((MSG_ERROR, index, f"Impossible d'ouvrir le port {options['port']}: {e}"))
+        return
+    out_queue.put((MSG_READY, index, sock.getsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF)))
+
+    message_filter = SyslogFilter.compile(options.get("filters"))
+    buffer_size = options.get("buffer_size", 8192)
+    max_batch = max(1, options.get("recv_max_batch", 512))
+    stats_interval = options.get("stats_interval", 5.0)
+    last_drops_check = 0.0
+    try:
+        while not stop_event.is_set():
+            # Filtres remplacés à chaud par le processus GUI
+            try:
+                while True:
+                    message_filter = SyslogFilter.compile(control_queue.get_nowait())
+            except queue.Empty:
+                pass
+
+            ready, _, _ = select.select([sock], [], [], 0.2)
+            now = time.time()
+            if ready:
+                batch = drain_socket(sock, buffer_size, max_batch)
+                if batch:
+                    rows: List[ProcessedRow] = []
+                    matches = message_filter.matches
+                    for data, (ip, port) in batch:
+                        record = parse(data.decode('utf-8', errors='replace').strip())
+                        rows.append((ip, f"{ip}:{port}", record.facility, record.severity, record.text,
+                                     matches(ip, record.facility, record.severity, record.text)))
+                    timestamp = datetime.fromtimestamp(now).strftime("%Y-%m-%d %H:%M:%S")
+                    if not _put(out_queue, (MSG_BATCH, now, timestamp, rows), stop_event):
+                        break
+
+            if now - last_drops_check >= stats_interval:
+                drops = read_udp_socket_drops(sock)
+                if drops is not None:
+                    _put(out_queue, (MSG_DROPS, index, drops), stop_event)
+                last_drops_check = now
+    except Exception as e:
+        out_queue.put((MSG_ERROR, index, f"Erreur du processus de réception {index}: {e}"))
+    finally:
+        sock.close()
+
+
+class SyslogProcessPool:
+    """Pool de processus de réception syslog partageant un port (SO_REUSEPORT)"""
+
+    def __init__(self, process_count: int, options: dict, max_pending_batches: int = 1024):
+        """
+        Args:
+            process_count (int): Nombre de processus demandés (1 seul sans SO_REUSEPORT)
+            options (dict): host, port, buffer_size, recv_max_batch, recv_socket_buffer, reuse_port, filters
+            max_pending_batches (int): Lots en attente au-delà desquels les processus fils patientent
+        """
+        self.options = dict(options)
+        if process_count > 1 and not (self.options.get("reuse_port") and HAS_REUSEPORT):
+            logger.warning("SO_REUSEPORT indisponible : un seul processus de réception sera utilisé")
+            process_count = 1
+        self.process_count = max(1, process_count)
+        self._context = multiprocessing.get_context("spawn")  # Pas de fork d'un processus Qt multi-thread
+        self.out_queue = self._context.Queue(maxsize=max_pending_batches)
+        self._stop_event = self._context.Event()
+        self._control_queues = []
+        self._processes = []
+        self._drops: Dict[int, int] = {}
+
+    def start(self) -> None:
+        for index in range(self.process_count):
+            control_queue = self._context.Queue()
+            process = self._context.Process(
+                target=receiver_main, name=f"SyslogReceiver-{index}",
+                args=(index, self.options, self.out_queue, control_queue, self._stop_event),
+                daemon=True
+            )
+            process.start()
+            self._control_queues.append(control_queue)
+            self._processes.append(process)
+
+    def get_many(self, timeout: float = 0.5, limit: int = 64) -> list:
+        """Attend un message des processus fils puis récupère ceux déjà disponibles"""
+        try:
+            messages = [self.out_queue.get(timeout=timeout)]
+        except queue.Empty:
+            return []
+        while len(messages) < limit:
+            try:
+                messages.append(self.out_queue.get_nowait())
+            except queue.Empty:
+                break
+        return messages
+
+    def record_drops(self, index: int, drops: int) -> int:
+        """Enregistre les pertes noyau d'un processus et retourne le total"""
+        self._drops[index] = drops
+        return sum(self._drops.values())
+
+    def update_filters(self, filters: dict) -> None:
+        for control_queue in self._control_queues:
+            control_queue.put(filters)
+
+    def is_alive(self) -> bool:
+        return any(process.is_alive() for process in self._processes)
+
+    def stop(self, timeout: float = 2.0) -> None:
+        self._stop_event.set()
+        deadline = time.monotonic() + timeout
+        for process in self._processes:
+            process.join(max(0.0, deadline - time.monotonic()))
+            if process.is_alive():
+                process.terminate()
+        # Libère les threads d'alimentation des files sans attendre les lots non lus
+        self.out_queue.cancel_join_thread()
+        for control_queue in self._control_queues:
+            control_queue.cancel_join_thread()
+        self._processes = []
+        self._control_queues = []
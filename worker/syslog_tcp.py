@@ -0,0 +1,142 @@
+import asyncio
+import logging
+import ssl
+import threading
+import time
+from typing import Callable, List, Optional, Tuple
+
+from utils.syslog_framing import SyslogStreamDecoder
+
+logger = logging.getLogger("SyslogTcp")
+
+# Rappel du pipeline : (messages bruts, ip, port, horodatage de réception)
+MessagesCallback = Callable[[List[bytes], str, int, float], None]
+
+
+def create_server_ssl_context(certfile: str, keyfile: Optional[str] = None) -> ssl.SSLContext:
+    """Contexte TLS serveur à partir d'un certificat local (PEM)"""
+    context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+    context.minimum_version = ssl.TLSVersion.TLSv1_2
+    context.load_cert_chain(certfile, keyfile or None)
+    return context
+
+
+class _SyslogTcpProtocol(asyncio.Protocol):
+    def __init__(self, listener: "SyslogTcpListener"):
+        self.listener = listener
+        self.transport = None
+        self.decoder = SyslogStreamDecoder(listener.max_message_size)
+        self.ip = ""
+        self.port = 0
+
+    def connection_made(self, transport) -> None:
+        self.transport = transport
+        peer = transport.get_extra_info("peername") or ("", 0)
+        self.ip, self.port = peer[0], peer[1]
+        if len(self.listener.connections) >= self.listener.max_connections:
+            logger.warning(f"Connexion syslog TCP refusée ({self.ip}) : limite de connexions atteinte")
+            transport.close()
+            return
+        self.listener.connections.add(self)
+
+    def data_received(self, data: bytes) -> None:
+        messages = self.decoder.feed(data)
+        if messages:
+            self.listener.deliver(messages, self.ip, self.port)
+
+    def connection_lost(self, exc) -> None:
+        messages = self.decoder.flush()
+        if messages:
+            self.listener.deliver(messages, self.ip, self.port)
+        self.listener.connections.discard(self)
+
+
+class SyslogTcpListener:
+    """Réception syslog TCP/TLS : une boucle asyncio dans un thread dédié pour toutes les connexions"""
+
+    def __init__(self, on_messages: MessagesCallback, max_connections: int = 10000,
+                 max_message_size: int = 64 * 1024):
+        """
+        Args:
+            on_messages: Appelé dans le thread asyncio avec les messages complets d'une lecture
+            max_connections (int): Nombre maximal de connexions simultanées
+            max_message_size (int): Taille maximale d'un message (au-delà, il est tronqué)
+        """
+        self.on_messages = on_messages
+        self.max_connections = max_connections
+        self.max_message_size = max_message_size
+        self.connections = set()
+        self.messages_received = 0
+        self._endpoints: List[Tuple[str, int, Optional[ssl.SSLContext]]] = []
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._servers = []
+        self._thread: Optional[threading.Thread] = None
+        self._started = threading.Event()
+        self._start_error: Optional[BaseException] = None
+
+    def add_endpoint(self, host: str, port: int, ssl_context: Optional[ssl.SSLContext] = None) -> None:
+        self._endpoints.append((host, port, ssl_context))
+
+    def deliver(self, messages: List[bytes], ip: str, port: int) -> None:
+        self.messages_received += len(messages)
+        try:
+            self.on_messages(messages, ip, port, time.time())
+        except Exception as e:
+            logger.error(f"Erreur lors du traitement des messages TCP de {ip}: {e}")
+
+    def start(self, timeout: float = 5.0) -> None:
+        """Ouvre les ports d'écoute ; lève l'erreur de bind éventuelle"""
+        self._thread = threading.Thread(target=self._run, name="SyslogTcpListener", daemon=True)
+        self._thread.start()
+        if not self._started.wait(timeout):
+            raise TimeoutError("Démarrage de l'écoute TCP syslog trop long")
+        if self._start_error is not None:
+            raise self._start_error
+
+    def _run(self) -> None:
+        loop = self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        try:
+            for host, port, ssl_context in self._endpoints:
+                server = loop.run_until_complete(loop.create_server(
+                    lambda: _SyslogTcpProtocol(self), host, port, ssl=ssl_context,
+                    reuse_address=True, backlog=1024
+                ))
+                self._servers.append(server)
+                logger.info(f"Écoute syslog {'TLS' if ssl_context else 'TCP'} sur {host}:{port}")
+        except BaseException as e:
+            self._start_error = e
+            self._started.set()
+            self._close_servers()
+            loop.close()
+            return
+        self._started.set()
+        try:
+            loop.run_forever()
+        finally:
+            for protocol in list(self.connections):
+                if protocol.transport is not None:
+                    protocol.transport.abort()
+            loop.run_until_complete(asyncio.sleep(0))  # Laisse passer les connection_lost
+            self._close_servers()
+            loop.close()
+
+    def _close_servers(self) -> None:
+        for server in self._servers:
+            server.close()
+            try:
+                self._loop.run_until_complete(server.wait_closed())
+            except Exception:
+                pass
+        self._servers = []
+
+    def stop(self, timeout: float = 5.0) -> None:
+        if self._loop is not None:
+            try:
+                self._loop.call_soon_threadsafe(self._loop.stop)
+            except RuntimeError:
+                pass  # Boucle déjà fermée
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        self._loop = None
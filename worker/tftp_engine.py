@@ -0,0 +1,1349 @@
+"""Moteur de transfert TFTP sans Qt : une seule boucle (selectors) pour toutes les sessions.
+
+Chaque transfert garde son propre socket (TID, RFC 1350), mais tous sont servis par le même
+thread : minuteur par session, nombre de sessions actives borné (file d'attente au-delà) et
+envoi à tour de rôle par rafales bornées. Le serveur Qt (views.tftp_server) reçoit les
+événements par rappels, depuis ce thread.
+"""
+import errno
+import heapq
+import itertools
+import logging
+import mmap
+import os
+import queue
+import selectors
+import shutil
+import socket
+import sys
+import tempfile
+import threading
+import time
+from collections import OrderedDict, deque
+from struct import pack_into
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+logger = logging.getLogger("TFTPServer")
+
+# -------------------- CONSTANTES DU PROTOCOLE TFTP -------------------- #
+OPCODE_RRQ = 1    # Read request
+OPCODE_WRQ = 2    # Write request
+OPCODE_DATA = 3   # Data packet
+OPCODE_ACK = 4    # Acknowledgment
+OPCODE_ERROR = 5  # Error
+OPCODE_OACK = 6   # Option Acknowledgment (RFC2347)
+
+# TFTP Error codes
+ERROR_NOT_DEFINED = 0
+ERROR_FILE_NOT_FOUND = 1
+ERROR_ACCESS_VIOLATION = 2
+ERROR_DISK_FULL = 3
+ERROR_ILLEGAL_OPERATION = 4
+ERROR_UNKNOWN_TRANSFER_ID = 5
+ERROR_FILE_EXISTS = 6
+ERROR_NO_SUCH_USER = 7
+
+IS_WINDOWS = sys.platform.startswith('win')
+# Émission scatter-gather (en-tête + données sans concaténation) ; absente sous Windows
+HAS_SENDMSG = hasattr(socket.socket, 'sendmsg')
+# Python >= 3.13 (Unix) : la projection peut se passer de sa copie du descripteur
+_MMAP_OPTIONS = {'trackfd': False} if sys.version_info >= (3, 13) and not IS_WINDOWS else {}
+
+# Taille de bloc par défaut (RFC 1350) et bornes de l'option blksize (RFC 2348)
+DEFAULT_BLKSIZE = 512
+MIN_BLKSIZE = 8
+# Pour Windows, on limite la taille de bloc négociée à 1024 octets (WinError 10040).
+MAX_ALLOWED_BLKSIZE = 1024 if IS_WINDOWS else 65464
+
+# Fenêtre maximale acceptée pour l'option windowsize (RFC 7440)
+MAX_WINDOWSIZE = 64
+
+SUPPORTED_OPTIONS = {"blksize", "timeout", "tsize", "windowsize"}
+
+# Délai de retransmission adaptatif (RFC 6298) : valeur initiale et plancher (s) ; le plafond est
+# le timeout du serveur, ou celui négocié par le client (option timeout, alors fixe)
+INITIAL_RTO = 1.0
+MIN_RTO = 0.05
+
+# Intervalle minimal entre deux événements de progression d'un même transfert (s)
+PROGRESS_INTERVAL = 0.25
+
+_DISK_FULL_ERRNOS = {errno.ENOSPC, getattr(errno, 'EDQUOT', errno.ENOSPC)}
+
+
+def parse_request(data: bytes) -> Tuple[str, str, Dict[str, str]]:
+    """Extrait le nom de fichier, le mode et les options supportées d'une requête RRQ/WRQ (sans l'opcode)"""
+    parts = data.split(b'\x00')
+    if len(parts) < 2:
+        raise ValueError("Invalid TFTP request format")
+    filename = os.path.normpath(parts[0].decode('utf-8')).lstrip('/')
+    mode = parts[1].decode('utf-8').lower()
+    if mode not in ['netascii', 'octet', 'mail']:
+        logger.warning(f"Unsupported mode: {mode}, using octet")
+        mode = 'octet'
+    options = {}
+    for i in range(2, len(parts) - 1, 2):
+        if not parts[i] or not parts[i + 1]:
+            continue
+        try:
+            key = parts[i].decode('utf-8').lower()
+            value = parts[i + 1].decode('utf-8')
+        except UnicodeDecodeError as e:
+            logger.warning(f"Error parsing option: {e}")
+            continue
+        if key in SUPPORTED_OPTIONS:
+            options[key] = value
+        else:
+            logger.info(f"Ignoring unsupported option: {key}={value}")
+    return filename, mode, options
+
+
+def build_error(error_code: int, error_msg: str) -> bytes:
+    return (OPCODE_ERROR.to_bytes(2, 'big') + error_code.to_bytes(2, 'big')
+            + error_msg.encode('utf-8', errors='replace') + b'\x00')
+
+
+def build_oack(options: Dict[str, str]) -> bytes:
+    packet = bytearray(OPCODE_OACK.to_bytes(2, 'big'))
+    for key, value in options.items():
+        packet += key.encode('utf-8') + b'\x00' + value.encode('utf-8') + b'\x00'
+    return bytes(packet)
+
+
+def probe_socket_buffers() -> Tuple[int, int]:
+    """Tailles de tampon (réception, émission) maximales acceptées par le système"""
+    try:
+        test_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        max_recv = test_socket.getsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF)
+        max_send = test_socket.getsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF)
+        for size in [8192, 16384, 32768, 65536, 131072, 262144]:
+            try:
+                test_socket.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, size)
+                max_recv = max(max_recv, test_socket.getsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF))
+                test_socket.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, size)
+                max_send = max(max_send, test_socket.getsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF))
+            except OSError as e:
+                logger.info(f"Error testing buffer size {size}: {e}")
+                break
+        test_socket.close()
+        logger.info(f"Max socket buffers - Receive: {max_recv} bytes, Send: {max_send} bytes")
+        return max_recv, max_send
+    except OSError as e:
+        logger.error(f"Error debugging socket buffers: {e}")
+        return 65536, 65536
+
+
+def _map_file(filepath: str) -> Tuple[os.stat_result, Optional[mmap.mmap], memoryview]:
+    """Projette un fichier en lecture ; retourne (stat du fichier ouvert, projection, vue).
+
+    Le fichier est refermé aussitôt : la projection reste valide sans descripteur ouvert.
+    """
+    with open(filepath, 'rb') as f:
+        st = os.fstat(f.fileno())
+        if st.st_size == 0:
+            return st, None, memoryview(b'')  # mmap refuse les fichiers vides
+        mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ, **_MMAP_OPTIONS)
+    if hasattr(mapping, 'madvise') and hasattr(mmap, 'MADV_SEQUENTIAL'):
+        mapping.madvise(mmap.MADV_SEQUENTIAL)
+    return st, mapping, memoryview(mapping)
+
+
+class CachedImage:
+    """Fichier projeté partagé par les lectures en cours (compteur de références)"""
+
+    __slots__ = ('key', 'mapping', 'view', 'size', 'refs', 'stale')
+
+    def __init__(self, key: tuple, mapping: Optional[mmap.mmap], view: memoryview):
+        self.key = key
+        self.mapping = mapping
+        self.view = view
+        self.size = len(view)
+        self.refs = 0
+        self.stale = False  # Remplacé sur disque : libéré dès la dernière référence rendue
+
+    def close(self) -> None:
+        self.view.release()
+        if self.mapping is not None:
+            self.mapping.close()
+
+
+class ImageCache:
+    """Projections partagées, indexées par (chemin, mtime, taille), avec éviction LRU.
+
+    Toutes les lectures simultanées d'une même image utilisent une seule projection. Les images
+    sans lecteur restent projetées tant que le budget (octets et nombre) le permet ; une image en
+    cours de lecture n'est jamais évincée, le budget peut donc être dépassé temporairement.
+    Sous Windows, une projection empêche de supprimer ou remplacer le fichier : les images y sont
+    libérées dès le dernier lecteur (keep_idle=False).
+    Utilisé uniquement depuis la boucle du moteur (pas de verrou) ; stats() est lisible d'ailleurs.
+    """
+
+    def __init__(self, max_bytes: int = 256 * 1024 * 1024, max_entries: int = 64,
+                 keep_idle: bool = not IS_WINDOWS):
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.keep_idle = keep_idle
+        self._entries: "OrderedDict[tuple, CachedImage]" = OrderedDict()  # Du moins au plus récent
+        self._by_path: Dict[str, CachedImage] = {}  # Version la plus récente de chaque chemin
+        self.mapped_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def acquire(self, filepath: str) -> CachedImage:
+        """Retourne l'image à jour de `filepath` (projetée au besoin), référence prise"""
+        st = os.stat(filepath)
+        entry = self._entries.get((filepath, st.st_mtime_ns, st.st_size))
+        if entry is None:
+            self.misses += 1
+            entry = self._load(filepath)
+            entry.refs += 1
+            self._evict()  # Après la prise de référence : la nouvelle image n'est pas évincée
+        else:
+            self.hits += 1
+            self._entries.move_to_end(entry.key)
+            entry.refs += 1
+        return entry
+
+    def release(self, entry: CachedImage) -> None:
+        entry.refs -= 1
+        if entry.refs == 0:
+            if entry.stale or not self.keep_idle:
+                self._drop(entry)
+            else:
+                self._evict()
+
+    def invalidate(self, filepath: str) -> None:
+        """Oublie l'image de `filepath` avant son remplacement (libérée dès le dernier lecteur)"""
+        entry = self._by_path.pop(filepath, None)
+        if entry is not None:
+            entry.stale = True
+            if entry.refs == 0:
+                self._drop(entry)
+
+    def _load(self, filepath: str) -> CachedImage:
+        st, mapping, view = _map_file(filepath)
+        key = (filepath, st.st_mtime_ns, st.st_size)  # Clé du fichier réellement ouvert
+        entry = self._entries.get(key)
+        if entry is not None:  # Déjà projeté : la course stat/open a mené au même fichier
+            view.release()
+            if mapping is not None:
+                mapping.close()
+            return entry
+        previous = self._by_path.get(filepath)
+        if previous is not None:
+            previous.stale = True
+            if previous.refs == 0:
+                self._drop(previous)
+        entry = CachedImage(key, mapping, view)
+        self._entries[key] = entry
+        self._by_path[filepath] = entry
+        self.mapped_bytes += entry.size
+        return entry
+
+    def _evict(self) -> None:
+        if self.mapped_bytes <= self.max_bytes and len(self._entries) <= self.max_entries:
+            return
+        for entry in list(self._entries.values()):
+            if entry.refs == 0:
+                self._drop(entry)
+                self.evictions += 1
+                if self.mapped_bytes <= self.max_bytes and len(self._entries) <= self.max_entries:
+                    return
+
+    def _drop(self, entry: CachedImage) -> None:
+        del self._entries[entry.key]
+        if self._by_path.get(entry.key[0]) is entry:
+            del self._by_path[entry.key[0]]
+        self.mapped_bytes -= entry.size
+        entry.close()
+
+    def clear(self) -> None:
+        """Libère les images sans lecteur (arrêt du serveur)"""
+        for entry in list(self._entries.values()):
+            if entry.refs == 0:
+                self._drop(entry)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            'images': len(self._entries),
+            'mapped_bytes': self.mapped_bytes,
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_ratio': self.hits / lookups if lookups else 0.0,
+        }
+
+
+class TFTPError(Exception):
+    """Erreur de transfert transmise au client avec son code TFTP"""
+
+    def __init__(self, error_code: int, message: str):
+        super().__init__(message)
+        self.error_code = error_code
+
+
+class TransferProgress:
+    """Compteurs publiés d'un transfert : écrits par sa seule session, lus sans verrou ailleurs.
+
+    Les horodatages sont en time.monotonic() ; snapshot() en donne une vue cohérente pour l'affichage.
+    """
+
+    __slots__ = ('client_id', 'filename', 'direction', 'file_size', 'blksize', 'windowsize',
+                 'bytes_done', 'started', 'last_activity', 'ended', 'success', 'notified_at',
+                 'retransmits', 'timeouts', 'duplicates', 'srtt', 'rto')
+
+    def __init__(self, client_id: str, filename: str, direction: str, now: float):
+        self.client_id = client_id
+        self.filename = filename
+        self.direction = direction
+        self.file_size = 0
+        self.blksize = DEFAULT_BLKSIZE
+        self.windowsize = 1
+        self.bytes_done = 0
+        self.started = now
+        self.last_activity = now
+        self.ended: Optional[float] = None
+        self.success = False
+        self.notified_at = now
+        self.retransmits = 0
+        self.timeouts = 0
+        self.duplicates = 0
+        self.srtt: Optional[float] = None
+        self.rto = INITIAL_RTO
+
+    def elapsed(self, now: Optional[float] = None) -> float:
+        end = self.ended if self.ended is not None else (now if now is not None else time.monotonic())
+        return max(end - self.started, 0.0)
+
+    def snapshot(self, now: Optional[float] = None) -> Dict[str, Any]:
+        ended = self.ended
+        bytes_done = self.bytes_done
+        file_size = self.file_size
+        elapsed = self.elapsed(now)
+        speed = bytes_done / elapsed if elapsed > 0 else 0.0
+        remaining = (file_size - bytes_done) / speed if speed > 0 and file_size >= bytes_done else -1
+        return {
+            'client_id': self.client_id,
+            'filename': self.filename,
+            'direction': self.direction,
+            'file_size': file_size,
+            'progress': bytes_done,
+            'speed': speed,
+            'elapsed': elapsed,
+            'remaining_time': 0 if ended is not None else remaining,
+            'block_size': self.blksize,
+            'windowsize': self.windowsize,
+            'completed': ended is not None,
+            'success': self.success,
+            'retransmits': self.retransmits,
+            'timeouts': self.timeouts,
+            'duplicates': self.duplicates,
+            'srtt': self.srtt,
+            'rto': self.rto,
+        }
+
+
+class DiskWriter:
+    """Thread d'écriture des uploads : écritures, fsync et renommages hors de la boucle du moteur.
+
+    Les tâches sont exécutées dans l'ordre de soumission (donc dans l'ordre pour une session) ;
+    chaque tâche terminée est remise à la boucle par la file `done`, et un octet écrit sur
+    `wakeup` (socketpair surveillé par le sélecteur) réveille celle-ci.
+    """
+
+    def __init__(self):
+        self._jobs: "queue.Queue[Optional[tuple]]" = queue.Queue()
+        self.done: Deque[tuple] = deque()  # (session, tâche, octets, exception ou None)
+        self.wakeup, self._notify = socket.socketpair()
+        self.wakeup.setblocking(False)
+        self._notify.setblocking(False)
+        self._thread = threading.Thread(target=self._run, name="TFTPDiskWriter", daemon=True)
+        self._thread.start()
+
+    def submit(self, session: "WriteSession", job: str, data: bytes = b'') -> None:
+        self._jobs.put((session, job, data))
+
+    def wait(self) -> None:
+        """Attend la fin de toutes les tâches soumises"""
+        self._jobs.join()
+
+    def close(self) -> None:
+        """Exécute les tâches restantes puis arrête le thread"""
+        self._jobs.put(None)
+        self._thread.join()
+        self.wakeup.close()
+        self._notify.close()
+
+    def _run(self) -> None:
+        while True:
+            item = self._jobs.get()
+            try:
+                if item is None:
+                    return
+                session, job, data = item
+                try:
+                    session.run_disk_job(job, data)
+                    error = None
+                except Exception as e:
+                    error = e
+                self.done.append((session, job, len(data), error))
+                try:
+                    self._notify.send(b'\0')
+                except OSError:
+                    pass  # Tampon plein : la boucle a déjà des réveils en attente
+            finally:
+                self._jobs.task_done()
+
+
+class TFTPEngineListener:
+    """Rappels du moteur, appelés depuis le thread de la boucle (implémentations vides par défaut)"""
+
+    def on_log(self, level: str, message: str) -> None:
+        pass
+
+    def on_request(self, client_addr: Tuple[str, int], opcode: int, filename: str) -> None:
+        pass
+
+    def on_transfer_started(self, session: "TransferSession") -> None:
+        pass
+
+    def on_transfer_progress(self, session: "TransferSession") -> None:
+        """Au plus une fois par PROGRESS_INTERVAL et par transfert ; session.progress est à jour"""
+
+    def on_transfer_finished(self, session: "TransferSession", success: bool, error: Optional[str]) -> None:
+        pass
+
+
+class TransferSession:
+    """État commun d'un transfert : TID, options négociées, minuteur et retransmissions.
+
+    Le délai de retransmission (rto) suit le RTT mesuré comme TCP (SRTT/RTTVAR, RFC 6298),
+    borné par [MIN_RTO, max_rto] et doublé à chaque expiration. Algorithme de Karn : aucune
+    mesure sur un paquet renvoyé (`rtt_mark` est alors oublié).
+    """
+
+    direction = ''
+
+    def __init__(self, engine: "TFTPEngine", sock: socket.socket, client_addr: Tuple[str, int],
+                 filename: str, timeout: float):
+        self.engine = engine
+        self.sock = sock
+        self.client_addr = client_addr
+        self.client_id = f"{client_addr[0]}:{client_addr[1]}"
+        self.filename = filename
+        self.file_size = 0
+        self.blksize = DEFAULT_BLKSIZE
+        self.windowsize = 1
+        self.timeout = timeout
+        self.options: Dict[str, str] = {}
+        self.state = 'data'
+        self.retries_left = engine.max_retries
+        self.bytes_done = 0
+        now = time.monotonic()
+        self.progress = TransferProgress(self.client_id, filename, self.direction, now)
+        self.max_rto = timeout
+        self.rto = min(INITIAL_RTO, timeout)
+        self.adaptive = True   # Faux si le client a imposé son timeout (RFC 2349)
+        self.srtt: Optional[float] = None
+        self.rttvar = 0.0
+        self.rtt_mark: Optional[Tuple[int, float]] = None  # (bloc, instant d'émission) mesuré
+        self.last_heard = now  # Dernier paquet reçu du client
+        self.retransmits = 0   # Paquets renvoyés (timeout ou reprise demandée par le client)
+        self.timeouts = 0      # Expirations du minuteur
+        self.duplicates = 0    # ACK répétés (lecture) ou blocs hors séquence (écriture) reçus
+        self.deadline = 0.0    # Échéance du minuteur de retransmission (time.monotonic)
+        self.timer_at = None   # Échéance de l'entrée présente dans le tas des minuteurs
+        self.queued = False    # Présent dans la file des sessions prêtes à émettre
+        self.reported = False  # Fin déjà signalée au listener
+        self.finished = False
+
+    def update_progress(self, now: float, notify: bool = True) -> None:
+        """Publie les compteurs dans self.progress ; événement au listener limité à PROGRESS_INTERVAL"""
+        progress = self.progress
+        progress.bytes_done = self.bytes_done
+        progress.file_size = self.file_size
+        progress.blksize = self.blksize
+        progress.windowsize = self.windowsize
+        progress.retransmits = self.retransmits
+        progress.timeouts = self.timeouts
+        progress.duplicates = self.duplicates
+        progress.srtt = self.srtt
+        progress.rto = self.rto
+        progress.last_activity = now
+        if notify and now - progress.notified_at >= PROGRESS_INTERVAL:
+            progress.notified_at = now
+            self.engine.listener.on_transfer_progress(self)
+
+    def _negotiate(self, options: Dict[str, str]) -> Dict[str, str]:
+        """Options acceptées (renvoyées dans l'OACK) ; applique blksize, windowsize et timeout"""
+        negotiated = {}
+        if not self.engine.support_options:
+            return negotiated
+        if 'blksize' in options:
+            try:
+                requested = int(options['blksize'])
+                self.blksize = min(max(requested, MIN_BLKSIZE), MAX_ALLOWED_BLKSIZE)
+                if self.blksize != requested:
+                    logger.info(f"Adjusting block size from {requested} to {self.blksize}")
+                negotiated['blksize'] = str(self.blksize)
+            except ValueError:
+                pass
+        if 'timeout' in options:
+            try:
+                timeout = int(options['timeout'])
+                if 1 <= timeout <= 255:
+                    self.timeout = self.rto = self.max_rto = float(timeout)
+                    self.adaptive = False
+                    negotiated['timeout'] = str(timeout)
+            except ValueError:
+                pass
+        if 'tsize' in options:
+            negotiated['tsize'] = str(self.file_size)
+        if 'windowsize' in options:
+            try:
+                self.windowsize = min(max(int(options['windowsize']), 1), MAX_WINDOWSIZE)
+                negotiated['windowsize'] = str(self.windowsize)
+            except ValueError:
+                pass
+        if negotiated:
+            logger.info(f"Option negotiation with {self.client_id}: {negotiated}")
+        return negotiated
+
+    def _rtt_sample(self, now: float) -> None:
+        """Mesure terminée (paquet marqué acquitté) : met à jour SRTT/RTTVAR et le RTO"""
+        rtt = now - self.rtt_mark[1]
+        self.rtt_mark = None
+        if self.srtt is None:
+            self.srtt, self.rttvar = rtt, rtt / 2
+        else:
+            self.rttvar = 0.75 * self.rttvar + 0.25 * abs(self.srtt - rtt)
+            self.srtt = 0.875 * self.srtt + 0.125 * rtt
+        if self.adaptive:
+            self.rto = min(max(self.srtt + 4 * self.rttvar, MIN_RTO), self.max_rto)
+
+    def _backoff(self, now: float) -> bool:
+        """Minuteur expiré : double le RTO ; False si le client est considéré comme perdu.
+
+        Abandon après max_retries expirations consécutives, et pas avant max_rto x max_retries
+        secondes de silence du client : un RTO réduit sur un LAN accélère les renvois sans
+        raccourcir la patience du délai fixe d'origine.
+        """
+        self.timeouts += 1
+        self.rtt_mark = None
+        self.retries_left -= 1
+        if self.retries_left <= 0 and now - self.last_heard >= self.max_rto * self.engine.max_retries:
+            return False
+        self.rto = min(self.rto * 2, self.max_rto)
+        self.update_progress(now)
+        return True
+
+    def _send(self, packet: Optional[bytes], buffers: Optional[tuple] = None) -> bool:
+        try:
+            if buffers is not None:
+                self.sock.sendmsg(buffers, (), 0, self.client_addr)
+            else:
+                self.sock.sendto(packet, self.client_addr)
+            return True
+        except BlockingIOError:
+            return False
+        except OSError as e:
+            if IS_WINDOWS and getattr(e, 'winerror', None) == 10040:
+                raise Exception(f"Windows buffer overflow error: {e}")
+            logger.warning(f"Socket error while sending to {self.client_id}: {e}")
+            return True  # Considéré comme perdu : le minuteur s'en chargera
+
+    def on_datagram(self, data: bytes, addr: Tuple[str, int], now: float) -> None:
+        if addr != self.client_addr:
+            logger.warning(f"Received packet from unexpected address: {addr}")
+            self.engine.send_error(addr, ERROR_UNKNOWN_TRANSFER_ID, "Unknown transfer ID", self.sock)
+            return
+        if len(data) < 4:
+            logger.warning(f"Received invalid packet size: {len(data)}")
+            return
+        self.last_heard = now
+        opcode = int.from_bytes(data[:2], 'big')
+        if opcode == OPCODE_ERROR:
+            error_msg = data[4:].split(b'\x00')[0].decode('utf-8', errors='replace')
+            self.on_client_error(error_msg)
+        else:
+            self.on_packet(opcode, int.from_bytes(data[2:4], 'big'), data, now)
+
+    def on_client_error(self, error_msg: str) -> None:
+        self.engine.finish(self, False, f"Client aborted transfer: {error_msg}", notify_client=False)
+
+    def on_packet(self, opcode: int, block: int, data: bytes, now: float) -> None:
+        raise NotImplementedError
+
+    def wants_send(self) -> bool:
+        return False
+
+    def send_burst(self, budget: int, now: float) -> None:
+        pass
+
+    def on_timeout(self, now: float) -> None:
+        raise NotImplementedError
+
+    def _retry_label(self) -> str:
+        return (f"{self.engine.max_retries - self.retries_left}/{self.engine.max_retries}, "
+                f"next timeout {self.rto:.2f}s")
+
+    def close(self, success: bool) -> None:
+        pass
+
+
+class ReadSession(TransferSession):
+    """Transfert RRQ : négociation (OACK), puis fenêtre glissante de blocs en vol (RFC 7440).
+
+    Le fichier est projeté en mémoire (mmap, partagée via l'ImageCache du moteur) : un bloc
+    est une tranche memoryview de la projection, émise avec un en-tête réutilisé par sendmsg, sans copie ni lecture. La fenêtre
+    n'est donc qu'un intervalle de numéros : `next_block` est le prochain bloc à (ré)émettre,
+    ce qui permet à la boucle d'envoyer par rafales bornées et de renvoyer sans relire.
+    Les fichiers servis doivent être remplacés par renommage, pas tronqués sur place.
+    """
+
+    direction = 'download'
+
+    def __init__(self, engine: "TFTPEngine", sock: socket.socket, client_addr: Tuple[str, int],
+                 filename: str, filepath: str, options: Dict[str, str], timeout: float):
+        super().__init__(engine, sock, client_addr, filename, timeout)
+        self._image = engine.cache.acquire(filepath)
+        self._view = self._image.view
+        self.file_size = self._image.size
+        self._header = bytearray(4)  # En-tête DATA réécrit pour chaque bloc émis
+        self.options = self._negotiate(options)
+        self.state = 'oack' if self.options else 'data'
+        self.total_blocks = 0  # Dernier bloc du fichier (fixé à l'entrée en phase de données)
+        self.acked = 0         # Dernier bloc acquitté (numérotation absolue, sans repliement à 65536)
+        self.next_block = 1    # Prochain bloc à (ré)émettre
+        self.sent_max = 0      # Plus grand bloc émis
+        self.resent_for = -1   # Bloc pour lequel un ACK répété a déjà provoqué un renvoi
+
+    def begin(self, now: float) -> None:
+        if self.state == 'oack':
+            self.rtt_mark = (0, now)
+            self._send(build_oack(self.options))
+            self.engine.arm_timer(self, now)
+        else:
+            self._enter_data()
+
+    def _window_end(self) -> int:
+        return min(self.acked + self.windowsize, self.total_blocks)
+
+    def wants_send(self) -> bool:
+        return self.state == 'data' and self.next_block <= self._window_end()
+
+    def send_burst(self, budget: int, now: float) -> None:
+        """Émet au plus `budget` blocs de la fenêtre"""
+        window_end = self._window_end()
+        sent = 0
+        while sent < budget and self.next_block <= window_end:
+            if not self._send_block(self.next_block):
+                break  # Tampon d'émission plein : reprise au prochain tour
+            if self.next_block <= self.sent_max:
+                self.retransmits += 1
+            elif self.rtt_mark is None:
+                self.rtt_mark = (self.next_block, now)
+            self.next_block += 1
+            sent += 1
+        if sent:
+            self.sent_max = max(self.sent_max, self.next_block - 1)
+            self.engine.arm_timer(self, now)
+
+    def _send_block(self, block: int) -> bool:
+        """Émet un bloc DATA : en-tête réutilisé + tranche de la projection (scatter-gather)"""
+        offset = (block - 1) * self.blksize
+        pack_into('!HH', self._header, 0, OPCODE_DATA, block % 65536)
+        payload = self._view[offset:offset + self.blksize]
+        if HAS_SENDMSG:
+            return self._send(None, (self._header, payload))
+        return self._send(bytes(self._header) + payload)
+
+    def on_client_error(self, error_msg: str) -> None:
+        if self.state == 'oack':
+            # Options refusées : repli sur le TFTP standard
+            logger.info(f"Client {self.client_id} rejected options ({error_msg}), falling back to standard TFTP")
+            self.options = {}
+            self.blksize, self.windowsize = DEFAULT_BLKSIZE, 1
+            self._enter_data()
+            return
+        super().on_client_error(error_msg)
+
+    def on_packet(self, opcode: int, block: int, data: bytes, now: float) -> None:
+        if opcode != OPCODE_ACK:
+            return
+        if self.state == 'oack':
+            if block == 0:
+                logger.info(f"Client {self.client_id} acknowledged options with ACK 0")
+                if self.rtt_mark is not None:
+                    self._rtt_sample(now)
+                self._enter_data()
+            return
+
+        # Position de l'ACK dans la fenêtre : 0 = ACK répété, 1..(sent_max - acked) = progression
+        advance = (block - self.acked) % 65536
+        if advance == 0:
+            self.duplicates += 1
+            # Un seul renvoi par position (syndrome de l'apprenti sorcier) : les ACK répétés
+            # suivants, y compris ceux provoqués par ce renvoi, sont ignorés
+            if self.resent_for != self.acked and self.sent_max > self.acked:
+                # Le client a détecté un bloc manquant : reprise après le dernier bloc reçu
+                self.resent_for = self.acked
+                self.rtt_mark = None
+                self.next_block = self.acked + 1
+                self.engine.mark_ready(self)
+            return
+        if advance > self.sent_max - self.acked:
+            return  # ACK ancien ou hors fenêtre
+        self.acked += advance
+        if self.rtt_mark is not None and self.acked >= self.rtt_mark[0]:
+            self._rtt_sample(now)
+        self.next_block = max(self.next_block, self.acked + 1)
+        self.bytes_done = min(self.acked * self.blksize, self.file_size)
+        self.retries_left = self.engine.max_retries
+        self.update_progress(now)
+        if self.acked >= self.total_blocks:
+            self.engine.finish(self, True)
+            return
+        self.engine.arm_timer(self, now)
+        if self.wants_send():
+            self.engine.mark_ready(self)
+
+    def _enter_data(self) -> None:
+        self.state = 'data'
+        # Un bloc plus court que blksize (éventuellement vide) termine le transfert
+        self.total_blocks = self.file_size // self.blksize + 1
+        self.retries_left = self.engine.max_retries
+        self.engine.mark_ready(self)
+
+    def on_timeout(self, now: float) -> None:
+        if not self._backoff(now):
+            block = (self.acked + 1) % 65536 if self.state == 'data' else 0
+            self.engine.finish(self, False, f"Transfer timed out for block {block}")
+            return
+        if self.state == 'oack':
+            logger.warning(f"Timeout waiting for OACK acknowledgment from {self.client_id}, "
+                           f"retry {self._retry_label()}")
+            self.retransmits += 1
+            self._send(build_oack(self.options))
+            self.engine.arm_timer(self, now)
+            return
+        logger.warning(f"Timeout, resending {self.sent_max - self.acked} block(s) from block "
+                       f"{(self.acked + 1) % 65536} to {self.client_id} ({self._retry_label()})")
+        # Les ACK répétés provoqués par les blocs encore en route ne déclenchent pas un second renvoi
+        self.resent_for = self.acked
+        self.next_block = self.acked + 1
+        self.engine.mark_ready(self)
+
+    def close(self, success: bool) -> None:
+        self.engine.cache.release(self._image)
+
+
+class WriteSession(TransferSession):
+    """Transfert WRQ : réception par fenêtres (RFC 7440) vers un fichier temporaire.
+
+    Les blocs reçus dans l'ordre sont accumulés puis confiés par paquets de WRITE_BEHIND_BYTES
+    au DiskWriter du moteur, qui écrit, synchronise (fsync) et renomme atomiquement le fichier
+    temporaire hors de la boucle : le fichier de destination n'est jamais visible partiellement
+    écrit. Au-delà de MAX_WRITE_BEHIND octets en cours d'écriture, l'ACK de fenêtre est retenu
+    jusqu'à ce que le disque rattrape son retard. Le dernier ACK n'est émis qu'après le renommage,
+    puis répété pendant deux fois max_rto si le client renvoie le dernier bloc.
+    """
+
+    direction = 'upload'
+    WRITE_BEHIND_BYTES = 256 * 1024
+    MAX_WRITE_BEHIND = 4 * WRITE_BEHIND_BYTES
+
+    def __init__(self, engine: "TFTPEngine", sock: socket.socket, client_addr: Tuple[str, int],
+                 filename: str, filepath: str, options: Dict[str, str], timeout: float):
+        super().__init__(engine, sock, client_addr, filename, timeout)
+        self.filepath = filepath
+        try:
+            self.file_size = max(int(options.get('tsize', 0)), 0)  # Taille annoncée par le client
+        except ValueError:
+            self.file_size = 0
+        directory = os.path.dirname(filepath)
+        os.makedirs(directory, exist_ok=True)
+        if self.file_size and shutil.disk_usage(directory).free < self.file_size:
+            raise TFTPError(ERROR_DISK_FULL, "Disk full or allocation exceeded")
+        self.options = self._negotiate(options)
+        self._fit_window()
+        fd, self.temp_path = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(filepath)}.",
+                                              suffix=".part")
+        self.file = os.fdopen(fd, 'wb', buffering=0)
+        self._buffer: List[bytes] = []  # Blocs reçus pas encore confiés au DiskWriter
+        self._buffered = 0
+        self._writing = 0       # Octets confiés au DiskWriter, pas encore écrits
+        self._ack_held = False  # ACK de fenêtre retenu tant que le disque est en retard
+        self._replaced = False  # Renommage effectué (côté DiskWriter)
+        self.received = 0      # Dernier bloc reçu dans l'ordre (numérotation absolue)
+        self.in_window = 0     # Blocs reçus depuis le dernier ACK
+        self.gap_acked = -1    # Bloc pour lequel un ACK de reprise a déjà été envoyé
+        self.committed = False
+        self._last_packet = b''  # OACK ou dernier ACK, renvoyé sur timeout
+
+    def begin(self, now: float) -> None:
+        # Avec options, l'OACK tient lieu d'ACK 0 : le client répond par le bloc 1
+        self._last_packet = build_oack(self.options) if self.options else self._ack(0)
+        self.rtt_mark = (0, now)
+        self._send(self._last_packet)
+        self.engine.arm_timer(self, now)
+
+    def _fit_window(self) -> None:
+        """Réduit windowsize pour qu'une fenêtre entière tienne dans le tampon de réception.
+
+        Au-delà, le noyau jette la fin de chaque fenêtre (gros blksize) et chacune coûte un timeout.
+        Linux annonce le double de la taille demandée (comptabilité interne) : seule la moitié compte.
+        """
+        try:
+            budget = self.sock.getsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF) // 2
+        except OSError:
+            return
+        max_window = max(1, budget // (self.blksize + 64))
+        if self.windowsize > max_window:
+            logger.info(f"Reducing windowsize from {self.windowsize} to {max_window} for {self.client_id} "
+                        f"(receive buffer {budget} bytes)")
+            self.windowsize = max_window
+            if 'windowsize' in self.options:
+                self.options['windowsize'] = str(max_window)
+
+    @staticmethod
+    def _ack(block: int) -> bytes:
+        return OPCODE_ACK.to_bytes(2, 'big') + (block % 65536).to_bytes(2, 'big')
+
+    def _send_ack(self, block: int, now: float) -> None:
+        """ACK d'une fenêtre ; son délai jusqu'au bloc suivant sert de mesure de RTT"""
+        self._last_packet = self._ack(block)
+        self.rtt_mark = (block, now)
+        self._send(self._last_packet)
+
+    def on_packet(self, opcode: int, block: int, data: bytes, now: float) -> None:
+        if opcode != OPCODE_DATA:
+            return
+        if self.state == 'dally':
+            if block == self.received % 65536:
+                self.duplicates += 1
+                self.retransmits += 1
+                self._send(self._last_packet)  # Dernier ACK perdu : le client a renvoyé le dernier bloc
+            return
+        if self.state == 'commit':
+            self.duplicates += 1  # Dernier bloc répété pendant l'enregistrement : l'ACK suivra
+            return
+        if block != (self.received + 1) % 65536:
+            # Bloc manquant (ou doublon après un ACK perdu) : ACK du dernier bloc reçu, une fois par
+            # position, pour ne pas multiplier les renvois du client (apprenti sorcier)
+            self.duplicates += 1
+            if self.gap_acked != self.received and not self._ack_held:
+                self.gap_acked = self.received
+                self.in_window = 0
+                self.retransmits += 1
+                self._send_ack(self.received, now)
+                self.rtt_mark = None
+            return
+        if self.rtt_mark is not None:
+            if self.rtt_mark[0] == self.received:
+                self._rtt_sample(now)
+            else:
+                self.rtt_mark = None
+
+        payload = data[4:]
+        if len(payload) > self.blksize:
+            raise TFTPError(ERROR_ILLEGAL_OPERATION, f"Block larger than negotiated blksize ({self.blksize})")
+        self.received += 1
+        self.bytes_done += len(payload)
+        if payload:
+            self._buffer.append(payload)
+            self._buffered += len(payload)
+            if self._buffered >= self.WRITE_BEHIND_BYTES:
+                self._submit('write')
+        self.retries_left = self.engine.max_retries
+        self.in_window += 1
+        if len(payload) < self.blksize:
+            # Dernier bloc : ACK et fin du transfert quand le DiskWriter aura renommé le fichier
+            self.state = 'commit'
+            self.engine.cache.invalidate(self.filepath)  # Libère la projection de l'ancienne version
+            self._submit('commit')
+            return
+        if self.in_window >= self.windowsize:
+            self.in_window = 0
+            if self._writing > self.MAX_WRITE_BEHIND:
+                self._ack_held = True
+            else:
+                self._send_ack(self.received, now)
+            self.update_progress(now)
+        self.engine.arm_timer(self, now)
+
+    def on_timeout(self, now: float) -> None:
+        if self.state == 'dally':
+            self.engine.finish(self, True)
+            return
+        if self.state == 'commit' or self._ack_held:
+            return  # Attente du disque, pas d'une perte : le minuteur repart avec la fenêtre suivante
+        if not self._backoff(now):
+            self.engine.finish(self, False, f"Transfer timed out waiting for block {(self.received + 1) % 65536}")
+            return
+        logger.warning(f"Timeout waiting for block {(self.received + 1) % 65536} from {self.client_id}, "
+                       f"acknowledging block {self.received % 65536} ({self._retry_label()})")
+        # ACK du dernier bloc reçu dans l'ordre (RFC 7440) : le client reprend au bloc manquant
+        if self.received:
+            self._last_packet = self._ack(self.received)
+        self.in_window = 0
+        self.retransmits += 1
+        self._send(self._last_packet)
+        self.engine.arm_timer(self, now)
+
+    def _submit(self, job: str) -> None:
+        """Confie le tampon (éventuellement vide) et la tâche `job` au DiskWriter"""
+        data = b''.join(self._buffer)
+        self._buffer.clear()
+        self._buffered = 0
+        self._writing += len(data)
+        self.engine.writer.submit(self, job, data)
+
+    # --- Tâches exécutées par le thread du DiskWriter ---
+    def run_disk_job(self, job: str, data: bytes) -> None:
+        if job == 'discard':
+            self._discard()
+            return
+        try:
+            self.file.write(data)
+        except OSError as e:
+            if e.errno in _DISK_FULL_ERRNOS:
+                raise TFTPError(ERROR_DISK_FULL, "Disk full or allocation exceeded")
+            raise
+        if job == 'commit':
+            self._commit()
+
+    def _commit(self) -> None:
+        """Synchronise et renomme le fichier temporaire"""
+        os.fsync(self.file.fileno())
+        self.file.close()
+        os.replace(self.temp_path, self.filepath)
+        self._replaced = True
+        if not IS_WINDOWS:
+            # Rend le renommage lui-même durable ; le fichier est déjà enregistré, un échec est seulement signalé
+            try:
+                dir_fd = os.open(os.path.dirname(self.filepath), os.O_RDONLY)
+                try:
+                    os.fsync(dir_fd)
+                finally:
+                    os.close(dir_fd)
+            except OSError as e:
+                logger.warning(f"Could not sync directory of {self.filepath}: {e}")
+
+    def _discard(self) -> None:
+        if self._replaced:
+            return
+        self.file.close()
+        try:
+            os.remove(self.temp_path)
+        except OSError as e:
+            logger.warning(f"Could not remove temporary file {self.temp_path}: {e}")
+
+    # --- Retour dans la boucle ---
+    def on_disk_done(self, job: str, data_size: int, error: Optional[Exception], now: float) -> None:
+        """Tâche terminée par le DiskWriter (appelé depuis la boucle, session non terminée)"""
+        self._writing -= data_size
+        if error is not None:
+            raise error
+        if job == 'commit':
+            self.committed = True
+            self.file_size = self.bytes_done
+            logger.info(f"Upload from {self.client_id} saved to {self.filepath} ({self.bytes_done} bytes)")
+            self._send_ack(self.received, now)
+            self.engine.report(self, True)
+            self.state = 'dally'
+            # Deux délais : le renvoi d'un client réglé sur le même timeout arrive encore à temps
+            self.engine.arm_timer(self, now, 2 * self.max_rto)
+        elif self._ack_held and self._writing <= self.MAX_WRITE_BEHIND:
+            self._ack_held = False
+            self._send_ack(self.received, now)
+            self.engine.arm_timer(self, now)
+
+    def close(self, success: bool) -> None:
+        if not self.committed:
+            self.engine.writer.submit(self, 'discard')  # Après les écritures en cours de la session
+
+
+class TFTPEngine:
+    """Serveur TFTP : réception des requêtes et transferts (RRQ/WRQ) multiplexés sur une boucle.
+
+    `run()` bloque jusqu'à `stop()` : le serveur Qt l'exécute dans son thread de service.
+    """
+
+    SEND_BURST = 16          # Paquets émis au plus par session et par tour de boucle
+    MAX_REQUESTS_PER_WAKE = 64
+    TRANSFER_SOCKET_BUFFER = 524288  # 512 KB
+
+    def __init__(self, interface: str = '0.0.0.0', port: int = 69, root_dir: str = './tftp_root',
+                 timeout: float = 5.0, max_retries: int = 5, max_sessions: int = 256, max_pending: int = 1024,
+                 cache_bytes: int = 256 * 1024 * 1024, listener: Optional[TFTPEngineListener] = None):
+        """
+        Args:
+            interface (str): Adresse d'écoute (et des sockets de transfert)
+            port (int): Port des requêtes
+            root_dir (str): Répertoire servi
+            timeout (float): Délai de retransmission maximal (s) ; le délai effectif suit le RTT
+            max_retries (int): Retransmissions consécutives avant abandon d'un transfert
+            max_sessions (int): Transferts actifs simultanés ; au-delà, les requêtes attendent
+            max_pending (int): Requêtes en attente au maximum ; au-delà, refus (ERROR)
+            cache_bytes (int): Budget des images projetées gardées sans lecteur (ImageCache)
+            listener (TFTPEngineListener): Rappels d'événements
+        """
+        self.interface = interface
+        self.port = port
+        self.root_dir = os.path.abspath(root_dir)
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.max_sessions = max_sessions
+        self.max_pending = max_pending
+        self.listener = listener or TFTPEngineListener()
+        self.cache = ImageCache(cache_bytes)
+        self.writer: Optional[DiskWriter] = None  # Écritures des uploads (créé par run())
+        self.support_options = True
+        self.running = False
+        self.sock: Optional[socket.socket] = None
+        self.sessions: Dict[Tuple[str, int], TransferSession] = {}  # Par adresse client
+        self._pending: Deque[Tuple[bytes, Tuple[str, int]]] = deque()
+        self._ready: Deque[TransferSession] = deque()
+        self._timers: List[tuple] = []  # (échéance, n°, session)
+        self._timer_seq = itertools.count()
+        self._selector: Optional[selectors.BaseSelector] = None
+
+    def _log(self, level: str, message: str) -> None:
+        logger.log(logging.getLevelName(level), message)
+        self.listener.on_log(level, message)
+
+    # --- Cycle de vie ---
+    def run(self) -> None:
+        """Ouvre le port des requêtes et sert les transferts jusqu'à stop()"""
+        self.sock = self._open_socket()
+        self._selector = selectors.DefaultSelector()
+        self._selector.register(self.sock, selectors.EVENT_READ)
+        self.writer = DiskWriter()
+        self._selector.register(self.writer.wakeup, selectors.EVENT_READ, self.writer)
+        self.running = True
+        self._log("INFO", f"Server started on {self.interface}:{self.port}")
+        try:
+            while self.running:
+                now = time.monotonic()
+                for key, _ in self._selector.select(self._select_timeout(now)):
+                    try:
+                        if key.data is None:
+                            self._drain_requests()
+                        elif key.data is self.writer:
+                            self._drain_writes()
+                        else:
+                            self._drain_session(key.data)
+                    except Exception as e:
+                        logger.error(f"Server loop error: {e}")
+                now = time.monotonic()
+                self._run_timers(now)
+                self._serve_ready(now)
+        finally:
+            self._shutdown()
+            logger.info("Server main loop exited")
+
+    def stop(self) -> None:
+        """Demande l'arrêt de la boucle (effectif au plus tard après un tour de select)"""
+        self.running = False
+
+    def _open_socket(self) -> socket.socket:
+        if IS_WINDOWS:
+            max_recv, max_send = probe_socket_buffers()
+        else:
+            max_recv, max_send = 65536, 65536
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        try:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, max_recv)
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, max_send)
+            bind_attempts = 0
+            max_attempts = 5
+            while True:
+                try:
+                    sock.bind((self.interface, self.port))
+                    break
+                except OSError as e:
+                    if getattr(e, 'winerror', None) != 10048 or bind_attempts >= max_attempts - 1:
+                        raise
+                    bind_attempts += 1
+                    wait_time = bind_attempts * 2
+                    logger.warning(f"Port {self.port} is busy, waiting {wait_time} seconds "
+                                   f"(attempt {bind_attempts}/{max_attempts})")
+                    time.sleep(wait_time)
+            sock.setblocking(False)
+        except OSError:
+            sock.close()
+            raise
+        return sock
+
+    def _shutdown(self) -> None:
+        self.running = False
+        if self.writer is not None:
+            # Uploads en cours d'enregistrement : ils se terminent normalement
+            self.writer.wait()
+            self._drain_writes()
+        for session in list(self.sessions.values()):
+            if session.reported:
+                self.finish(session, True)  # Upload terminé, en attente d'un éventuel dernier bloc répété
+            else:
+                self.finish(session, False, "Transfer interrupted: server stopping")
+        self._pending.clear()
+        self.cache.clear()
+        if self.writer is not None:
+            self.writer.close()  # Après les suppressions de fichiers temporaires des sessions interrompues
+            self.writer = None
+        if self._selector is not None:
+            self._selector.close()
+            self._selector = None
+        if self.sock is not None:
+            self.sock.close()
+            self.sock = None
+
+    # --- Requêtes ---
+    def _drain_requests(self) -> None:
+        for _ in range(self.MAX_REQUESTS_PER_WAKE):
+            try:
+                data, client_addr = self.sock.recvfrom(65536)
+            except (BlockingIOError, InterruptedError):
+                return
+            except OSError as e:  # ConnectionResetError (ICMP) sous Windows
+                logger.error(f"Socket receive error: {e}")
+                continue
+            self._handle_request(data, client_addr)
+
+    def _handle_request(self, data: bytes, client_addr: Tuple[str, int]) -> None:
+        client_id = f"{client_addr[0]}:{client_addr[1]}"
+        if len(data) < 2:
+            self.send_error(client_addr, ERROR_ILLEGAL_OPERATION, "Invalid packet size")
+            return
+        opcode = int.from_bytes(data[:2], 'big')
+        if opcode in (OPCODE_DATA, OPCODE_ACK, OPCODE_ERROR):
+            return  # Paquet tardif d'un transfert terminé
+        if opcode not in (OPCODE_RRQ, OPCODE_WRQ):
+            logger.warning(f"Invalid opcode {opcode} from {client_id}")
+            self.send_error(client_addr, ERROR_ILLEGAL_OPERATION, f"Illegal TFTP operation: {opcode}")
+            return
+        if client_addr in self.sessions or any(addr == client_addr for _, addr in self._pending):
+            return  # Requête retransmise pendant son traitement
+        if len(self.sessions) >= self.max_sessions:
+            if len(self._pending) >= self.max_pending:
+                logger.warning(f"Too many pending requests, rejecting {client_id}")
+                self.send_error(client_addr, ERROR_NOT_DEFINED, "Server busy, try again later")
+                return
+            self._pending.append((data, client_addr))
+            return
+        self._start_session(data, client_addr)
+
+    def _start_session(self, data: bytes, client_addr: Tuple[str, int]) -> None:
+        client_id = f"{client_addr[0]}:{client_addr[1]}"
+        opcode = int.from_bytes(data[:2], 'big')
+        try:
+            filename, mode, options = parse_request(data[2:])
+        except (ValueError, UnicodeDecodeError) as e:
+            logger.error(f"Error parsing TFTP request from {client_id}: {e}")
+            self.send_error(client_addr, ERROR_ILLEGAL_OPERATION, "Invalid TFTP request format")
+            return
+        self.listener.on_request(client_addr, opcode, filename)
+        kind = "WRITE" if opcode == OPCODE_WRQ else "READ"
+        self._log("INFO", f"Received {kind} request from {client_id} for file: {filename}")
+        filepath = os.path.abspath(os.path.join(self.root_dir, filename))
+        if os.path.commonpath([self.root_dir, filepath]) != self.root_dir or filepath == self.root_dir:
+            logger.warning(f"Access violation attempt from {client_id}: {filename}")
+            self.send_error(client_addr, ERROR_ACCESS_VIOLATION, "Access violation")
+            return
+        if opcode == OPCODE_RRQ and not os.path.isfile(filepath):
+            logger.warning(f"File not found: {filepath}")
+            self.cache.invalidate(filepath)  # Image supprimée : sa projection est libérée
+            self.send_error(client_addr, ERROR_FILE_NOT_FOUND, "File not found")
+            return
+        if opcode == OPCODE_WRQ and os.path.isdir(filepath):
+            self.send_error(client_addr, ERROR_ACCESS_VIOLATION, "Access violation")
+            return
+
+        session_class = WriteSession if opcode == OPCODE_WRQ else ReadSession
+        sock = None
+        try:
+            sock = self._open_transfer_socket()
+            session = session_class(self, sock, client_addr, filename, filepath, options, self.timeout)
+        except (OSError, TFTPError) as e:
+            if sock is not None:
+                sock.close()
+            logger.error(f"Cannot start transfer with {client_id}: {e}")
+            self.send_error(client_addr, getattr(e, 'error_code', ERROR_NOT_DEFINED), str(e))
+            return
+        self.sessions[client_addr] = session
+        self._selector.register(sock, selectors.EVENT_READ, session)
+        logger.info(f"Starting {'WRQ' if opcode == OPCODE_WRQ else 'RRQ'} transfer with {client_id} "
+                    f"from port {sock.getsockname()[1]}")
+        now = time.monotonic()
+        session.update_progress(now, notify=False)
+        self.listener.on_transfer_started(session)
+        session.begin(now)
+
+    def _open_transfer_socket(self) -> socket.socket:
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        try:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, self.TRANSFER_SOCKET_BUFFER)
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, self.TRANSFER_SOCKET_BUFFER)
+        except OSError as e:
+            logger.warning(f"Could not set socket buffer sizes: {e}")
+        try:
+            sock.bind((self.interface, 0))
+            sock.setblocking(False)
+        except OSError:
+            sock.close()
+            raise
+        return sock
+
+    def send_error(self, client_addr: Tuple[str, int], error_code: int, error_msg: str,
+                   sock: Optional[socket.socket] = None) -> None:
+        """Envoie un paquet ERROR (depuis le socket de la session, sinon le port des requêtes)"""
+        try:
+            (sock or self.sock).sendto(build_error(error_code, error_msg), client_addr)
+            logger.error(f"Sent error to {client_addr[0]}:{client_addr[1]}: {error_code} - {error_msg}")
+        except (OSError, AttributeError) as e:
+            logger.error(f"Error sending ERROR packet: {e}")
+
+    # --- Sessions ---
+    def _drain_session(self, session: TransferSession) -> None:
+        now = time.monotonic()
+        for _ in range(self.MAX_REQUESTS_PER_WAKE):
+            if session.finished:
+                return
+            try:
+                data, addr = session.sock.recvfrom(65536)
+            except (BlockingIOError, InterruptedError):
+                return
+            except OSError as e:
+                logger.warning(f"Socket receive error for {session.client_id}: {e}")
+                return
+            try:
+                session.on_datagram(data, addr, now)
+            except Exception as e:
+                self._fail(session, e)
+                return
+
+    def _drain_writes(self) -> None:
+        """Traite les tâches terminées par le DiskWriter"""
+        try:
+            while self.writer.wakeup.recv(4096):
+                pass
+        except (BlockingIOError, InterruptedError):
+            pass
+        now = time.monotonic()
+        done = self.writer.done
+        while done:
+            session, job, size, error = done.popleft()
+            if session.finished:
+                continue
+            try:
+                session.on_disk_done(job, size, error, now)
+            except Exception as e:
+                self._fail(session, e)
+
+    def mark_ready(self, session: TransferSession) -> None:
+        """Inscrit la session dans la file d'émission (tourniquet)"""
+        if not session.queued and not session.finished:
+            session.queued = True
+            self._ready.append(session)
+
+    def arm_timer(self, session: TransferSession, now: float, delay: Optional[float] = None) -> None:
+        """Fixe l'échéance de retransmission (rto de la session par défaut).
+
+        Une échéance repoussée réutilise l'entrée du tas ; une échéance avancée (RTO réduit) en
+        ajoute une, l'ancienne étant ignorée à son expiration.
+        """
+        session.deadline = now + (session.rto if delay is None else delay)
+        if session.timer_at is None or session.deadline < session.timer_at:
+            session.timer_at = session.deadline
+            heapq.heappush(self._timers, (session.deadline, next(self._timer_seq), session))
+
+    def _run_timers(self, now: float) -> None:
+        timers = self._timers
+        while timers and timers[0][0] <= now:
+            at, _, session = heapq.heappop(timers)
+            if session.finished or at != session.timer_at:
+                continue  # Session terminée ou entrée remplacée par une échéance plus proche
+            session.timer_at = None
+            if session.deadline > now:
+                # Échéance repoussée entre-temps : réinscription à la nouvelle date
+                session.timer_at = session.deadline
+                heapq.heappush(timers, (session.deadline, next(self._timer_seq), session))
+                continue
+            try:
+                session.on_timeout(now)
+            except Exception as e:
+                self._fail(session, e)
+            if not session.finished and session.timer_at is None and session.state == 'data':
+                self.arm_timer(session, now)
+
+    def _serve_ready(self, now: float) -> None:
+        """Un tour de tourniquet : chaque session prête émet au plus SEND_BURST paquets"""
+        for _ in range(len(self._ready)):
+            session = self._ready.popleft()
+            session.queued = False
+            if session.finished:
+                continue
+            try:
+                session.send_burst(self.SEND_BURST, now)
+            except Exception as e:
+                self._fail(session, e)
+                continue
+            if session.wants_send():
+                self.mark_ready(session)
+
+    def _select_timeout(self, now: float) -> float:
+        if self._ready:
+            return 0
+        if self._timers:
+            return min(max(self._timers[0][0] - now, 0), 0.5)
+        return 0.5
+
+    def _fail(self, session: TransferSession, exc: Exception) -> None:
+        self.finish(session, False, str(exc), error_code=getattr(exc, 'error_code', ERROR_NOT_DEFINED))
+
+    def report(self, session: TransferSession, success: bool, error: Optional[str] = None) -> None:
+        """Signale la fin du transfert au listener (une seule fois, éventuellement avant finish)"""
+        if session.reported:
+            return
+        session.reported = True
+        session.update_progress(time.monotonic(), notify=False)
+        session.progress.success = success
+        session.progress.ended = session.progress.last_activity
+        if success:
+            srtt = f"{session.srtt * 1000:.1f} ms" if session.srtt is not None else "n/a"
+            logger.info(f"Transfer completed for {session.client_id}: {session.filename} "
+                        f"({session.retransmits} retransmits, {session.timeouts} timeouts, srtt {srtt})")
+        try:
+            self.listener.on_transfer_finished(session, success, error)
+        except Exception as e:
+            logger.error(f"Error in transfer listener: {e}")
+
+    def finish(self, session: TransferSession, success: bool, error: Optional[str] = None,
+               notify_client: bool = True, error_code: int = ERROR_NOT_DEFINED) -> None:
+        """Termine une session (succès ou échec), libère son socket et démarre une requête en attente"""
+        if session.finished:
+            return
+        session.finished = True
+        if not success:
+            logger.error(f"Error in file transfer with {session.client_id}: {error}")
+            if notify_client:
+                self.send_error(session.client_addr, error_code, error or "Transfer failed", session.sock)
+        if self._selector is not None:
+            try:
+                self._selector.unregister(session.sock)
+            except (KeyError, ValueError):
+                pass
+        session.sock.close()
+        try:
+            session.close(success)
+        except OSError as e:
+            logger.error(f"Error closing transfer with {session.client_id}: {e}")
+        self.sessions.pop(session.client_addr, None)
+        self.report(session, success, error)
+        while self.running and self._pending and len(self.sessions) < self.max_sessions:
+            self._start_session(*self._pending.popleft())
@@ -1,9 +1,6 @@
 from PyQt5.QtCore import QObject, pyqtSignal
 import threading
-import time
 import logging
-from datetime import datetime
-import queue
 
 class TFTPServerSignals(QObject):
     log_message = pyqtSignal(str, str)   # niveau, message
@@ -14,17 +11,31 @@ class TFTPServerSignals(QObject):
     transfer_completed = pyqtSignal(str, bool)   # client_id, succès
 
 class TFTPWorker(QObject):
+    """Relaie les signaux du serveur (émis par la boucle TFTP) et surveille l'inactivité des clients.
+
+    La progression n'est plus relevée par sondage : le moteur la pousse, limitée par transfert.
+    """
+    SWEEP_INTERVAL = 1.0  # Période de vérification des clients inactifs (s)
+
     def __init__(self, server, parent=None):
         super().__init__(parent)
         self.server = server
         self.thread = None
         self.is_running = False
         self.signals = TFTPServerSignals()
-        self.status_queue = queue.Queue(maxsize=100)  # Buffer pour les mises à jour de statut
+        self._stop_event = threading.Event()
+        server_signals = server.signals
+        server_signals.log_message.connect(self.signals.log_message)
+        server_signals.client_connected.connect(self.signals.client_connected)
+        server_signals.client_disconnected.connect(self.signals.client_disconnected)
+        server_signals.transfer_started.connect(self.signals.transfer_started)
+        server_signals.transfer_updated.connect(self.signals.transfer_updated)
+        server_signals.transfer_completed.connect(self.signals.transfer_completed)
 
     def start(self):
         if not self.is_running:
             self.is_running = True
+            self._stop_event.clear()
             self.thread = threading.Thread(target=self._run, daemon=True)
             self.thread.start()
             logging.info("TFTP worker started")
@@ -32,6 +43,7 @@ class TFTPWorker(QObject):
     def stop(self):
         logging.info("Stopping TFTP worker...")
         self.is_running = False
+        self._stop_event.set()
         if self.thread and self.thread.is_alive():
             self.thread.join(timeout=2)
             if self.thread.is_alive():
@@ -43,29 +55,10 @@ class TFTPWorker(QObject):
         
         while self.is_running:
             try:
-                status = self.server.get_status()
+                # Vérification des clients inactifs (signal client_disconnected émis par le serveur)
+                self.server.sweep_inactive_clients()
                 consecutive_errors = 0  # Réinitialiser le compteur d'erreurs
-                
-                # Vérification des clients inactifs
-                now = datetime.now()
-                inactive_timeout = 300  # 5 minutes
-
-                for client_id, client in status['clients'].items():
-                    last_seen = client.get('last_seen')
-                    if last_seen:
-                        delta = (now - last_seen).total_seconds()
-                        if delta > inactive_timeout and client.get('active', False):
-                            self.signals.client_disconnected.emit(client_id)
-                            client['active'] = False
-
-                # Mise à jour des transferts actifs
-                for client_id, transfer in status['transfers'].items():
-                    if not transfer.get('completed', False):
-                        self.signals.transfer_updated.emit(client_id, transfer)
-
-                # Ajuster le temps de pause en fonction de la charge
-                sleep_time = 0.2
-                time.sleep(sleep_time)
+                self._stop_event.wait(self.SWEEP_INTERVAL)
                 
             except Exception as e:
                 consecutive_errors += 1
@@ -74,6 +67,6 @@ class TFTPWorker(QObject):
                 # Augmenter le temps de pause exponentiellement en cas d'erreurs consécutives
                 if consecutive_errors > max_consecutive_errors:
                     logging.critical(f"Too many consecutive errors in TFTP worker, pausing for longer")
-                    time.sleep(5)  # Pause plus longue après plusieurs erreurs
+                    self._stop_event.wait(5)  # Pause plus longue après plusieurs erreurs
                 else:
-                    time.sleep(1)  # Pause standard en cas d'erreur
+                    self._stop_event.wait(1)  # Pause standard en cas d'erreur